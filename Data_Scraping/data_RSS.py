@@ -1,5 +1,16 @@
 import feedparser
+import requests
+import json
+import os
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
 
 
 RSS_FEEDS_TO_MONITOR = [
@@ -7,70 +18,203 @@ RSS_FEEDS_TO_MONITOR = [
     "https://techcrunch.com/category/artificial-intelligence/feed/"
 ]
 
-def fetch_and_parse_feed(feed_url):
+def parse_feed_entries(feed, feed_url):
+    """Turn parsed feed entries into article dicts (raises on an ill-formed feed)."""
+    # Check if the feed was fetched and parsed correctly
+    if feed.bozo:
+        # bozo=1 means the feed is "ill-formed"
+        raise Exception(f"Ill-formed feed. Error: {feed.bozo_exception}")
 
-    print(f"[INFO] Fetching feed: {feed_url}...")
-    try:
-        # feedparser handles fetching and parsing the XML
-        feed = feedparser.parse(feed_url)
+    if 'entries' not in feed or not feed.entries:
+        print(f"[WARN] No entries found in feed: {feed_url}")
+        return []
 
-        # Check if the feed was fetched and parsed correctly
-        if feed.bozo:
-            # bozo=1 means the feed is "ill-formed"
-            raise Exception(f"Ill-formed feed. Error: {feed.bozo_exception}")
+    processed_articles = []
+    for entry in feed.entries:
 
-        if 'entries' not in feed or not feed.entries:
-            print(f"[WARN] No entries found in feed: {feed_url}")
-            return []
+        article_data = {
+            "title": entry.get("title", "No Title"),
+            "link": entry.get("link", "No Link"),
+            "published": entry.get("published", "No Date"),
+            "summary": entry.get("summary", "No Summary"),
+            "source_url": feed_url
+        }
+        processed_articles.append(article_data)
 
-        print(f"[INFO] Found {len(feed.entries)} entries.")
+    return processed_articles
 
-        processed_articles = []
-        for entry in feed.entries:
 
-            article_data = {
-                "title": entry.get("title", "No Title"),
-                "link": entry.get("link", "No Link"),
-                "published": entry.get("published", "No Date"),
-                "summary": entry.get("summary", "No Summary"),
-                "source_url": feed_url
-            }
-            processed_articles.append(article_data)
+def fetch_and_parse_feed(feed_url):
 
+    print(f"[INFO] Fetching feed: {feed_url}...")
+    try:
+        # feedparser handles fetching and parsing the XML
+        processed_articles = parse_feed_entries(feedparser.parse(feed_url), feed_url)
+        print(f"[INFO] Found {len(processed_articles)} entries.")
         return processed_articles
 
     except Exception as e:
         print(f"[ERROR] Failed to fetch or parse {feed_url}. Reason: {e}")
         return []
 
-def techcrunch_main_ingestion_loop():
+# -------------------------------
+# Concurrent fetching with conditional GET
+# -------------------------------
+class FeedState:
+    """ETag / Last-Modified per feed URL, persisted as JSON between runs."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._state = json.load(f)
+
+    def headers(self, feed_url):
+        entry = self._state.get(feed_url, {})
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, feed_url, etag, last_modified):
+        with self._lock:
+            self._state[feed_url] = {"etag": etag, "last_modified": last_modified}
+
+    def save(self):
+        if not self.path:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._state, f, indent=2)
+            os.replace(tmp, self.path)
+
+
+_host_limits = {}
+_host_limits_lock = threading.Lock()
+_sessions = threading.local()
+
+
+def _host_slot(feed_url):
+    """Semaphore limiting concurrent requests per host (politeness)."""
+    host = urlparse(feed_url).netloc.lower()
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.Semaphore(config.RSS_PER_HOST_LIMIT)
+        return _host_limits[host]
+
+
+def _session():
+    if not hasattr(_sessions, "value"):
+        _sessions.value = requests.Session()
+        _sessions.value.headers["User-Agent"] = config.RSS_USER_AGENT
+    return _sessions.value
+
+
+def fetch_feed(feed_url, state=None, item_limit=None):
+    """Fetch one feed, conditionally if `state` has validators for it.
+
+    Returns {"url", "status", "latency", "bytes", "articles", "validators",
+    "error"}; a 304 (unchanged) feed has no articles. `validators` (ETag /
+    Last-Modified) are only returned, never stored: they are saved by
+    `commit_feed_state()` once the articles are ingested. `item_limit` caps
+    only the returned articles, the validators cover the whole response.
     """
-    Main loop to run the ingestion.
-    For this example, it just runs once.
-    In a real system, this would run on a schedule.
+    result = {"url": feed_url, "status": None, "latency": 0.0, "bytes": 0, "articles": [],
+              "validators": None, "error": None}
+    headers = state.headers(feed_url) if state is not None and config.RSS_CONDITIONAL_GET else {}
+    start = time.time()
+    try:
+        with _host_slot(feed_url):
+            response = _session().get(feed_url, headers=headers, timeout=config.RSS_FETCH_TIMEOUT)
+        result["latency"] = time.time() - start
+        result["status"] = response.status_code
+        result["bytes"] = len(response.content)
+        if response.status_code == 304:
+            return result
+        response.raise_for_status()
+
+        articles = parse_feed_entries(feedparser.parse(response.content), feed_url)
+        limit = config.RSS_ITEMS_PER_FEED if item_limit is None else item_limit
+        result["articles"] = articles[:limit] if limit else articles
+        result["validators"] = {"etag": response.headers.get("ETag"),
+                                "last_modified": response.headers.get("Last-Modified")}
+    except Exception as e:
+        result["latency"] = result["latency"] or time.time() - start
+        result["error"] = str(e)
+        print(f"[ERROR] Failed to fetch or parse {feed_url}. Reason: {e}")
+    return result
+
+
+def fetch_feeds(feed_urls, item_limit=None, concurrency=None, state_path=None):
+    """Fetch many feeds concurrently; returns the per-feed results (see `fetch_feed`)."""
+    state = FeedState(config.RSS_FEED_STATE_PATH if state_path is None else state_path)
+    concurrency = concurrency or config.RSS_FETCH_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda url: fetch_feed(url, state, item_limit), feed_urls))
+    print_fetch_report(results)
+    return results
+
+
+# Validators of the last fetch, waiting for the caller to ingest its articles
+_pending_state = {}
+_pending_lock = threading.Lock()
+
+
+def commit_feed_state(state_path=None):
+    """Persist the validators of the last fetch; call after its articles are safely ingested."""
+    with _pending_lock:
+        pending = dict(_pending_state)
+        _pending_state.clear()
+    if not pending:
+        return 0
+    state = FeedState(config.RSS_FEED_STATE_PATH if state_path is None else state_path)
+    for feed_url, validators in pending.items():
+        state.update(feed_url, validators["etag"], validators["last_modified"])
+    state.save()
+    print(f"[INFO] Saved ETag / Last-Modified for {len(pending)} feeds.")
+    return len(pending)
+
+
+def print_fetch_report(results):
+    print(f"\n{'feed':<60} {'status':>6} {'latency':>8} {'bytes':>9} {'items':>6}")
+    for r in results:
+        status = r["status"] if r["status"] is not None else "ERR"
+        print(f"{r['url'][:60]:<60} {status:>6} {r['latency']:>7.2f}s {r['bytes']:>9} {len(r['articles']):>6}")
+    if results:
+        not_modified = sum(1 for r in results if r["status"] == 304)
+        total_bytes = sum(r["bytes"] for r in results)
+        print(f"[INFO] {len(results)} feeds, {not_modified / len(results):.0%} unchanged (304), "
+              f"{total_bytes} bytes, slowest {max(r['latency'] for r in results):.2f}s")
+
+
+def techcrunch_main_ingestion_loop(feed_urls=None, item_limit=None):
+    """
+    Fetch every monitored feed once, concurrently, skipping feeds that are
+    unchanged since the last run (ETag / Last-Modified). Returns up to
+    `item_limit` (config.RSS_ITEMS_PER_FEED) articles per feed.
+    The new validators are held until the caller ingests the articles and
+    calls `commit_feed_state()`; `scheduler.py` runs this on a schedule.
     """
     print("--- TrendScout AI: Starting RSS Ingestion  ---")
 
-    all_new_articles = []
-    for feed_url in RSS_FEEDS_TO_MONITOR:
-        articles = fetch_and_parse_feed(feed_url)
-        all_new_articles.extend(articles)
-        time.sleep(1)
+    results = fetch_feeds(feed_urls or RSS_FEEDS_TO_MONITOR, item_limit=item_limit)
+    with _pending_lock:
+        _pending_state.clear()
+        _pending_state.update({r["url"]: r["validators"] for r in results if r["validators"]})
+    all_new_articles = [article for r in results for article in r["articles"]]
 
     print(f"\n--- Ingestion Complete: Total {len(all_new_articles)} articles fetched ---")
 
-
-
     articleInJsonList = []
 
-    for i, article in enumerate(all_new_articles[:5]): # Print first 5
-        '''
-        print(f"\nArticle {i+1}:")
-        print(f"  Title: {article['title']}")
-        print(f"  Link: {article['link']}")
-        print(f"  Source: {article['source_url']}")
-        '''
-
+    for article in all_new_articles:
         # orginize data into json format
         articleInJson = {
             "title": article['title'],
@@ -1,6 +1,12 @@
 import requests
-import sys
+import json
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlencode
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -10,6 +16,11 @@ import config
 # The GitHub API endpoint for searching repositories
 API_URL = "https://api.github.com/search/repositories"
 
+# Search results are capped by GitHub at 1000 per query
+SEARCH_RESULT_LIMIT = 1000
+# Repo fields kept in results and in the ETag cache
+REPO_FIELDS = ("full_name", "stargazers_count", "description", "html_url", "language", "topics", "pushed_at")
+
 
 def check_token():
     """Checks if the token has been set."""
@@ -18,50 +29,228 @@ def check_token():
         print("        Please get a token from https://github.com/settings/tokens")
         sys.exit(1) # Exit the script
 
-def fetch_trending_repos():
-    """
-    Fetches trending AI repositories from GitHub.
-    """
-    print(f"[INFO] Searching GitHub for: '{config.SEARCH_QUERY}'...")
 
-    # Set up the query parameters
-    params = {
-        "q": config.SEARCH_QUERY,
-        "sort": config.SORT_BY,
-        "order": config.ORDER,
-        "per_page": 10  # the top 10 for this demo
-    }
+# -------------------------------
+# HTTP session, rate limit and ETag cache
+# -------------------------------
+_session = None
+_session_lock = threading.Lock()
 
 
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"Bearer {config.GITHUB_TOKEN}",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
+def get_session():
+    """One pooled Session for all GitHub requests (keep-alive across pages and queries)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(4, config.GITHUB_CONCURRENCY))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "Accept": "application/vnd.github.v3+json",
+                "Authorization": f"Bearer {config.GITHUB_TOKEN}",
+                "X-GitHub-Api-Version": "2022-11-28"
+            })
+            _session = session
+    return _session
 
-    try:
-        response = requests.get(API_URL, headers=headers, params=params)
 
-        # Raise an error if the request failed (e.g., 401 Unauthorized)
-        response.raise_for_status()
+class RateLimiter:
+    """Shared view of the X-RateLimit-* headers; callers wait for the reset instead of getting 403s."""
+
+    def __init__(self, reserve=None, max_wait=None):
+        self.reserve = config.GITHUB_RATE_LIMIT_RESERVE if reserve is None else reserve
+        self.max_wait = config.GITHUB_MAX_RATE_LIMIT_WAIT if max_wait is None else max_wait
+        self.remaining = None
+        self.reset_at = 0.0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until a request may be sent; returns False if that would take longer than max_wait."""
+        with self._lock:
+            delay = 0.0
+            if self.remaining is not None and self.remaining <= self.reserve:
+                delay = self.reset_at - time.time()
+            if delay > self.max_wait:
+                return False
+            if delay > 0:
+                print(f"[INFO] GitHub rate limit reached, waiting {delay:.0f}s for reset...")
+                time.sleep(delay)
+                self.waited += delay
+                self.remaining = None
+            elif self.remaining is not None:
+                # count the request we are about to send against the quota
+                self.remaining -= 1
+            return True
+
+    def update(self, response):
+        headers = response.headers
+        with self._lock:
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset" in headers:
+                self.reset_at = float(headers["X-RateLimit-Reset"])
+
+    def backoff(self, response):
+        """Delay before retrying a 403/429, or None if it is not a rate-limit response."""
+        if response.headers.get("Retry-After"):
+            return float(response.headers["Retry-After"])
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            return max(0.0, float(response.headers.get("X-RateLimit-Reset", 0)) - time.time()) + 1
+        return None
+
+
+class ETagCache:
+    """Response pages keyed by URL + params, revalidated with If-None-Match (304s are free)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pages = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._pages = json.load(f)
+
+    @staticmethod
+    def key(url, params):
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def get(self, key):
+        with self._lock:
+            return self._pages.get(key)
+
+    def put(self, key, etag, page):
+        if etag:
+            with self._lock:
+                self._pages[key] = {"etag": etag, **page}
 
+    def save(self):
+        if not self.path:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._pages, f)
+            os.replace(tmp, self.path)
+
+
+def _get_page(url, params, limiter, cache, stats):
+    """One search page as {"total_count", "items"}, from the ETag cache when GitHub says 304."""
+    key = ETagCache.key(url, params)
+    cached = cache.get(key) if cache is not None else None
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
+    for attempt in range(config.GITHUB_MAX_RETRIES + 1):
+        if not limiter.wait():
+            raise RuntimeError(f"rate limit resets in more than {limiter.max_wait}s")
+        response = get_session().get(url, params=params, headers=headers, timeout=config.GITHUB_TIMEOUT)
+        stats["requests"] += 1
+        limiter.update(response)
+        if response.status_code == 304:
+            stats["not_modified"] += 1
+            return cached
+        if response.status_code in (403, 429):
+            delay = limiter.backoff(response)
+            if delay is not None and attempt < config.GITHUB_MAX_RETRIES and delay <= limiter.max_wait:
+                print(f"[INFO] GitHub rate limited (HTTP {response.status_code}), retrying in {delay:.0f}s...")
+                stats["rate_limited"] += 1
+                time.sleep(delay)
+                limiter.waited += delay
+                continue
+        response.raise_for_status()
         data = response.json()
+        page = {
+            "total_count": data.get("total_count", 0),
+            "items": [{k: item.get(k) for k in REPO_FIELDS} for item in data.get("items", [])],
+        }
+        if cache is not None:
+            cache.put(key, response.headers.get("ETag"), page)
+        return page
+
 
-        if "items" not in data:
-            print("[WARN] 'items' key not in response. No results?")
-            return []
+def search_repos(query, max_results=None, limiter=None, cache=None, url=API_URL):
+    """Page through the search results for `query` up to `max_results` repos.
 
-        return data["items"]
+    Returns (items, stats); stops early at the last page, at GitHub's
+    1000-result cap, or when the rate limit would need a longer wait than
+    GITHUB_MAX_RATE_LIMIT_WAIT.
+    """
+    max_results = min(max_results or config.GITHUB_MAX_RESULTS, SEARCH_RESULT_LIMIT)
+    per_page = min(config.GITHUB_PER_PAGE, 100, max_results)
+    limiter = limiter or RateLimiter()
+    stats = {"query": query, "pages": 0, "requests": 0, "not_modified": 0, "rate_limited": 0, "error": None}
+    items = []
+    start = time.time()
+    page_number = 1
+    while len(items) < max_results:
+        params = {"q": query, "sort": config.SORT_BY, "order": config.ORDER,
+                  "per_page": per_page, "page": page_number}
+        try:
+            page = _get_page(url, params, limiter, cache, stats)
+        except requests.exceptions.HTTPError as http_err:
+            if http_err.response is not None and http_err.response.status_code == 401:
+                print("[ERROR] HTTP 401: Unauthorized. Is your GITHUB_TOKEN correct?")
+            else:
+                print(f"[ERROR] HTTP error occurred: {http_err}")
+            stats["error"] = str(http_err)
+            break
+        except Exception as e:
+            print(f"[ERROR] An error occurred: {e}")
+            stats["error"] = str(e)
+            break
+        stats["pages"] += 1
+        items.extend(page["items"])
+        if len(page["items"]) < per_page or page_number * per_page >= min(page["total_count"], SEARCH_RESULT_LIMIT):
+            break
+        page_number += 1
+    stats["items"] = len(items[:max_results])
+    stats["seconds"] = time.time() - start
+    return items[:max_results], stats
 
-    except requests.exceptions.HTTPError as http_err:
-        if response.status_code == 401:
-            print("[ERROR] HTTP 401: Unauthorized. Is your GITHUB_TOKEN correct?")
-        else:
-            print(f"[ERROR] HTTP error occurred: {http_err}")
-        return []
-    except Exception as e:
-        print(f"[ERROR] An error occurred: {e}")
-        return []
+
+def harvest(queries=None, max_results=None, concurrency=None, url=API_URL, cache_path=None):
+    """Run several search queries concurrently; repos found by more than one query are kept once."""
+    queries = queries or config.GITHUB_SEARCH_QUERIES
+    limiter = RateLimiter()
+    cache = ETagCache(config.GITHUB_ETAG_CACHE_PATH if cache_path is None else cache_path)
+    with ThreadPoolExecutor(max_workers=concurrency or config.GITHUB_CONCURRENCY) as pool:
+        results = list(pool.map(lambda q: search_repos(q, max_results, limiter, cache, url), queries))
+    cache.save()
+
+    repos, seen = [], set()
+    for items, _ in results:
+        for item in items:
+            if item["full_name"] not in seen:
+                seen.add(item["full_name"])
+                repos.append(item)
+
+    print(f"\n{'query':<50} {'items':>6} {'pages':>6} {'reqs':>5} {'304':>4} {'429':>4} {'secs':>6}")
+    for _, st in results:
+        print(f"{st['query'][:50]:<50} {st['items']:>6} {st['pages']:>6} {st['requests']:>5} "
+              f"{st['not_modified']:>4} {st['rate_limited']:>4} {st['seconds']:>6.2f}")
+    print(f"[INFO] {len(repos)} unique repositories, rate limit remaining: {limiter.remaining}, "
+          f"waited {limiter.waited:.0f}s for rate limits")
+    return repos
+
+
+def repo_record(repo):
+    """A harvested repo in the {name, stars, description, url} shape the ingestion mapper expects."""
+    return {
+        "name": repo['full_name'],
+        "stars": repo['stargazers_count'],
+        "description": repo['description'],
+        "url": repo['html_url']
+    }
+
+
+def fetch_trending_repos():
+    """
+    Fetches trending AI repositories from GitHub.
+    """
+    print(f"[INFO] Searching GitHub for: '{config.SEARCH_QUERY}'...")
+    return harvest([config.SEARCH_QUERY])
 
 def github_main_ingestion():
     """
@@ -72,7 +261,7 @@ def github_main_ingestion():
     # Make sure the user added their token
     check_token()
 
-    repos = fetch_trending_repos()
+    repos = harvest()
 
     if not repos:
         print("[INFO] No repositories found or an error occurred.")
@@ -96,14 +285,7 @@ def github_main_ingestion():
         '''
 
         # orginize data into json format
-        repoInJson = {
-            "name": repo['full_name'],
-            "stars": repo['stargazers_count'],
-            "description": repo['description'],
-            "url": repo['html_url']
-        }
-
-        repoInJsonList.append(repoInJson)
+        repoInJsonList.append(repo_record(repo))
 
     return repoInJsonList
 
@@ -0,0 +1,120 @@
+"""
+Streaming reader for the Neo4j hierarchy export (neo4j_full_hierarchy.json).
+
+The export is one top-level JSON array of nodes. Instead of `json.load`-ing
+the whole file, nodes are decoded one at a time from a buffered read, so
+memory stays bounded by the largest node no matter how big the export is.
+ijson is used when it is installed; otherwise a small incremental decoder
+built on `json.JSONDecoder.raw_decode` does the same job.
+"""
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+_WHITESPACE = " \t\r\n"
+
+
+def _iter_array(f, chunk_size):
+    """Yield the elements of a top-level JSON array read from text file `f`."""
+    decoder = json.JSONDecoder()
+    buf, pos = "", 0
+    started = False
+    while True:
+        # skip whitespace and separators, reading more when the buffer runs out
+        while pos < len(buf) and (buf[pos] in _WHITESPACE or (started and buf[pos] == ",")):
+            pos += 1
+        if pos >= len(buf):
+            chunk = f.read(chunk_size)
+            if not chunk:
+                if started:
+                    raise ValueError("Unexpected end of file: hierarchy array is not closed")
+                return
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("Hierarchy export must be a JSON array of nodes")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            node, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # the node continues past the buffer
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield node
+        pos = end
+        if pos >= chunk_size:
+            buf, pos = buf[pos:], 0
+
+
+def _raw_nodes(path, chunk_size):
+    if ijson is not None:
+        with open(path, "rb") as f:
+            yield from ijson.items(f, "item", use_float=True)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from _iter_array(f, chunk_size)
+
+
+def iter_nodes(path=None, offset=0, limit=None, labels=None, chunk_size=None):
+    """
+    Lazily yield hierarchy nodes.
+
+    `offset`/`limit` count nodes after the `labels` filter (a node matches if
+    it has any of the labels), so iter_nodes(offset=90, limit=20) yields the
+    same nodes as json.load(f)[90:110] when no filter is given.
+    """
+    path = path or config.HIERARCHY_PATH
+    chunk_size = chunk_size or config.HIERARCHY_READ_CHUNK
+    wanted = set(labels) if labels else None
+    yielded = skipped = 0
+    if limit is not None and limit <= 0:
+        return
+    for node in _raw_nodes(path, chunk_size):
+        if wanted is not None and not wanted.intersection(node.get("labels") or []):
+            continue
+        if skipped < offset:
+            skipped += 1
+            continue
+        yield node
+        yielded += 1
+        if limit is not None and yielded >= limit:
+            return
+
+
+def iter_batches(batch_size=None, **kwargs):
+    """Nodes from `iter_nodes(**kwargs)` grouped into lists of `batch_size`."""
+    batch_size = batch_size or config.HIERARCHY_BATCH_SIZE
+    batch = []
+    for node in iter_nodes(**kwargs):
+        batch.append(node)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+if __name__ == "__main__":
+    counts = {}
+    for node in iter_nodes(offset=0, limit=None):
+        for label in node.get("labels") or []:
+            counts[label] = counts.get(label, 0) + 1
+    print(f"[INFO] {sum(counts.values())} labels in {config.HIERARCHY_PATH}: {counts}")
@@ -1,5 +1,7 @@
 import streamlit as st
+import config
 import llm_response
+import resources
 from datetime import datetime
 
 # ---------------------------------------------------------------------
@@ -212,6 +214,17 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# ---------------------------------------------------------------------
+# Warm-up: build the query-path clients/models once per server process
+# ---------------------------------------------------------------------
+@st.cache_resource(show_spinner="Loading models...")
+def warm_up_resources():
+    return resources.warm_up(config.APP_WARMUP_COMPONENTS)
+
+
+if config.APP_WARMUP_COMPONENTS:
+    warm_up_resources()
+
 # ---------------------------------------------------------------------
 # Session State & Suggestions
 # ---------------------------------------------------------------------
@@ -252,6 +265,31 @@ def render_suggestion_buttons(show_heading: bool = False, key_prefix: str = "mai
                 st.session_state.pending_prompt = suggestion["text"]
                 st.rerun()
 
+
+def render_source_cards(sources):
+    """Render retrieved tickets as source cards."""
+    for source in sources:
+        tags_html = "".join([f'<span class="tag-badge">{tag}</span>' for tag in source.get('tags', [])])
+        abstract = "No abstract available."
+        score_label = "Fused score (RRF)" if source.get('score_type') == 'rrf' else "Similarity"
+        for rel in source.get('relationships', []):
+            if rel.get('node_type') == 'content' and 'text' in rel.get('node_props', {}):
+                abstract = rel['node_props']['text']
+                break
+        st.markdown(f"""
+        <div class="source-card">
+            <div class="source-title">{source.get('title', 'Untitled')}</div>
+            <div class="source-meta">
+                <strong>Type:</strong> {source.get('type', 'N/A')} | 
+                <strong>{score_label}:</strong> {source.get('similarity', 0)}
+            </div>
+            <div style="margin-top:8px; font-size:0.9em; color:#CCC;">
+                {abstract}
+            </div>
+            <div style="margin-top:8px;">{tags_html}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
 # ---------------------------------------------------------------------
 # Sidebar
 # ---------------------------------------------------------------------
@@ -307,26 +345,7 @@ for message in st.session_state.messages:
         st.markdown(message["content"])
         if "sources" in message and message["sources"]:
             with st.expander("📚 View Retrieved Sources"):
-                for source in message["sources"]:
-                    tags_html = "".join([f'<span class="tag-badge">{tag}</span>' for tag in source.get('tags', [])])
-                    abstract = "No abstract available."
-                    for rel in source.get('relationships', []):
-                        if rel.get('node_type') == 'content' and 'text' in rel.get('node_props', {}):
-                            abstract = rel['node_props']['text']
-                            break
-                    st.markdown(f"""
-                    <div class="source-card">
-                        <div class="source-title">{source.get('title', 'Untitled')}</div>
-                        <div class="source-meta">
-                            <strong>Type:</strong> {source.get('type', 'N/A')} | 
-                            <strong>Similarity:</strong> {source.get('similarity', 0)}
-                        </div>
-                        <div style="margin-top:8px; font-size:0.9em; color:#CCC;">
-                            {abstract}
-                        </div>
-                        <div style="margin-top:8px;">{tags_html}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_source_cards(message["sources"])
 
 prompt = None
 if st.session_state.pending_prompt:
@@ -352,40 +371,23 @@ if prompt:
 
     with st.chat_message("assistant"):
         message_placeholder = st.empty()
-        with st.spinner("Analyzing knowledge graph..."):
-            try:
-                response_data = llm_response.generate_response(prompt)
-                answer = response_data["answer"]
-                sources = response_data["sources"]
-                message_placeholder.markdown(answer)
-                
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": answer,
-                    "sources": sources
-                })
-                
-                if sources:
-                    with st.expander("📚 View Retrieved Sources", expanded=True):
-                        for source in sources:
-                            tags_html = "".join([f'<span class="tag-badge">{tag}</span>' for tag in source.get('tags', [])])
-                            abstract = "No abstract available."
-                            for rel in source.get('relationships', []):
-                                if rel.get('node_type') == 'content' and 'text' in rel.get('node_props', {}):
-                                    abstract = rel['node_props']['text']
-                                    break
-                            st.markdown(f"""
-                            <div class="source-card">
-                                <div class="source-title">{source.get('title', 'Untitled')}</div>
-                                <div class="source-meta">
-                                    <strong>Type:</strong> {source.get('type', 'N/A')} | 
-                                    <strong>Similarity:</strong> {source.get('similarity', 0)}
-                                </div>
-                                <div style="margin-top:8px; font-size:0.9em; color:#CCC;">
-                                    {abstract}
-                                </div>
-                                <div style="margin-top:8px;">{tags_html}</div>
-                            </div>
-                            """, unsafe_allow_html=True)
-            except Exception as e:
-                st.error(f"An error occurred: {e}")
+        try:
+            with st.spinner("Analyzing knowledge graph..."):
+                response_data = llm_response.generate_response_stream(prompt)
+            sources = response_data["sources"]
+
+            # Sources are ready before the answer; show them while tokens stream in
+            if sources:
+                with st.expander("📚 View Retrieved Sources", expanded=True):
+                    render_source_cards(sources)
+
+            with message_placeholder.container():
+                answer = st.write_stream(response_data["stream"])
+
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": answer,
+                "sources": sources
+            })
+        except Exception as e:
+            st.error(f"An error occurred: {e}")
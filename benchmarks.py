@@ -0,0 +1,615 @@
+"""
+Performance benchmarks for the TrendScout AI pipeline.
+
+Run against a scratch Neo4j database: benchmarks write synthetic `bench-*`
+tickets and may drop/recreate indexes.
+
+    python benchmarks.py schema --sizes 1000 5000 20000 --batch 200
+    python benchmarks.py extractors
+    python benchmarks.py startup
+    python benchmarks.py embeddings --variants fp32 int8 onnx onnx-int8
+    python benchmarks.py embedding-parity --limit 500
+    python benchmarks.py ann --top-k 10
+    python benchmarks.py payload
+    python benchmarks.py github-harvest    # local mock server, no network
+    python benchmarks.py hierarchy-load --size-mb 2048
+    python benchmarks.py bulk-export --count 100000 --merge-sample 2000
+"""
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import config
+import metadataToNeo4j as pipeline
+import resources
+from metadataToNeo4j import TicketSchema
+
+
+BENCH_PREFIX = "bench-"
+EMBEDDING_DIM = 768
+BENCH_TAGS = ["AI", "LLM", "Fintech", "Robotics", "Health", "Climate", "SaaS", "Security",
+              "Startup", "Open Source", "Music", "Construction", "Edge AI", "Agents", "Data"]
+BENCH_LOCATIONS = ["Austin, Texas", "San Francisco, California", "New York, New York",
+                   "Cambridge, Massachusetts", "Seattle, Washington", "London, UK"]
+
+
+# ---------------------------------------------------------------------
+# Synthetic data helpers
+# ---------------------------------------------------------------------
+def synthetic_tickets(start: int, count: int, dim: int = EMBEDDING_DIM) -> List[TicketSchema]:
+    rng = random.Random(start)
+    tickets = []
+    for i in range(start, start + count):
+        vec = [rng.gauss(0, 1) for _ in range(dim)]
+        norm = sum(v * v for v in vec) ** 0.5
+        tickets.append(TicketSchema(
+            ticket_id=f"{BENCH_PREFIX}{i}",
+            title=f"Synthetic startup {i}",
+            type="bench",
+            title_embedding=[v / norm for v in vec],
+            metadata={"published": "", "author_name": "", "feed_title": "bench",
+                      "location": rng.choice(BENCH_LOCATIONS)},
+            description={"description": f"Synthetic description for benchmark ticket {i}."},
+            source={"source": "bench"},
+            tags=rng.sample(BENCH_TAGS, 3),
+        ))
+    return tickets
+
+
+def cleanup_bench_data():
+    with resources.get_neo4j_driver().session() as s:
+        s.run(f"""
+        MATCH (n) WHERE n.ticket_id STARTS WITH '{BENCH_PREFIX}' OR n.parent_id STARTS WITH '{BENCH_PREFIX}'
+        CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF 5000 ROWS
+        """).consume()
+
+
+# ---------------------------------------------------------------------
+# Schema benchmark: ingest time vs. corpus size, with and without indexes
+# ---------------------------------------------------------------------
+ENTITY_INDEXES = ["entity_parent_type", "entity_parent_type_name", "entity_type_name", "entity_lookup_fulltext"]
+
+
+def bench_schema(sizes: List[int], batch: int):
+    results = []
+    for indexed in (False, True):
+        cleanup_bench_data()
+        if indexed:
+            pipeline.init_schema(EMBEDDING_DIM)
+        else:
+            with resources.get_neo4j_driver().session() as s:
+                for name in ENTITY_INDEXES:
+                    s.run(f"DROP INDEX {name} IF EXISTS").consume()
+
+        corpus = 0
+        for size in sorted(sizes):
+            if size > corpus:
+                pipeline.ingest_to_neo4j(synthetic_tickets(corpus, size - corpus))
+                corpus = size
+            probe = synthetic_tickets(corpus, batch)
+            t0 = time.time()
+            pipeline.ingest_to_neo4j(probe)
+            elapsed = time.time() - t0
+            corpus += batch
+            results.append((indexed, size, elapsed))
+
+    cleanup_bench_data()
+    pipeline.init_schema(EMBEDDING_DIM)
+
+    print(f"\n=== Ingest {batch} tickets on top of an existing corpus ===")
+    print(f"{'corpus':>10} | {'no entity indexes':>18} | {'with indexes':>13}")
+    by_key = {(ix, n): t for ix, n, t in results}
+    for size in sorted(sizes):
+        print(f"{size:>10} | {by_key[(False, size)]:>17.2f}s | {by_key[(True, size)]:>12.2f}s")
+
+
+# ---------------------------------------------------------------------
+# Entity extractor comparison: local gazetteer vs. GPT (reference)
+# ---------------------------------------------------------------------
+EXTRACTOR_QUERIES = [
+    "Which startups are building AI products in Texas?",
+    "Startups based in San Francisco, California",
+    "Startup related to content creation",
+    "Artificial Intelligence startups",
+    "Show me recent AI-related TechCrunch articles",
+    "Open source LLM agent frameworks on GitHub",
+    "AI music generation companies in Massachusetts",
+    "Construction technology startups in California",
+]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _overlap(predicted: List[str], reference: List[str]) -> int:
+    """Matches counted loosely (case-insensitive containment), like the retriever filters."""
+    pred = [p.lower() for p in predicted]
+    return sum(1 for r in reference if any(r.lower() in p or p in r.lower() for p in pred))
+
+
+def bench_extractors(queries: List[str]):
+    import retriever
+    import local_extractor
+
+    if retriever._entity_cache is not None:
+        retriever._entity_cache.clear()
+    version = retriever.current_graph_version()
+    local_extractor.get_gazetteer(resources.get_neo4j_driver(), version)  # build outside the timed loop
+
+    latencies: Dict[str, List[float]] = {"llm": [], "local": []}
+    totals = {field: {"tp": 0, "pred": 0, "ref": 0} for field in ("tags", "locations", "sources")}
+    for q in queries:
+        t0 = time.perf_counter()
+        ref = retriever.extract_entities_with_gpt4(q)
+        latencies["llm"].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        local = local_extractor.extract_entities_local(q, resources.get_neo4j_driver(), version)
+        latencies["local"].append(time.perf_counter() - t0)
+
+        print(f"\n{q}\n  llm:   {ref[:3]}\n  local: {local[:3]}")
+        for idx, field in enumerate(("tags", "locations", "sources")):
+            totals[field]["tp"] += _overlap(local[idx], ref[idx])
+            totals[field]["pred"] += len(local[idx])
+            totals[field]["ref"] += len(ref[idx])
+
+    print("\n=== Latency (s) ===")
+    for name, vals in latencies.items():
+        print(f"{name:>6}: p50 {statistics.median(vals):.4f}  p95 {_percentile(vals, 95):.4f}  mean {statistics.mean(vals):.4f}")
+    print("\n=== Local extractor vs. GPT reference ===")
+    for field, t in totals.items():
+        precision = t["tp"] / t["pred"] if t["pred"] else 0.0
+        recall = t["tp"] / t["ref"] if t["ref"] else 0.0
+        print(f"{field:>10}: precision {precision:.2f}  recall {recall:.2f}")
+
+
+# ---------------------------------------------------------------------
+# Startup cost: module import time (fresh interpreter) and lazy warm-up
+# ---------------------------------------------------------------------
+STARTUP_MODULES = ["retriever", "metadataToNeo4j", "llm_response"]
+
+
+def bench_startup(modules: List[str], components: List[str]):
+    print("=== Import time in a fresh interpreter ===")
+    for module in modules:
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+        print(f"{module:>18}: {time.perf_counter() - t0:.2f}s")
+
+    print("\n=== Warm-up ===")
+    resources.warm_up(components)
+
+
+# ---------------------------------------------------------------------
+# Embedding service: throughput per dtype/quantization, parity with Neo4j
+# ---------------------------------------------------------------------
+EMBEDDING_VARIANTS = {
+    "fp32": {"dtype": "fp32"},
+    "bf16": {"dtype": "bf16"},
+    "int8": {"dtype": "fp32", "quantize_int8": True},
+    "onnx": {"backend": "onnx"},
+    "onnx-int8": {"backend": "onnx", "quantize_int8": True},
+}
+EMBEDDING_TOLERANCE = {
+    "onnx": config.ONNX_COSINE_TOLERANCE,
+    "onnx-int8": config.ONNX_INT8_COSINE_TOLERANCE,
+}
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    na = sum(x * x for x in a) ** 0.5
+    nb = sum(y * y for y in b) ** 0.5
+    return dot / (na * nb) if na and nb else 0.0
+
+
+def _sample_titles(limit: int) -> List[str]:
+    with resources.get_neo4j_driver().session() as s:
+        rows = s.run("MATCH (t:Ticket) WHERE t.title IS NOT NULL RETURN t.title AS title LIMIT $n", n=limit).data()
+    titles = [r["title"] for r in rows]
+    return titles or [t.title for t in synthetic_tickets(0, limit, dim=1)]
+
+
+def bench_embeddings(variants: List[str], count: int, batch_size: int, threads: int = None):
+    import embeddings
+
+    texts = [embeddings.with_prefix(t, embeddings.PASSAGE_PREFIX) for t in _sample_titles(count)]
+    queries = [embeddings.with_prefix(q, embeddings.QUERY_PREFIX) for q in EXTRACTOR_QUERIES]
+    reference = None
+    rows = []
+    for name in variants:
+        embedder = embeddings.build_embedder(num_threads=threads, **EMBEDDING_VARIANTS[name])
+        embedder.encode(queries[:1])  # warm-up
+
+        latencies = []
+        for q in queries * 3:
+            t0 = time.perf_counter()
+            embedder.encode([q])
+            latencies.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        vectors = embedder.encode(texts, batch_size)
+        throughput = len(texts) / (time.perf_counter() - t0)
+
+        if reference is None:
+            reference = vectors
+        cosines = [_cosine(a, b) for a, b in zip(vectors, reference)]
+        rows.append((name, statistics.median(latencies), _percentile(latencies, 95), throughput, min(cosines)))
+
+    print(f"\n=== Embedding ({len(texts)} texts, batch {batch_size}) ===")
+    print(f"{'variant':>9} | {'p50 query':>10} | {'p95 query':>10} | {'texts/s':>8} | {'min cos vs ' + variants[0]:>14}")
+    ok = True
+    for name, p50, p95, tps, cos in rows:
+        tolerance = EMBEDDING_TOLERANCE.get(name)
+        verdict = "" if tolerance is None or variants[0] != "fp32" else ("  ✅" if cos >= tolerance else f"  ❌ < {tolerance}")
+        ok = ok and "❌" not in verdict
+        print(f"{name:>9} | {p50 * 1000:>8.1f}ms | {p95 * 1000:>8.1f}ms | {tps:>8.1f} | {cos:>14.4f}{verdict}")
+    return ok
+
+
+def bench_embedding_parity(limit: int, tolerance: float) -> bool:
+    """Re-embed stored titles with the shared service and compare with title_embedding.
+
+    Returns False (the CLI then exits non-zero) if any cosine is below `tolerance`.
+    """
+    import embeddings
+
+    with resources.get_neo4j_driver().session() as s:
+        rows = s.run("""
+        MATCH (t:Ticket) WHERE t.title IS NOT NULL AND t.title_embedding IS NOT NULL
+        RETURN t.ticket_id AS id, t.title AS title, t.title_embedding AS emb LIMIT $n
+        """, n=limit).data()
+    if not rows:
+        print("⚠️ No embedded tickets found.")
+        return True
+
+    vectors = embeddings.embed_passages([r["title"] for r in rows])
+    cosines = [_cosine(v, r["emb"]) for v, r in zip(vectors, rows)]
+    below = [(c, r["id"]) for c, r in zip(cosines, rows) if c < tolerance]
+    print(f"\n=== Parity with stored title_embedding ({len(rows)} tickets) ===")
+    print(f"min {min(cosines):.5f}  mean {statistics.mean(cosines):.5f}  below {tolerance}: {len(below)}")
+    for c, ticket_id in sorted(below)[:10]:
+        print(f"   {ticket_id}: {c:.5f}")
+    print("✅ parity within tolerance" if not below else f"❌ {len(below)} tickets below {tolerance}")
+    return not below
+
+
+# ---------------------------------------------------------------------
+# ANN: Neo4j vector index vs. local snapshot + hydration
+# ---------------------------------------------------------------------
+def bench_ann(queries: List[str], top_k: int, repeat: int):
+    import embeddings
+    import local_index
+    import retriever
+
+    config.LOCAL_VECTOR_INDEX_ENABLED = True
+    driver = resources.get_neo4j_driver()
+    index = local_index.ensure_fresh(driver, retriever.current_graph_version())
+    vectors = embeddings.embed_queries(queries)
+
+    latencies: Dict[str, List[float]] = {"neo4j": [], "local": [], "local_search_only": []}
+    overlap = []
+    with driver.session() as s:
+        for qv in vectors * repeat:
+            t0 = time.perf_counter()
+            remote = s.execute_read(lambda tx: tx.run(retriever.vector_index_cypher(), qv=qv, top_k=top_k).data())
+            latencies["neo4j"].append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            hits = retriever.local_ann_hits(qv, top_k)
+            latencies["local_search_only"].append(time.perf_counter() - t0)
+            local = s.execute_read(lambda tx: tx.run(retriever.HYDRATE_CYPHER, hits=hits).data())
+            latencies["local"].append(time.perf_counter() - t0)
+
+            ids = {r["ticket_id"] for r in remote}
+            overlap.append(len(ids & {r["ticket_id"] for r in local}) / max(1, len(ids)))
+
+    print(f"\n=== ANN top-{top_k} over {index.size} vectors ({len(vectors) * repeat} queries) ===")
+    for name, vals in latencies.items():
+        print(f"{name:>18}: p50 {statistics.median(vals) * 1000:.1f}ms  p95 {_percentile(vals, 95) * 1000:.1f}ms")
+    print(f"{'recall vs neo4j':>18}: {statistics.mean(overlap):.2f}")
+
+
+# ---------------------------------------------------------------------
+# Retrieval payload and prompt size: full node properties + raw JSON vs.
+# projected fields + compact context
+# ---------------------------------------------------------------------
+LEGACY_CONTEXT_RETURN = """
+        OPTIONAL MATCH (t)-[:HAS_TAG]->(tag:Entity)
+        WITH t, sim, collect(tag.name) AS tag_names
+        OPTIONAL MATCH (t)-[r]->(n:Entity)
+        WITH t, sim, tag_names, collect({rel: type(r), node: n}) AS related
+        RETURN t.ticket_id AS ticket_id, t.title AS title, t.type AS type, tag_names AS tags, sim,
+        [x IN related | {relationship: x.rel, node_type: x.node.type, node_props: properties(x.node)}] AS relationships
+        ORDER BY sim DESC
+"""
+
+
+def bench_payload(queries: List[str], top_k: int, top_n: int):
+    import embeddings
+    import retriever
+    from context_builder import build_context, count_tokens
+
+    legacy_query = """
+        CALL db.index.vector.queryNodes('ticket_title_embedding', $top_k, $qv)
+        YIELD node AS t, score AS sim
+    """ + LEGACY_CONTEXT_RETURN
+    totals = {"before_bytes": [], "after_bytes": [], "before_tokens": [], "after_tokens": []}
+    with resources.get_neo4j_driver().session() as s:
+        for q, qv in zip(queries, embeddings.embed_queries(queries)):
+            before = s.execute_read(lambda tx: tx.run(legacy_query, qv=qv, top_k=top_k).data())
+            after = s.execute_read(lambda tx: tx.run(retriever.VECTOR_INDEX_CYPHER, qv=qv, top_k=top_k).data())
+            before_prompt = json.dumps(retriever.parse_results(before, top_n), ensure_ascii=False)
+            after_prompt, _ = build_context(retriever.parse_results(after, top_n))
+            row = (retriever.payload_bytes(before), retriever.payload_bytes(after),
+                   count_tokens(before_prompt), count_tokens(after_prompt))
+            for key, value in zip(totals, row):
+                totals[key].append(value)
+            print(f"{q[:48]:<48} bytes {row[0]:>7} -> {row[1]:>6}   prompt tokens {row[2]:>6} -> {row[3]:>5}")
+
+    print("\n=== Mean per query ===")
+    print(f"bytes transferred: {statistics.mean(totals['before_bytes']):.0f} -> {statistics.mean(totals['after_bytes']):.0f}")
+    print(f"prompt tokens:     {statistics.mean(totals['before_tokens']):.0f} -> {statistics.mean(totals['after_tokens']):.0f}")
+
+
+# ---------------------------------------------------------------------
+# GitHub harvester against a local mock of the search API
+# ---------------------------------------------------------------------
+def bench_github_harvest(queries: int, total: int, max_results: int, per_page: int, quota: int,
+                         window: float, throttle_every: int):
+    import os
+    import tempfile
+
+    from Data_Scraping import data_github
+    from tests.github_mock import mock_github_server
+
+    server, state = mock_github_server(total, quota, window, throttle_every)
+    url = f"http://127.0.0.1:{server.server_port}/search/repositories"
+    config.GITHUB_PER_PAGE = per_page
+    query_list = [f"mock{i} topic:llm" for i in range(queries)]
+    expected = queries * min(total, max_results)
+    cache_path = os.path.join(tempfile.mkdtemp(), "etag_cache.json")
+
+    runs = []
+    for label in ("cold", "warm (ETag)"):
+        before = dict(state)
+        start = time.time()
+        repos = data_github.harvest(query_list, max_results=max_results, url=url, cache_path=cache_path)
+        runs.append((label, repos, time.time() - start, {k: state[k] - before[k] for k in state
+                                                          if k not in ("remaining", "reset_at")}))
+    server.shutdown()
+
+    print("\n=== GitHub harvester vs. mock search API ===")
+    print(f"{'run':<12} {'repos':>6} {'secs':>6} {'requests':>9} {'charged':>8} {'304':>5} {'429':>5} {'403':>5}")
+    for label, repos, dur, d in runs:
+        print(f"{label:<12} {len(repos):>6} {dur:>6.2f} {d['requests']:>9} {d['charged']:>8} "
+              f"{d['not_modified']:>5} {d['throttled']:>5} {d['over_quota']:>5}")
+    cold, warm = runs[0][3], runs[1][3]
+    checks = [
+        ("all pages harvested", all(len(r[1]) == expected for r in runs)),
+        ("no duplicate repos", all(len({x['full_name'] for x in r[1]}) == len(r[1]) for r in runs)),
+        ("never exceeded the quota", cold["over_quota"] + warm["over_quota"] == 0),
+        ("429 Retry-After honored", not throttle_every or cold["throttled"] > 0),
+        ("warm run costs no quota", warm["charged"] == 0),
+    ]
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+
+# ---------------------------------------------------------------------
+# Streaming hierarchy loader vs. json.load
+# ---------------------------------------------------------------------
+HIERARCHY_LOAD_SCRIPT = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+from Data_Scraping import data_hierarchy
+start = time.perf_counter()
+if {mode!r} == "json.load":
+    with open({path!r}, encoding="utf-8") as f:
+        nodes = len(json.load(f))
+else:
+    nodes = sum(len(b) for b in data_hierarchy.iter_batches(path={path!r}, limit=None))
+seconds = time.perf_counter() - start
+# ru_maxrss is in KiB on Linux
+print(json.dumps({{"nodes": nodes, "seconds": seconds,
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+
+def write_synthetic_hierarchy(path: str, size_mb: int) -> int:
+    """Write a hierarchy export of about `size_mb` MB by cycling the real nodes with fresh ids."""
+    from Data_Scraping import data_hierarchy
+
+    template = list(data_hierarchy.iter_nodes(limit=None))
+    target, written, count = size_mb * 1024 * 1024, 0, 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        while written < target:
+            node = dict(template[count % len(template)])
+            props = dict(node.get("properties") or {})
+            for key in ("startup_id", "repo_id", "article_id", "name", "title"):
+                if key in props:
+                    props[key] = f"{props[key]}-{count}"
+            node.update(id=count, properties=props)
+            text = ("," if count else "") + json.dumps(node, ensure_ascii=False, indent=2)
+            f.write(text)
+            written += len(text.encode("utf-8"))
+            count += 1
+        f.write("\n]\n")
+    return count
+
+
+def bench_hierarchy_load(size_mb: int, modes: List[str], keep: bool):
+    import os
+    import tempfile
+
+    from Data_Scraping import data_hierarchy
+
+    path = os.path.join(tempfile.mkdtemp(), "synthetic_hierarchy.json")
+    start = time.time()
+    count = write_synthetic_hierarchy(path, size_mb)
+    size = os.path.getsize(path) / 1e6
+    print(f"📝 Wrote {count} nodes ({size:.0f} MB) in {time.time() - start:.1f}s to {path}")
+    print(f"   streaming parser: {'ijson' if data_hierarchy.ijson is not None else 'json.raw_decode'}")
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    print(f"\n{'loader':<10} {'nodes':>10} {'secs':>8} {'nodes/s':>10} {'MB/s':>7} {'peak RSS MB':>12}")
+    for mode in modes:
+        script = HIERARCHY_LOAD_SCRIPT.format(root=root, mode=mode, path=path)
+        proc = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{mode:<10} failed: {(proc.stderr.strip().splitlines() or ['killed (out of memory?)'])[-1]}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{mode:<10} {r['nodes']:>10} {r['seconds']:>8.2f} {r['nodes'] / r['seconds']:>10.0f} "
+              f"{size / r['seconds']:>7.1f} {r['peak_rss_mb']:>12.1f}")
+    if not keep:
+        os.remove(path)
+
+
+# ---------------------------------------------------------------------
+# Bulk-import files (neo4j-admin) vs. MERGE ingestion
+# ---------------------------------------------------------------------
+def bench_bulk_export(count: int, batch: int, chunks_per_ticket: int, merge_sample: int, out_dir: str = None):
+    import os
+    import shutil
+    import tempfile
+
+    keep = out_dir is not None
+    out_dir = out_dir or tempfile.mkdtemp(prefix="bulk-import-")
+    writer = pipeline.BulkImportWriter(out_dir)
+    start = time.time()
+    for offset in range(0, count, batch):
+        tickets = synthetic_tickets(offset, min(batch, count - offset))
+        chunks = {t.ticket_id: [{"chunk_id": f"{t.ticket_id}:{seq}", "seq": seq,
+                                 "text": f"Chunk {seq} of {t.title}.\nSecond line, with \"quotes\".",
+                                 "embedding": t.title_embedding} for seq in range(chunks_per_ticket)]
+                  for t in tickets}
+        writer.add(tickets, {t.ticket_id: f"hash-{t.ticket_id}" for t in tickets}, chunks)
+    manifest = writer.close()
+    write_secs = time.time() - start
+    size_mb = sum(os.path.getsize(os.path.join(out_dir, f["path"])) for f in manifest["files"].values()) / 1e6
+
+    start = time.time()
+    problems = pipeline.validate_bulk_files(out_dir)
+    validate_secs = time.time() - start
+
+    print(f"\n=== Bulk-import files for {count} tickets ({manifest['graph_model']} graph model) ===")
+    for name, f in manifest["files"].items():
+        print(f"{name:<20} {f['kind']:<14} {f['rows']:>10} rows")
+    print(f"wrote {size_mb:.0f} MB in {write_secs:.2f}s ({count / write_secs:.0f} tickets/s), "
+          f"validated in {validate_secs:.2f}s")
+    for problem in problems[:20]:
+        print(f"❌ {problem}")
+    print("✅ file shape valid" if not problems else f"❌ {len(problems)} problems")
+
+    if merge_sample:
+        cleanup_bench_data()
+        tickets = synthetic_tickets(0, merge_sample)
+        start = time.time()
+        pipeline.ingest_to_neo4j(tickets)
+        merge_secs = time.time() - start
+        cleanup_bench_data()
+        rate = merge_sample / merge_secs
+        print(f"MERGE ingestion: {rate:.0f} tickets/s -> ~{count / rate / 60:.1f} min for {count} tickets "
+              f"(file export {write_secs / 60:.1f} min + neo4j-admin import)")
+
+    print(f"\nLoad into an empty database with:\n{pipeline.bulk_import_command(out_dir)}")
+    if not keep and not problems:
+        shutil.rmtree(out_dir)
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p_schema = sub.add_parser("schema", help="ingest time vs. corpus size before/after Entity indexes")
+    p_schema.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    p_schema.add_argument("--batch", type=int, default=200)
+
+    p_extract = sub.add_parser("extractors", help="accuracy/latency of the local entity extractor vs. GPT")
+    p_extract.add_argument("--queries", nargs="+", default=EXTRACTOR_QUERIES)
+
+    p_startup = sub.add_parser("startup", help="import time of the main modules and per-component warm-up cost")
+    p_startup.add_argument("--modules", nargs="+", default=STARTUP_MODULES)
+    p_startup.add_argument("--components", nargs="+", default=list(resources.WARMUP_COMPONENTS))
+
+    p_embed = sub.add_parser("embeddings", help="query latency and batch throughput per backend/dtype/quantization")
+    p_embed.add_argument("--variants", nargs="+", default=list(EMBEDDING_VARIANTS), choices=list(EMBEDDING_VARIANTS))
+    p_embed.add_argument("--count", type=int, default=512)
+    p_embed.add_argument("--batch-size", type=int, default=32)
+    p_embed.add_argument("--threads", type=int, default=None)
+
+    p_parity = sub.add_parser("embedding-parity", help="cosine of re-embedded titles vs. stored title_embedding")
+    p_parity.add_argument("--limit", type=int, default=500)
+    p_parity.add_argument("--tolerance", type=float, default=config.EMBEDDING_PARITY_TOLERANCE)
+
+    p_ann = sub.add_parser("ann", help="Neo4j vector index vs. local snapshot search + hydration")
+    p_ann.add_argument("--queries", nargs="+", default=EXTRACTOR_QUERIES)
+    p_ann.add_argument("--top-k", type=int, default=10)
+    p_ann.add_argument("--repeat", type=int, default=5)
+
+    p_payload = sub.add_parser("payload", help="bytes transferred and prompt tokens before/after the projection")
+    p_payload.add_argument("--queries", nargs="+", default=EXTRACTOR_QUERIES)
+    p_payload.add_argument("--top-k", type=int, default=10)
+    p_payload.add_argument("--top-n", type=int, default=5)
+
+    p_github = sub.add_parser("github-harvest", help="paging, rate limits and ETag reuse against a local mock GitHub")
+    p_github.add_argument("--queries", type=int, default=3)
+    p_github.add_argument("--total", type=int, default=250)
+    p_github.add_argument("--max-results", type=int, default=200)
+    p_github.add_argument("--per-page", type=int, default=50)
+    p_github.add_argument("--quota", type=int, default=6)
+    p_github.add_argument("--window", type=float, default=2.0)
+    p_github.add_argument("--throttle-every", type=int, default=5)
+
+    p_hier = sub.add_parser("hierarchy-load", help="peak RSS and throughput of streaming vs. json.load on a synthetic export")
+    p_hier.add_argument("--size-mb", type=int, default=2048)
+    p_hier.add_argument("--modes", nargs="+", default=["stream", "json.load"], choices=["stream", "json.load"])
+    p_hier.add_argument("--keep", action="store_true", help="keep the synthetic export")
+
+    p_bulk = sub.add_parser("bulk-export", help="neo4j-admin import file export throughput and shape check vs. MERGE")
+    p_bulk.add_argument("--count", type=int, default=100000)
+    p_bulk.add_argument("--batch", type=int, default=5000)
+    p_bulk.add_argument("--chunks-per-ticket", type=int, default=2)
+    p_bulk.add_argument("--merge-sample", type=int, default=0, help="also time MERGE ingestion of this many tickets")
+    p_bulk.add_argument("--out-dir", default=None, help="keep the files here")
+
+    args = ap.parse_args()
+    if args.command == "schema":
+        bench_schema(args.sizes, args.batch)
+    elif args.command == "extractors":
+        bench_extractors(args.queries)
+    elif args.command == "startup":
+        bench_startup(args.modules, args.components)
+    elif args.command == "embeddings":
+        if not bench_embeddings(args.variants, args.count, args.batch_size, args.threads):
+            sys.exit(1)
+    elif args.command == "embedding-parity":
+        if not bench_embedding_parity(args.limit, args.tolerance):
+            sys.exit(1)
+    elif args.command == "ann":
+        bench_ann(args.queries, args.top_k, args.repeat)
+    elif args.command == "payload":
+        bench_payload(args.queries, args.top_k, args.top_n)
+    elif args.command == "github-harvest":
+        bench_github_harvest(args.queries, args.total, args.max_results, args.per_page, args.quota,
+                             args.window, args.throttle_every)
+    elif args.command == "hierarchy-load":
+        bench_hierarchy_load(args.size_mb, args.modes, args.keep)
+    elif args.command == "bulk-export":
+        bench_bulk_export(args.count, args.batch, args.chunks_per_ticket, args.merge_sample, args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
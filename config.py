@@ -15,3 +15,182 @@ E5_MODEL_NAME = "intfloat/e5-base-v2"
 LLM_BACKEND = "openai"  # options: 'ollama' or 'openai'
 # If using OpenAI as backend, specify the model name (can also be set via OPENAI_MODEL env var)
 OPENAI_MODEL = "gpt-4o"
+# --- INGESTION NORMALIZATION CONFIG ---
+# Number of records normalized concurrently by the LLM worker pool.
+NORMALIZE_CONCURRENCY = 8
+# Per-request LLM timeout in seconds.
+NORMALIZE_TIMEOUT = 60
+# Retries (with exponential backoff) when the LLM output fails to parse or times out.
+NORMALIZE_MAX_RETRIES = 2
+NORMALIZE_RETRY_BACKOFF = 1.0
+# Records with a known source shape (RSS, GitHub, StartupSavant export) skip the
+# full LLM normalization. When they carry no tags, optionally ask the LLM for tags only.
+FAST_PATH_LLM_TAGS = True
+# On-disk cache of normalized tickets keyed by raw-record hash + prompt/schema version.
+NORMALIZE_CACHE_ENABLED = True
+NORMALIZE_CACHE_PATH = ".cache/normalize_cache.sqlite"
+NORMALIZE_CACHE_MAX_ENTRIES = 50000
+# Skip records whose natural key + content hash already exist in Neo4j.
+INCREMENTAL_INGESTION = True
+INCREMENTAL_CHECK_BATCH = 5000
+# --- NEO4J WRITER CONFIG ---
+NEO4J_WRITE_BATCH_SIZE = 500
+# Concurrent write sessions; keep at 1 if batches touch shared nodes heavily.
+NEO4J_WRITE_CONCURRENCY = 2
+# Seconds execute_write keeps retrying transient errors (deadlocks, leader switches).
+NEO4J_WRITE_RETRY_TIME = 30
+# Max seconds init_schema waits for index population before ingestion proceeds.
+NEO4J_INDEX_WAIT_TIMEOUT = 300
+# --- GRAPH MODEL ---
+# 'per_ticket': private tag/source nodes per ticket (original layout).
+# 'shared': canonical Tag/Source/Location nodes linked from many tickets.
+# Run metadataToNeo4j.migrate_to_shared_graph() once before switching to 'shared'.
+GRAPH_MODEL = "per_ticket"
+# --- RETRIEVAL CONFIG ---
+# Filtered search uses exact KNN when at most this many tickets match the filters...
+PREFILTER_MAX_CANDIDATES = 2000
+# ...otherwise ANN with over-fetch (top_k * OVERFETCH to start), widened up to MAX_K.
+FILTERED_ANN_OVERFETCH = 5
+FILTERED_ANN_MAX_K = 2000
+# --- QUERY CACHE CONFIG ---
+QUERY_CACHE_ENABLED = True
+QUERY_CACHE_MAX_ENTRIES = 1000
+# Seconds before cached entities / embeddings / results expire.
+QUERY_CACHE_TTL_ENTITIES = 24 * 3600
+QUERY_CACHE_TTL_EMBEDDINGS = 7 * 24 * 3600
+QUERY_CACHE_TTL_RESULTS = 3600
+# Set to a file path (e.g. ".cache/query_cache.sqlite") to persist caches across restarts.
+QUERY_CACHE_PATH = None
+# How often (seconds) retriever re-reads the GraphVersion counter written by ingestion.
+GRAPH_VERSION_CHECK_INTERVAL = 30
+# Query entity extractor: 'llm' (GPT-4o-mini) or 'local' (gazetteer built from the graph).
+ENTITY_EXTRACTOR = "llm"
+# With 'local', call the LLM when the gazetteer finds no tags/locations/sources.
+ENTITY_EXTRACTOR_LLM_FALLBACK = True
+# difflib similarity cutoff for fuzzy single-token matches (None disables fuzzy matching).
+LOCAL_EXTRACTOR_FUZZY_CUTOFF = 0.85
+# Use the asyncio retrieval pipeline (retriever_async) behind llm_response/app.
+ASYNC_RETRIEVAL = False
+# Thread pool size for embedding calls made from the async pipeline.
+ASYNC_EMBED_WORKERS = 2
+# Without filters, answer from the speculative raw-query ANN search instead of re-searching with the summary.
+ASYNC_REUSE_SPECULATIVE = True
+# --- STARTUP / LAZY INIT CONFIG ---
+# Clients and models are created on first use (resources.py). The Streamlit
+# app builds these eagerly once per server process so the first query does
+# not pay for the model load; set to [] to load on demand instead.
+APP_WARMUP_COMPONENTS = ["neo4j", "openai", "embedder"]
+# --- EMBEDDING SERVICE CONFIG ---
+# One E5 model instance serves both ingestion (passage: ...) and queries
+# (query: ...). bf16 halves memory on CPUs with native support; dynamic int8
+# quantization (CPU, fp32 only) trades a little accuracy for speed -- check
+# it with `python benchmarks.py embedding-parity`.
+EMBEDDING_BACKEND = "torch"       # "torch" | "onnx"
+EMBEDDING_DEVICE = "cpu"
+EMBEDDING_DTYPE = "fp32"          # "fp32" | "bf16"
+EMBEDDING_NUM_THREADS = None      # torch intra-op threads; None = torch default
+EMBEDDING_QUANTIZE_INT8 = False
+EMBEDDING_BATCH_SIZE = 32
+EMBEDDING_MAX_LENGTH = 512
+# Minimum cosine between re-embedded titles and the stored title_embedding values
+# (tests/test_embedding_parity.py, `benchmarks.py embedding-parity`); independent of the ONNX bounds.
+EMBEDDING_PARITY_TOLERANCE = 0.999
+# ONNX Runtime backend (EMBEDDING_BACKEND = "onnx"): the model is exported to
+# ONNX_MODEL_DIR on first use. Expected cosine vs. torch fp32 vectors:
+ONNX_MODEL_DIR = ".cache/onnx"
+ONNX_QUANTIZE_INT8 = False
+ONNX_COSINE_TOLERANCE = 0.9999
+ONNX_INT8_COSINE_TOLERANCE = 0.99
+# Persistent embedding cache: (model/backend, prefix, text) hash -> float32
+# vector. Compact with `python embedding_cache.py`.
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_PATH = ".cache/embedding_cache.sqlite"
+EMBEDDING_CACHE_MAX_ENTRIES = 500000
+# --- DESCRIPTION CHUNK CONFIG ---
+# Descriptions/summaries are split into token windows, embedded as :Chunk
+# nodes (vector index chunk_embedding) and searched alongside titles; chunk
+# hits are aggregated back to their Ticket with max or sum of scores.
+# Off by default: on an existing database run `python metadataToNeo4j.py --backfill-chunks`
+# first (creates the chunk_embedding index and chunks the tickets already stored), then enable.
+CHUNK_EMBEDDINGS_ENABLED = False
+CHUNK_MAX_TOKENS = 500            # 512 minus the "passage: " prefix and [CLS]/[SEP]
+CHUNK_OVERLAP_TOKENS = 64
+# "sum" adds every chunk on pre-filtered (exact) searches but only the chunks the
+# ANN index returned otherwise, so its scores are comparable within a search, not across paths.
+CHUNK_SCORE_AGGREGATION = "max"   # "max" | "sum"
+CHUNK_SEARCH_OVERFETCH = 3        # chunk neighbours fetched per requested ticket
+# --- HYBRID RETRIEVAL CONFIG ---
+# "hybrid" runs a fulltext search (ticket_text_fulltext on titles and
+# content) next to the vector search and fuses both rankings with reciprocal
+# rank fusion: score = sum(weight / (HYBRID_RRF_K + rank)).
+RETRIEVAL_MODE = "vector"         # "vector" | "hybrid"
+HYBRID_VECTOR_WEIGHT = 1.0
+HYBRID_LEXICAL_WEIGHT = 1.0
+HYBRID_RRF_K = 60
+HYBRID_LEXICAL_OVERFETCH = 5      # fulltext hits fetched per requested ticket (title + content)
+# --- LOCAL VECTOR INDEX CONFIG ---
+# Unfiltered ANN against an in-process, memory-mapped float32 copy of the
+# title/chunk embeddings (local_index.py); Neo4j only hydrates the top-k.
+# Built on first query, refreshed incrementally after ingestion and whenever
+# the graph version changes. Filtered searches still run in Neo4j.
+LOCAL_VECTOR_INDEX_ENABLED = False
+LOCAL_VECTOR_INDEX_DIR = ".cache/vector_index"
+# Rebuild the snapshot instead of patching it once this fraction of rows belongs to deleted tickets/chunks.
+LOCAL_VECTOR_INDEX_MAX_DEAD_FRACTION = 0.3
+# --- PROMPT CONTEXT CONFIG ---
+# Content text returned per ticket is cut to this many characters, and the
+# answer prompt packs ticket blocks into this many tokens (context_builder.py;
+# counted with tiktoken when installed).
+CONTEXT_MAX_CONTENT_CHARS = 600
+CONTEXT_TOKEN_BUDGET = 1500
+# --- RSS FETCHER CONFIG ---
+# Feeds are fetched concurrently, at most RSS_PER_HOST_LIMIT at a time per host.
+RSS_FETCH_CONCURRENCY = 8
+RSS_PER_HOST_LIMIT = 2
+RSS_FETCH_TIMEOUT = 20
+# Newest articles kept per feed (0/None keeps all); unchanged feeds are still skipped via their validators.
+RSS_ITEMS_PER_FEED = 5
+# Send If-None-Match / If-Modified-Since from the stored ETag / Last-Modified; unchanged feeds are skipped.
+# Validators are stored only after the fetched articles are ingested (data_RSS.commit_feed_state).
+RSS_CONDITIONAL_GET = True
+RSS_FEED_STATE_PATH = ".cache/rss_feed_state.json"
+RSS_USER_AGENT = "TrendScoutAI/1.0 (+rss fetcher)"
+# --- SCHEDULER CONFIG ---
+# Seconds between fetches of each dataOrganizer source (scheduler.py).
+SCHEDULER_INTERVALS = {"rss": 900, "github": 3600, "startupsavant": 86400}
+SCHEDULER_DEFAULT_INTERVAL = 3600
+# Capacity of each queue between pipeline stages; a full queue blocks the stage before it.
+SCHEDULER_QUEUE_SIZE = 256
+SCHEDULER_EMBED_BATCH = 64
+SCHEDULER_WRITE_BATCH = 200
+# Max seconds a batching stage waits to fill a batch.
+SCHEDULER_BATCH_LINGER = 2.0
+SCHEDULER_STATS_INTERVAL = 60
+# --- GITHUB HARVESTER CONFIG ---
+# Search queries harvested concurrently by data_github.harvest(); results are de-duplicated by repo.
+GITHUB_SEARCH_QUERIES = [SEARCH_QUERY]
+GITHUB_CONCURRENCY = 4
+# Repos per query (GitHub search returns at most 1000), fetched GITHUB_PER_PAGE (max 100) at a time.
+GITHUB_MAX_RESULTS = 100
+GITHUB_PER_PAGE = 100
+GITHUB_TIMEOUT = 20
+GITHUB_MAX_RETRIES = 3
+# Requests held back from the quota; below it, callers wait for X-RateLimit-Reset (up to the max wait, in seconds).
+GITHUB_RATE_LIMIT_RESERVE = 1
+GITHUB_MAX_RATE_LIMIT_WAIT = 900
+# Pages cached by ETag; unchanged pages come back as 304 and do not count against the rate limit.
+GITHUB_ETAG_CACHE_PATH = ".cache/github_etag_cache.json"
+# --- HIERARCHY LOADER CONFIG ---
+# neo4j_full_hierarchy.json is streamed node by node (Data_Scraping/data_hierarchy.py), never loaded whole.
+HIERARCHY_PATH = "neo4j_full_hierarchy.json"
+# Window returned by data_orginize_startupsavant(); HIERARCHY_LIMIT = None returns every node.
+HIERARCHY_OFFSET = 90
+HIERARCHY_LIMIT = 20
+# Keep only nodes with one of these labels, e.g. ["Startup"]; None keeps all.
+HIERARCHY_LABELS = None
+HIERARCHY_BATCH_SIZE = 500
+HIERARCHY_READ_CHUNK = 1048576
+# --- BULK IMPORT CONFIG ---
+# Sources read by `metadataToNeo4j.py --bulk-export` ("hierarchy", "github"), BULK_BATCH_SIZE records at a time.
+BULK_SOURCES = ["hierarchy", "github"]
+BULK_BATCH_SIZE = 500
@@ -0,0 +1,88 @@
+"""
+Compact prompt context for the answer model.
+
+Turns the parsed retrieval results into one short text block per ticket
+(title, type, source, location, date, tags, summary) and packs them in rank
+order into a token budget, instead of `json.dumps`-ing the raw results.
+Tokens are counted with tiktoken when it is installed, otherwise estimated
+at ~4 characters per token.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+
+
+_encoder: Dict[str, Any] = {}
+
+
+def count_tokens(text: str) -> int:
+    if "value" not in _encoder:
+        try:
+            import tiktoken
+            try:
+                _encoder["value"] = tiktoken.encoding_for_model(config.OPENAI_MODEL)
+            except KeyError:
+                _encoder["value"] = tiktoken.get_encoding("o200k_base")
+        except ImportError:
+            _encoder["value"] = None
+    enc = _encoder["value"]
+    if enc is None:
+        return (len(text) + 3) // 4
+    return len(enc.encode(text))
+
+
+def _props(ticket: Dict[str, Any], node_type: str) -> Dict[str, Any]:
+    for rel in ticket.get("relationships") or []:
+        if rel.get("node_type") == node_type:
+            return rel.get("node_props") or {}
+    return {}
+
+
+def ticket_block(ticket: Dict[str, Any], max_content_chars: Optional[int] = None) -> str:
+    """One ticket as a few labelled lines; empty fields are skipped."""
+    if max_content_chars is None:
+        max_content_chars = config.CONTEXT_MAX_CONTENT_CHARS
+    meta = _props(ticket, "metadata")
+    location = _props(ticket, "location").get("name") or meta.get("location")
+    details = [
+        ("type", ticket.get("type")),
+        ("source", _props(ticket, "source").get("name") or meta.get("feed_title")),
+        ("location", location),
+        ("published", meta.get("published")),
+        ("author", meta.get("author_name")),
+    ]
+    lines = [f"[{ticket.get('rank', '?')}] {ticket.get('title') or 'Untitled'}"]
+    detail = " | ".join(f"{k}: {v}" for k, v in details if v and v != "N/A")
+    if detail:
+        lines.append(detail)
+    if ticket.get("tags"):
+        lines.append("tags: " + ", ".join(ticket["tags"]))
+    summary = " ".join(str(_props(ticket, "content").get("text") or "").split())
+    if summary:
+        if len(summary) > max_content_chars:
+            summary = summary[:max_content_chars].rsplit(" ", 1)[0] + "..."
+        lines.append("summary: " + summary)
+    return "\n".join(lines)
+
+
+def build_context(results: List[Dict[str, Any]], token_budget: Optional[int] = None) -> Tuple[str, Dict[str, int]]:
+    """Pack ticket blocks in rank order into `token_budget` tokens.
+
+    A block that does not fit is retried with a shorter summary before the
+    remaining tickets are dropped. Returns (context, stats).
+    """
+    token_budget = token_budget or config.CONTEXT_TOKEN_BUDGET
+    blocks, used = [], 0
+    for ticket in results or []:
+        block = ticket_block(ticket)
+        tokens = count_tokens(block)
+        if used + tokens > token_budget:
+            remaining = token_budget - used
+            block = ticket_block(ticket, max_content_chars=max(0, remaining * 3))
+            tokens = count_tokens(block)
+            if remaining < 20 or used + tokens > token_budget:
+                break
+        blocks.append(block)
+        used += tokens
+    stats = {"tickets": len(blocks), "dropped": len(results or []) - len(blocks), "tokens": used}
+    return "\n\n".join(blocks), stats
@@ -1,5 +1,5 @@
-from Data_Scraping import data_RSS, data_github
-import json
+from Data_Scraping import data_RSS, data_github, data_hierarchy
+import config
 
 
 class data_organizer:
@@ -24,10 +24,13 @@ class data_organizer:
     
 
     def data_orginize_startupsavant():
-        with open("neo4j_full_hierarchy.json", "r", encoding="utf-8") as f:
-            data = json.load(f)[90:110]
+        # Streamed, so only the requested window of the export is held in memory
+        return list(data_hierarchy.iter_nodes(offset=config.HIERARCHY_OFFSET, limit=config.HIERARCHY_LIMIT,
+                                              labels=config.HIERARCHY_LABELS))
 
-        return data
+    def data_stream_startupsavant():
+        # Every matching node, lazily: feed it to a consumer with backpressure (see scheduler.py)
+        return data_hierarchy.iter_nodes(labels=config.HIERARCHY_LABELS)
     """
     Add more data ingestion methods here as needed
     
@@ -0,0 +1,138 @@
+import os, time, hashlib, sqlite3, threading
+from array import array
+from typing import Optional, Dict, Any, List
+
+
+# ---------------------------------------------------------------------
+# Persistent embedding cache (SQLite, float32 blobs)
+# ---------------------------------------------------------------------
+class EmbeddingCache:
+    """Content-addressed store of embedding vectors.
+
+    Keys are a SHA-256 of (model tag, prefix, text), where the model tag names
+    the model and the backend/precision that produced the vector, so switching
+    backends never serves mismatched vectors. Values are raw float32 blobs.
+    Size is bounded by `max_entries` with least-recently-used eviction;
+    `compact()` evicts down to the bound and VACUUMs the file.
+    """
+
+    _CHUNK = 500  # keys per IN (...) lookup, below SQLite's variable limit
+
+    def __init__(self, path: str, max_entries: int = 500000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key         TEXT PRIMARY KEY,
+                    model       TEXT NOT NULL,
+                    dim         INTEGER NOT NULL,
+                    vector      BLOB NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings(last_access)")
+            self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def text_key(model: str, prefix: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\x1f{prefix}\x1f{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Vectors for the keys that are cached; missing keys are simply absent."""
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique), self._CHUNK):
+                chunk = unique[start:start + self._CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[key] = vec.tolist()
+            if found:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?",
+                                           [(now, k) for k in found])
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, model: str, items: Dict[str, List[float]]):
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, model, len(vec), array("f", vec).tobytes(), now) for key, vec in items.items()]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, model, dim, vector, last_access) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._size += self._conn.total_changes - before
+            if self._size > self.max_entries:
+                self._evict(self._size - self.max_entries)
+
+    def _evict(self, n: int):
+        # caller holds the lock and an open transaction
+        removed = self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)", (n,)
+        ).rowcount
+        self._size -= removed
+        self.evictions += removed
+
+    def compact(self, keep_models: Optional[List[str]] = None):
+        """Drop vectors of other models (if given), evict down to max_entries and reclaim disk space."""
+        with self._lock:
+            with self._conn:
+                if keep_models:
+                    removed = self._conn.execute(
+                        f"DELETE FROM embeddings WHERE model NOT IN ({','.join('?' * len(keep_models))})", keep_models
+                    ).rowcount
+                    self._size -= removed
+                    self.evictions += removed
+                if self._size > self.max_entries:
+                    self._evict(self._size - self.max_entries)
+            self._conn.execute("VACUUM")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": self._size,
+            "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+    def print_stats(self):
+        st = self.stats()
+        print(f"🗄️ Embedding cache: {st['hits']} hits, {st['misses']} misses "
+              f"({st['hit_rate']:.0%} hit rate), {st['evictions']} evicted, {st['entries']} entries stored "
+              f"({st['bytes'] / 1e6:.1f} MB)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    import config
+    import embeddings
+
+    cache = EmbeddingCache(config.EMBEDDING_CACHE_PATH, config.EMBEDDING_CACHE_MAX_ENTRIES)
+    cache.print_stats()
+    cache.compact(keep_models=[embeddings.model_tag()])
+    print("🧹 Compacted.")
+    cache.print_stats()
@@ -0,0 +1,328 @@
+"""
+Shared E5 embedding service for ingestion (passages) and retrieval (queries).
+
+One model instance per process (see `resources.get_embedder`), batched
+encoding with attention-masked mean pooling and L2 normalization -- the same
+pooling SentenceTransformer applies for `intfloat/e5-base-v2`, so vectors
+match the `title_embedding` values already stored in Neo4j.
+
+Backends (config.EMBEDDING_BACKEND):
+
+- "torch": PyTorch/transformers. EMBEDDING_DEVICE, EMBEDDING_DTYPE
+  ("fp32" | "bf16"), EMBEDDING_NUM_THREADS and EMBEDDING_QUANTIZE_INT8
+  (dynamic int8, CPU + fp32 only).
+- "onnx": the model exported once to ONNX (under ONNX_MODEL_DIR) and run
+  with onnxruntime on CPU, optionally int8-quantized (ONNX_QUANTIZE_INT8).
+  Cosine similarity to the torch fp32 vectors is >= 0.9999 for the fp32
+  export and >= 0.99 for int8 (ONNX_COSINE_TOLERANCE*, checked by
+  `python benchmarks.py embeddings`).
+
+embed_queries/embed_passages consult a persistent, content-addressed
+vector cache first (embedding_cache.py, config.EMBEDDING_CACHE_*), so only
+texts never seen with the current model/backend reach the model.
+"""
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import config
+import resources
+
+
+QUERY_PREFIX = "query: "
+PASSAGE_PREFIX = "passage: "
+
+
+def with_prefix(text: str, prefix: str) -> str:
+    """Strip and add the E5 prefix unless the text already carries one."""
+    text = str(text or "").strip()
+    if text.lower().startswith(prefix.strip().lower()):
+        return text
+    return prefix + text
+
+
+def mean_pool(last_hidden_state, attention_mask):
+    """Mean over real tokens only; padding positions are masked out."""
+    mask = attention_mask.unsqueeze(-1).to(last_hidden_state.dtype)
+    summed = (last_hidden_state * mask).sum(dim=1)
+    counts = mask.sum(dim=1).clamp(min=1e-9)
+    return summed / counts
+
+
+class _Embedder(ABC):
+    """Length-sorted batching shared by the backends."""
+
+    backend = ""
+
+    @abstractmethod
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch of already-prefixed texts."""
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        """Embed already-prefixed texts; returns L2-normalized float32 vectors in input order."""
+        if not texts:
+            return []
+        # Length-sorted batches keep padding (and wasted compute) small.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out: List[Optional[List[float]]] = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            for i, vec in zip(idx, self._encode_batch([texts[i] for i in idx])):
+                out[i] = vec
+        return out
+
+
+class TorchEmbedder(_Embedder):
+    """E5 encoder on PyTorch/transformers."""
+
+    backend = "torch"
+
+    def __init__(self,
+                 model_name: str,
+                 device: str = "cpu",
+                 dtype: str = "fp32",
+                 num_threads: Optional[int] = None,
+                 quantize_int8: bool = False,
+                 max_length: int = 512):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        self.model_name = model_name
+        self.device = device
+        self.max_length = max_length
+        self.dtype = dtype.lower()
+
+        print(f"Loading E5 model: {model_name} ({device}, {self.dtype}{', int8' if quantize_int8 else ''})")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name)
+        model.eval()
+        if quantize_int8:
+            if device != "cpu" or self.dtype != "fp32":
+                raise ValueError("dynamic int8 quantization requires device='cpu' and dtype='fp32'")
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.dtype = "int8"
+        elif self.dtype == "bf16":
+            model = model.to(torch.bfloat16)
+        elif self.dtype != "fp32":
+            raise ValueError(f"unsupported EMBEDDING_DTYPE: {dtype}")
+        self.model = model.to(device)
+
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        import torch
+
+        with torch.inference_mode():
+            inputs = self.tokenizer(texts, padding=True, truncation=True,
+                                    max_length=self.max_length, return_tensors="pt").to(self.device)
+            hidden = self.model(**inputs).last_hidden_state
+            emb = mean_pool(hidden.float(), inputs["attention_mask"])
+            return torch.nn.functional.normalize(emb, p=2, dim=1).cpu().tolist()
+
+
+# ---------------------------------------------------------------------
+# ONNX Runtime backend
+# ---------------------------------------------------------------------
+def onnx_model_dir(model_name: str) -> str:
+    return os.path.join(config.ONNX_MODEL_DIR, model_name.replace("/", "__"))
+
+
+def export_onnx(model_name: str, quantize_int8: bool = False) -> str:
+    """Export `model_name` to ONNX once (plus an int8 copy if asked); returns the model path."""
+    out_dir = onnx_model_dir(model_name)
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    if not os.path.exists(fp32_path):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        print(f"📦 Exporting {model_name} to ONNX: {fp32_path}")
+        os.makedirs(out_dir, exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name)
+        model.eval()
+        dummy = tokenizer([QUERY_PREFIX + "warm up"], return_tensors="pt")
+        axes = {0: "batch", 1: "sequence"}
+        torch.onnx.export(
+            model,
+            (dummy["input_ids"], dummy["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state", "pooler_output"],
+            dynamic_axes={"input_ids": axes, "attention_mask": axes, "last_hidden_state": axes,
+                          "pooler_output": {0: "batch"}},
+            opset_version=17,
+        )
+        tokenizer.save_pretrained(out_dir)
+
+    if not quantize_int8:
+        return fp32_path
+    int8_path = os.path.join(out_dir, "model.int8.onnx")
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        print(f"📦 Quantizing ONNX model to int8: {int8_path}")
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxEmbedder(_Embedder):
+    """E5 encoder on onnxruntime (CPU), same pooling/normalization as TorchEmbedder."""
+
+    backend = "onnx"
+
+    def __init__(self,
+                 model_name: str,
+                 num_threads: Optional[int] = None,
+                 quantize_int8: bool = False,
+                 max_length: int = 512):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        path = export_onnx(model_name, quantize_int8)
+        print(f"Loading E5 ONNX model: {path}")
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_model_dir(model_name))
+        self.model_name = model_name
+        self.max_length = max_length
+        self.dtype = "int8" if quantize_int8 else "fp32"
+
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        import numpy as np
+
+        inputs = self.tokenizer(texts, padding=True, truncation=True,
+                                max_length=self.max_length, return_tensors="np")
+        mask = inputs["attention_mask"].astype(np.int64)
+        hidden = self.session.run(["last_hidden_state"], {
+            "input_ids": inputs["input_ids"].astype(np.int64),
+            "attention_mask": mask,
+        })[0]
+        weights = mask[..., None].astype(np.float32)
+        emb = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        emb /= np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+        return emb.astype(np.float32).tolist()
+
+
+def build_embedder(backend: Optional[str] = None, **overrides):
+    """Embedder configured from config.py; keyword overrides are used by the benchmarks."""
+    backend = (backend or config.EMBEDDING_BACKEND).lower()
+    if backend == "onnx":
+        settings = {
+            "model_name": config.E5_MODEL_NAME,
+            "num_threads": config.EMBEDDING_NUM_THREADS,
+            "quantize_int8": config.ONNX_QUANTIZE_INT8,
+            "max_length": config.EMBEDDING_MAX_LENGTH,
+        }
+        settings.update(overrides)
+        return OnnxEmbedder(**settings)
+    if backend != "torch":
+        raise ValueError(f"unsupported EMBEDDING_BACKEND: {backend}")
+
+    settings = {
+        "model_name": config.E5_MODEL_NAME,
+        "device": config.EMBEDDING_DEVICE,
+        "dtype": config.EMBEDDING_DTYPE,
+        "num_threads": config.EMBEDDING_NUM_THREADS,
+        "quantize_int8": config.EMBEDDING_QUANTIZE_INT8,
+        "max_length": config.EMBEDDING_MAX_LENGTH,
+    }
+    settings.update(overrides)
+    return TorchEmbedder(**settings)
+
+
+# ---------------------------------------------------------------------
+# Chunking for long descriptions
+# ---------------------------------------------------------------------
+def get_tokenizer():
+    """The E5 tokenizer on its own (no model load), used to size chunks."""
+    def _build():
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(config.E5_MODEL_NAME)
+    return resources.singleton("tokenizer", _build)
+
+
+def chunk_text(text: str, max_tokens: Optional[int] = None, overlap: Optional[int] = None) -> List[str]:
+    """Split text into windows of at most `max_tokens` E5 tokens, overlapping by `overlap`.
+
+    Windows are cut at token character offsets, so every chunk fits the
+    512-token model limit once the passage prefix and special tokens are added.
+    """
+    text = " ".join(str(text or "").split())
+    if not text:
+        return []
+    max_tokens = max_tokens or config.CHUNK_MAX_TOKENS
+    overlap = config.CHUNK_OVERLAP_TOKENS if overlap is None else overlap
+    offsets = get_tokenizer()(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+    if len(offsets) <= max_tokens:
+        return [text]
+
+    step = max(1, max_tokens - overlap)
+    chunks = []
+    for start in range(0, len(offsets), step):
+        window = offsets[start:start + max_tokens]
+        chunks.append(text[window[0][0]:window[-1][1]])
+        if start + max_tokens >= len(offsets):
+            break
+    return chunks
+
+
+# ---------------------------------------------------------------------
+# Persistent cache (embedding_cache.py)
+# ---------------------------------------------------------------------
+def model_tag() -> str:
+    """Identifies the vectors' producer: model name plus backend and precision."""
+    backend = config.EMBEDDING_BACKEND.lower()
+    if backend == "onnx":
+        precision = "int8" if config.ONNX_QUANTIZE_INT8 else "fp32"
+    else:
+        precision = "int8" if config.EMBEDDING_QUANTIZE_INT8 else config.EMBEDDING_DTYPE.lower()
+    return f"{config.E5_MODEL_NAME}|{backend}|{precision}"
+
+
+def get_embedding_cache():
+    if not config.EMBEDDING_CACHE_ENABLED:
+        return None
+
+    def _build():
+        from embedding_cache import EmbeddingCache
+        return EmbeddingCache(config.EMBEDDING_CACHE_PATH, config.EMBEDDING_CACHE_MAX_ENTRIES)
+    return resources.singleton("embedding_cache", _build)
+
+
+def _embed(texts: List[str], prefix: str, batch_size: Optional[int]) -> List[List[float]]:
+    """Prefix, consult the cache and encode only the misses (each distinct text once)."""
+    prefixed = [with_prefix(t, prefix) for t in texts]
+    batch_size = batch_size or config.EMBEDDING_BATCH_SIZE
+    cache = get_embedding_cache()
+    if cache is None:
+        return resources.get_embedder().encode(prefixed, batch_size)
+
+    tag = model_tag()
+    keys = [cache.text_key(tag, prefix, t) for t in prefixed]
+    found = cache.get_many(keys)
+    missing = {k: t for k, t in zip(keys, prefixed) if k not in found}
+    if missing:
+        vectors = resources.get_embedder().encode(list(missing.values()), batch_size)
+        fresh = dict(zip(missing, vectors))
+        cache.put_many(tag, fresh)
+        found.update(fresh)
+    return [found[k] for k in keys]
+
+
+# ---------------------------------------------------------------------
+# Public helpers
+# ---------------------------------------------------------------------
+def embed_queries(texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+    return _embed(texts, QUERY_PREFIX, batch_size)
+
+
+def embed_query(text: str) -> List[float]:
+    return embed_queries([text])[0]
+
+
+def embed_passages(texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+    return _embed(texts, PASSAGE_PREFIX, batch_size)
@@ -0,0 +1,52 @@
+"""
+Graph model helpers shared by ingestion (`metadataToNeo4j`) and retrieval (`retriever`).
+
+Two models are supported, selected by `config.GRAPH_MODEL`:
+
+- "per_ticket": every ticket owns private `(:Entity {parent_id, type})` children
+  for its metadata, content, source and tags (the original layout).
+- "shared": tags, sources and locations are canonical `:Tag` / `:Source` /
+  `:Location` nodes (also labelled `:Entity`) keyed by a normalized name and
+  linked from many tickets. Metadata, type and content stay per ticket.
+"""
+from typing import List, Optional
+
+import config
+
+
+PER_TICKET = "per_ticket"
+SHARED = "shared"
+
+# Singleton counter bumped after every ingestion write; query-result caches
+# include it in their keys so new tickets invalidate cached results.
+BUMP_GRAPH_VERSION_CYPHER = """
+MERGE (v:GraphVersion {name: 'tickets'})
+SET v.version = coalesce(v.version, 0) + 1, v.updated_at = timestamp()
+RETURN v.version AS version
+"""
+READ_GRAPH_VERSION_CYPHER = """
+OPTIONAL MATCH (v:GraphVersion {name: 'tickets'})
+RETURN coalesce(v.version, 0) AS version
+"""
+
+
+def graph_model() -> str:
+    return (getattr(config, "GRAPH_MODEL", PER_TICKET) or PER_TICKET).lower()
+
+
+def is_shared() -> bool:
+    return graph_model() == SHARED
+
+
+def canonical_key(name: Optional[str]) -> str:
+    """Case- and whitespace-insensitive key for a tag, source or location name."""
+    return " ".join(str(name or "").split()).lower()
+
+
+def canonical_keys(names: List[str]) -> List[str]:
+    keys = []
+    for n in names or []:
+        k = canonical_key(n)
+        if k and k not in keys:
+            keys.append(k)
+    return keys
@@ -1,40 +1,19 @@
-from typing import List, Dict, Any
-import json
-from openai import OpenAI
+from typing import List, Dict, Any, Iterator
+import time
 import config
+import resources
+from context_builder import build_context
 from retriever import text_query_to_results
 
-client = OpenAI(api_key=config.OPENAI_API_KEY)
+if config.ASYNC_RETRIEVAL:
+    # concurrent extraction/embedding/search behind the same blocking signature
+    from retriever_async import text_query_to_results_blocking as text_query_to_results
 
-def generate_response(user_query: str) -> Dict[str, Any]:
-    """
-    Generates a response to the user query using RAG.
-    
-    Args:
-        user_query: The user's natural language query.
-        
-    Returns:
-        A dictionary containing:
-        - 'answer': The LLM's generated answer.
-        - 'sources': A list of retrieved documents/tickets.
-    """
-    
-    # 1. Retrieve relevant documents
-    print(f"Retrieving documents for: {user_query}")
-    retrieved_results = text_query_to_results(user_query, top_n=5)
-    
-    # 2. Construct the prompt
-    if isinstance(retrieved_results, list) and retrieved_results:
-        # Pass raw JSON to save tokens and provide structured data
-        context_str = json.dumps(retrieved_results, ensure_ascii=False)
-    else:
-        context_str = "No specific documents found."
-
-    system_prompt = """You are Transcout AI, a helpful and direct assistant for a tech knowledge graph.
+SYSTEM_PROMPT = """You are Transcout AI, a helpful and direct assistant for a tech knowledge graph.
     
     Guidelines:
     1. **Direct Address**: Always address the user directly as "you". Never refer to them as "the user".
-    2. **Context-Based**: Answer questions based ONLY on the provided retrieved tickets/documents (in JSON format).
+    2. **Context-Based**: Answer questions based ONLY on the provided retrieved tickets/documents (one numbered block per ticket).
     3. **No Data Handling**: If the provided context is empty or "No specific documents found.", politely inform the user that you couldn't find any relevant information in the database. Suggest they try broader keywords or different locations/sources.
     4. **Citations**: Cite your sources by referring to the 'rank' or 'title' when appropriate.
     5. **Tone**: Be professional, concise, and helpful.
@@ -43,6 +22,18 @@ def generate_response(user_query: str) -> Dict[str, Any]:
     Also tell the user the source of the record.
     """
 
+
+def build_messages(user_query: str, retrieved_results: Any) -> List[Dict[str, str]]:
+    """Build the chat messages for the answer model from the retrieved tickets."""
+    context_str = ""
+    if isinstance(retrieved_results, list) and retrieved_results:
+        # Compact text blocks packed into a token budget instead of raw JSON
+        context_str, stats = build_context(retrieved_results)
+        print(f"🧾 Prompt context: {stats['tickets']} tickets, {stats['tokens']} tokens "
+              f"(budget {config.CONTEXT_TOKEN_BUDGET}, {stats['dropped']} dropped)")
+    if not context_str:
+        context_str = "No specific documents found."
+
     user_prompt = f"""
     User Query: {user_query}
 
@@ -51,15 +42,37 @@ def generate_response(user_query: str) -> Dict[str, Any]:
 
     Please answer the user's query based on the context above.
     """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def generate_response(user_query: str) -> Dict[str, Any]:
+    """
+    Generates a response to the user query using RAG.
+    
+    Args:
+        user_query: The user's natural language query.
+        
+    Returns:
+        A dictionary containing:
+        - 'answer': The LLM's generated answer.
+        - 'sources': A list of retrieved documents/tickets.
+    """
+    
+    # 1. Retrieve relevant documents
+    print(f"Retrieving documents for: {user_query}")
+    retrieved_results = text_query_to_results(user_query, top_n=5)
+    
+    # 2. Construct the prompt
+    messages = build_messages(user_query, retrieved_results)
 
     # 3. Call LLM
     try:
-        response = client.chat.completions.create(
+        response = resources.get_openai_client().chat.completions.create(
             model=config.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=messages,
             temperature=0.7
         )
         answer = response.choices[0].message.content
@@ -71,6 +84,60 @@ def generate_response(user_query: str) -> Dict[str, Any]:
         "sources": retrieved_results
     }
 
+
+def generate_response_stream(user_query: str) -> Dict[str, Any]:
+    """
+    Streaming variant of `generate_response`.
+
+    Retrieval runs eagerly so the sources are available immediately; the
+    answer is produced lazily as text chunks.
+
+    Returns:
+        A dictionary containing:
+        - 'sources': A list of retrieved documents/tickets.
+        - 'stream': An iterator of answer text chunks.
+        - 'timings': Filled in while streaming with 'retrieval_s',
+          'time_to_first_token_s' and 'total_s'.
+    """
+    start = time.perf_counter()
+    print(f"Retrieving documents for: {user_query}")
+    retrieved_results = text_query_to_results(user_query, top_n=5)
+    timings = {"retrieval_s": time.perf_counter() - start}
+    messages = build_messages(user_query, retrieved_results)
+
+    def _stream() -> Iterator[str]:
+        first = True
+        try:
+            response = resources.get_openai_client().chat.completions.create(
+                model=config.OPENAI_MODEL,
+                messages=messages,
+                temperature=0.7,
+                stream=True
+            )
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if first:
+                    timings["time_to_first_token_s"] = time.perf_counter() - start
+                    print(f"⏱️ Time to first token: {timings['time_to_first_token_s']:.2f}s "
+                          f"(retrieval {timings['retrieval_s']:.2f}s)")
+                    first = False
+                yield delta
+        except Exception as e:
+            yield f"Error generating response: {str(e)}"
+        finally:
+            timings["total_s"] = time.perf_counter() - start
+            print(f"⏱️ Response complete in {timings['total_s']:.2f}s")
+
+    return {
+        "sources": retrieved_results,
+        "stream": _stream(),
+        "timings": timings
+    }
+
 if __name__ == "__main__":
     # Test locally
     test_query = "Show me recent AI-related startup company"
@@ -0,0 +1,146 @@
+"""
+Zero-network entity extractor for user queries.
+
+Builds a gazetteer from the names already in the graph (tags, sources and
+metadata locations), indexes them in a token trie for longest-match
+multi-pattern lookup, and falls back to fuzzy matching of single tokens
+(e.g. "startups" -> "Startup"). Returns the same
+`(tags, locations, sources, summary)` tuple as
+`retriever.extract_entities_with_gpt4`.
+"""
+import re
+import threading
+import time
+from difflib import get_close_matches
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import config
+
+
+GAZETTEER_CYPHER = """
+MATCH (e:Entity) WHERE e.type IN ['tag', 'source', 'location'] AND coalesce(e.name, '') <> ''
+RETURN e.type AS kind, e.name AS name
+UNION
+MATCH (e:Entity {type:'metadata'}) WHERE coalesce(e.location, '') <> ''
+RETURN 'location' AS kind, e.location AS name
+"""
+
+# Words that are never useful as a tag on their own.
+STOPWORDS = {
+    "a", "an", "and", "are", "about", "for", "from", "in", "is", "me", "of", "on", "or",
+    "show", "that", "the", "to", "what", "which", "with", "find", "list", "related",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-+.'][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(str(text or "").lower())
+
+
+def _source_aliases(name: str) -> List[str]:
+    """'https://techcrunch.com/feed/' or 'techcrunch.com' -> also 'techcrunch'."""
+    aliases = [name]
+    host = urlparse(name).netloc or name
+    host = host.lower().removeprefix("www.")
+    if "." in host and " " not in host:
+        aliases += [host, host.split(".")[0]]
+    return aliases
+
+
+def _location_aliases(name: str) -> List[str]:
+    """'Austin, Texas' -> also 'Austin' and 'Texas'."""
+    parts = [p.strip() for p in name.split(",") if p.strip()]
+    return [name] + (parts if len(parts) > 1 else [])
+
+
+class Gazetteer:
+    """Token trie over known tag/location/source names."""
+
+    def __init__(self, entries: List[Tuple[str, str]]):
+        self._root: Dict = {}
+        self._single_tokens: Dict[str, List[Tuple[str, str]]] = {}
+        self.size = 0
+        for kind, name in entries:
+            aliases = {
+                "source": _source_aliases,
+                "location": _location_aliases,
+            }.get(kind, lambda n: [n])(name)
+            for alias in aliases:
+                self._add(kind, alias)
+
+    def _add(self, kind: str, name: str):
+        tokens = tokenize(name)
+        if not tokens or (kind == "tag" and len(tokens) == 1 and tokens[0] in STOPWORDS):
+            return
+        node = self._root
+        for tok in tokens:
+            node = node.setdefault(tok, {})
+        entries = node.setdefault("$", [])
+        if (kind, name) not in entries:
+            entries.append((kind, name))
+            self.size += 1
+        if len(tokens) == 1 and len(tokens[0]) >= 4:
+            self._single_tokens.setdefault(tokens[0], []).append((kind, name))
+
+    def match(self, text: str, fuzzy_cutoff: Optional[float] = None) -> Dict[str, List[str]]:
+        found = {"tag": [], "location": [], "source": []}
+
+        def _emit(entries):
+            for kind, name in entries:
+                if name not in found[kind]:
+                    found[kind].append(name)
+
+        tokens = tokenize(text)
+        i = 0
+        while i < len(tokens):
+            node, end, hit = self._root, i, None
+            while end < len(tokens) and tokens[end] in node:
+                node = node[tokens[end]]
+                end += 1
+                if "$" in node:
+                    hit = (end, node["$"])
+            if hit:
+                _emit(hit[1])
+                i = hit[0]
+                continue
+
+            tok = tokens[i]
+            if fuzzy_cutoff and len(tok) >= 4 and tok not in STOPWORDS:
+                close = get_close_matches(tok, self._single_tokens.keys(), n=1, cutoff=fuzzy_cutoff)
+                if close:
+                    _emit(self._single_tokens[close[0]])
+            i += 1
+        return found
+
+
+# ---------------------------------------------------------------------
+# Process-wide gazetteer, rebuilt when the graph version changes
+# ---------------------------------------------------------------------
+_gazetteer: Dict = {"value": None, "version": None}
+_gazetteer_lock = threading.Lock()
+
+
+def build_gazetteer(driver) -> Gazetteer:
+    start = time.time()
+    with driver.session() as s:
+        rows = s.execute_read(lambda tx: tx.run(GAZETTEER_CYPHER).data())
+    gaz = Gazetteer([(r["kind"], r["name"]) for r in rows])
+    print(f"📖 Built gazetteer with {gaz.size} names in {time.time() - start:.2f}s")
+    return gaz
+
+
+def get_gazetteer(driver, graph_version) -> Gazetteer:
+    with _gazetteer_lock:
+        if _gazetteer["value"] is None or _gazetteer["version"] != graph_version:
+            _gazetteer["value"] = build_gazetteer(driver)
+            _gazetteer["version"] = graph_version
+        return _gazetteer["value"]
+
+
+def extract_entities_local(user_query: str, driver, graph_version=None) -> Tuple[List[str], List[str], List[str], str]:
+    """Gazetteer-based replacement for extract_entities_with_gpt4 (no network besides Neo4j on rebuild)."""
+    gaz = get_gazetteer(driver, graph_version)
+    found = gaz.match(user_query, fuzzy_cutoff=config.LOCAL_EXTRACTOR_FUZZY_CUTOFF)
+    return found["tag"], found["location"], found["source"], user_query.strip()
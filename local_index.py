@@ -0,0 +1,265 @@
+"""
+In-process vector index snapshot, an optional alternative to Neo4j ANN.
+
+Title (and description chunk) embeddings are bulk-exported from Neo4j into a
+contiguous float32 matrix on disk (`vectors.f32`, memory-mapped read-only)
+with a row -> (key, ticket_id) table (`keys.json`) and `meta.json`. Queries
+are exact dot products over the matrix (vectors are L2-normalized, so this is
+cosine); Neo4j is then only asked to hydrate the top-k tickets' context.
+
+The snapshot is refreshed incrementally: every Ticket carries `updated_at`
+(set by ingestion), and `refresh()` pulls the tickets changed since the
+snapshot's high-water mark, overwriting their rows in place and appending
+new ones. Rows of tickets no longer in the graph are blanked; once more than
+LOCAL_VECTOR_INDEX_MAX_DEAD_FRACTION of the rows are blank the snapshot is
+rebuilt. Retrieval refreshes whenever the graph version changes.
+
+    python local_index.py build      # full export
+    python local_index.py refresh    # incremental
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import config
+
+
+EXPORT_TITLES_CYPHER = """
+MATCH (t:Ticket)
+WHERE t.title_embedding IS NOT NULL AND ($since IS NULL OR t.updated_at >= $since)
+RETURN t.ticket_id AS key, t.ticket_id AS owner, t.title_embedding AS vector, t.updated_at AS updated_at
+"""
+EXPORT_CHUNKS_CYPHER = """
+MATCH (t:Ticket)-[:HAS_CHUNK]->(c:Chunk)
+WHERE c.embedding IS NOT NULL AND ($since IS NULL OR t.updated_at >= $since)
+RETURN c.chunk_id AS key, t.ticket_id AS owner, c.embedding AS vector, t.updated_at AS updated_at
+"""
+
+LIVE_TICKETS_CYPHER = """
+MATCH (t:Ticket) WHERE t.title_embedding IS NOT NULL
+RETURN t.ticket_id AS ticket_id
+"""
+
+
+def _export(driver, since: Optional[int]) -> Iterator[Dict]:
+    queries = [EXPORT_TITLES_CYPHER] + ([EXPORT_CHUNKS_CYPHER] if config.CHUNK_EMBEDDINGS_ENABLED else [])
+    with driver.session() as s:
+        for query in queries:
+            # stream records instead of materializing the whole export
+            for record in s.run(query, since=since):
+                yield record.data()
+
+
+def _replace_json(path: str, value):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(value, f)
+    os.replace(tmp, path)
+
+
+class LocalVectorIndex:
+    """Memory-mapped float32 matrix of vectors, one row per title or chunk."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._meta_mtime = None
+        self.meta: Dict = {}
+        self.keys: List[Tuple[str, Optional[str]]] = []
+        self._row_of: Dict[str, int] = {}
+        self._matrix = None
+        self._owners = None
+        if self.exists():
+            self._load()
+
+    # -- files ---------------------------------------------------------
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def exists(self) -> bool:
+        return os.path.exists(self._path("meta.json"))
+
+    def _load(self):
+        meta_path = self._path("meta.json")
+        self._meta_mtime = os.path.getmtime(meta_path)
+        with open(meta_path, encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(self._path("keys.json"), encoding="utf-8") as f:
+            self.keys = [tuple(k) for k in json.load(f)]
+        self._row_of = {key: i for i, (key, _) in enumerate(self.keys)}
+        rows, dim = self.meta["rows"], self.meta["dim"]
+        # only the first `rows` rows are mapped, so a concurrent append is harmless
+        self._matrix = (np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r", shape=(rows, dim))
+                        if rows else np.zeros((0, dim), dtype=np.float32))
+        self._owners = [owner for _, owner in self.keys]
+
+    def reload_if_changed(self):
+        """Pick up a snapshot written by another process (e.g. an ingestion run)."""
+        try:
+            mtime = os.path.getmtime(self._path("meta.json"))
+        except FileNotFoundError:
+            return
+        if mtime != self._meta_mtime:
+            with self._lock:
+                self._load()
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    # -- building ------------------------------------------------------
+    def build(self, driver, graph_version=None):
+        """Full export from Neo4j; compacts away rows of deleted chunks."""
+        start = time.time()
+        os.makedirs(self.directory, exist_ok=True)
+        keys, dim, high_water = [], None, 0
+        tmp = self._path("vectors.f32.tmp")
+        with open(tmp, "wb") as f:
+            for row in _export(driver, None):
+                vec = np.asarray(row["vector"], dtype=np.float32)
+                dim = dim or len(vec)
+                f.write(vec.tobytes())
+                keys.append((row["key"], row["owner"]))
+                high_water = max(high_water, row["updated_at"] or 0)
+        with self._lock:
+            os.replace(tmp, self._path("vectors.f32"))
+            _replace_json(self._path("keys.json"), keys)
+            _replace_json(self._path("meta.json"), {
+                "rows": len(keys), "dim": dim or 0, "updated_at": high_water,
+                "graph_version": graph_version, "built_at": time.time(),
+            })
+            self._load()
+        print(f"🧭 Built local vector index: {len(keys)} vectors in {time.time() - start:.2f}s")
+
+    def refresh(self, driver, graph_version=None) -> int:
+        """Upsert vectors of tickets updated since the snapshot; returns rows written.
+
+        The high-water mark is inclusive, so tickets written in the same
+        millisecond as the last refresh are re-read rather than missed.
+        """
+        if not self.exists():
+            self.build(driver, graph_version)
+            return self.size
+        self.reload_if_changed()
+        start = time.time()
+        exported = list(_export(driver, self.meta.get("updated_at") or 0))
+        with driver.session() as s:
+            live = {record["ticket_id"] for record in s.run(LIVE_TICKETS_CYPHER)}
+        with self._lock:
+            touched = {row["owner"] for row in exported}
+            fresh = {row["key"] for row in exported}
+            # rows of touched tickets that were not re-exported (removed chunks) and rows of
+            # tickets deleted from the graph are blanked
+            stale = [i for i, (key, owner) in enumerate(self.keys)
+                     if owner is not None and ((owner in touched and key not in fresh) or owner not in live)]
+            dead = sum(1 for _, owner in self.keys if owner is None) + len(stale)
+            # mostly-dead snapshots are rebuilt (compacted) instead of patched
+            rebuild = bool(self.keys) and dead > len(self.keys) * config.LOCAL_VECTOR_INDEX_MAX_DEAD_FRACTION
+            updates, appends = [], []
+            if not rebuild:
+                for row in exported:
+                    (updates if row["key"] in self._row_of else appends).append(row)
+
+                dim = self.meta["dim"] or (len(exported[0]["vector"]) if exported else 0)
+                rows = self.meta["rows"]
+                if updates or stale:
+                    matrix = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r+", shape=(rows, dim))
+                    for row in updates:
+                        i = self._row_of[row["key"]]
+                        matrix[i] = np.asarray(row["vector"], dtype=np.float32)
+                        self.keys[i] = (row["key"], row["owner"])
+                    for i in stale:
+                        matrix[i] = 0.0
+                        self.keys[i] = (self.keys[i][0], None)
+                    matrix.flush()
+                    del matrix
+                if appends:
+                    with open(self._path("vectors.f32"), "ab") as f:
+                        for row in appends:
+                            f.write(np.asarray(row["vector"], dtype=np.float32).tobytes())
+                            self.keys.append((row["key"], row["owner"]))
+
+                high_water = max([self.meta.get("updated_at") or 0] + [r["updated_at"] or 0 for r in exported])
+                _replace_json(self._path("keys.json"), self.keys)
+                _replace_json(self._path("meta.json"), {
+                    **self.meta, "rows": len(self.keys), "dim": dim,
+                    "updated_at": high_water, "graph_version": graph_version,
+                })
+                self._load()
+        if rebuild:
+            print(f"🧭 Local vector index has {dead}/{len(self.keys)} dead rows; rebuilding.")
+            self.build(driver, graph_version)
+        elif exported or stale:
+            print(f"🧭 Refreshed local vector index: {len(updates)} updated, {len(appends)} added, "
+                  f"{len(stale)} removed in {time.time() - start:.2f}s")
+        return len(exported)
+
+    # -- search --------------------------------------------------------
+    def search(self, query_vector: List[float], top_k: int, aggregation: str = "max",
+               overfetch: int = 1) -> List[Dict]:
+        """Top-k tickets as [{ticket_id, sim}], sim on Neo4j's [0, 1] cosine scale."""
+        with self._lock:
+            matrix, owners = self._matrix, self._owners
+        if matrix is None or not len(owners):
+            return []
+        scores = matrix @ np.asarray(query_vector, dtype=np.float32)
+        m = min(len(scores), top_k * max(1, overfetch))
+        top = np.argpartition(-scores, m - 1)[:m]
+        per_ticket: Dict[str, float] = {}
+        for i in top[np.argsort(-scores[top])]:
+            owner = owners[i]
+            if owner is None:
+                continue
+            sim = (1.0 + float(scores[i])) / 2.0
+            if aggregation == "sum":
+                per_ticket[owner] = per_ticket.get(owner, 0.0) + sim
+            else:
+                per_ticket[owner] = max(per_ticket.get(owner, 0.0), sim)
+        ranked = sorted(per_ticket.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+        return [{"ticket_id": tid, "sim": sim} for tid, sim in ranked]
+
+
+# ---------------------------------------------------------------------
+# Process-wide snapshot
+# ---------------------------------------------------------------------
+_index: Dict = {"value": None}
+_index_lock = threading.Lock()
+
+
+def get_local_index() -> LocalVectorIndex:
+    with _index_lock:
+        if _index["value"] is None:
+            _index["value"] = LocalVectorIndex(config.LOCAL_VECTOR_INDEX_DIR)
+        return _index["value"]
+
+
+def ensure_fresh(driver, graph_version) -> LocalVectorIndex:
+    """Snapshot that reflects `graph_version` (built on first use, refreshed on change)."""
+    index = get_local_index()
+    index.reload_if_changed()
+    if not index.exists() or index.meta.get("graph_version") != graph_version:
+        with _index_lock:
+            if not index.exists() or index.meta.get("graph_version") != graph_version:
+                index.refresh(driver, graph_version)
+    return index
+
+
+if __name__ == "__main__":
+    import sys
+
+    import resources
+    from graph_model import READ_GRAPH_VERSION_CYPHER
+
+    driver = resources.get_neo4j_driver()
+    with driver.session() as s:
+        version = s.run(READ_GRAPH_VERSION_CYPHER).single()["version"]
+    index = get_local_index()
+    if (sys.argv[1:] or ["refresh"])[0] == "build":
+        index.build(driver, version)
+    else:
+        index.refresh(driver, version)
+    print(f"🧭 {index.size} vectors ({index.meta.get('dim')} dims) in {index.directory}")
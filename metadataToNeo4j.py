@@ -1,19 +1,24 @@
-import os, json, uuid
+import os, json, uuid, re, html, ast, hashlib
+from urllib.parse import urlparse
 from typing import Optional, List, Dict
 from pydantic import BaseModel, Field, field_validator
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 
-from neo4j import GraphDatabase
-from sentence_transformers import SentenceTransformer
-from langchain_community.llms import Ollama
-from langchain_openai import ChatOpenAI
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
 from langchain.prompts import PromptTemplate
-from langchain.output_parsers import PydanticOutputParser
+from langchain.output_parsers import PydanticOutputParser, CommaSeparatedListOutputParser
+from langchain_core.exceptions import OutputParserException
 
 import config
 import dataOrganizer
-from Data_Scraping import data_github, data_RSS
+import embeddings
+import graph_model
+import resources
+from normalize_cache import NormalizationCache
+from Data_Scraping import data_github, data_hierarchy, data_RSS
 
 
 # -------------------------------
@@ -26,12 +31,12 @@ password = config.NEO4J_PASSWORD
 llm_model = config.OPEN_MODEL
 embedding_model_name = config.E5_MODEL_NAME
 
-driver = GraphDatabase.driver(uri, auth=(user, password))
-embedder = SentenceTransformer(embedding_model_name)
+# The Neo4j driver, embedder and LLM are built on first use (see resources.py)
+# so importing this module stays cheap.
 
 
-def get_llm():
-    """Return an LLM instance based on configuration or environment.
+def _build_llm():
+    """Build an LLM instance based on configuration or environment.
 
     Priority: config.LLM_BACKEND -> env LLM_BACKEND -> default 'ollama'
     Supported backends: 'ollama', 'openai'
@@ -40,24 +45,29 @@ def get_llm():
     backend = backend.lower()
 
     if backend == "openai":
+        from langchain_openai import ChatOpenAI
         model_name = config.OPENAI_MODEL
         api_key = config.OPENAI_API_KEY
         if not api_key:
             print("[WARN] OPENAI_API_KEY not set; OpenAI LLM may fail when invoked.")
         try:
-            return ChatOpenAI(model_name=model_name, openai_api_key=api_key, temperature=0)
+            return ChatOpenAI(model_name=model_name, openai_api_key=api_key, temperature=0,
+                              request_timeout=config.NORMALIZE_TIMEOUT)
         except Exception as e:
             print(f"[ERROR] Failed to initialize OpenAI LLM: {e}. Falling back to Ollama.")
 
     # default/fallback: Ollama
+    from langchain_community.llms import Ollama
     try:
-        return Ollama(model=llm_model, temperature=0)
+        return Ollama(model=llm_model, temperature=0, timeout=config.NORMALIZE_TIMEOUT)
     except Exception as e:
         print(f"[ERROR] Failed to initialize Ollama LLM: {e}")
         raise
 
 
-llm = get_llm()
+def get_llm():
+    """Process-wide LLM instance, built on first call."""
+    return resources.singleton("ingest_llm", _build_llm)
 
 
 # -------------------------------
@@ -136,21 +146,354 @@ prompt = PromptTemplate(
     partial_variables={"format_instructions": parser.get_format_instructions()},
 )
 
-# Replace LLMChain with RunnableSequence
-normalize_chain = prompt | llm | parser
+# Replace LLMChain with RunnableSequence (built lazily with the LLM)
+def get_normalize_chain():
+    return resources.singleton("normalize_chain", lambda: prompt | get_llm() | parser)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Parser failures and request timeouts are worth another attempt."""
+    return isinstance(exc, (OutputParserException, TimeoutError)) or "timeout" in type(exc).__name__.lower()
+
+
+def _bump(stats: Optional[Dict], key: str, n: int = 1):
+    """Thread-safe counter increment on a normalization stats dict."""
+    if stats is not None:
+        with stats["lock"]:
+            stats[key] = stats.get(key, 0) + n
+
+
+def _invoke_with_retry(chain, inputs: Dict, stats: Optional[Dict] = None):
+    """Invoke a chain, retrying retryable failures with exponential backoff."""
+    max_retries = config.NORMALIZE_MAX_RETRIES
+    attempt = 0
+    while True:
+        try:
+            return chain.invoke(inputs)
+        except Exception as e:
+            if attempt >= max_retries or not _is_retryable(e):
+                raise
+            delay = config.NORMALIZE_RETRY_BACKOFF * (2 ** attempt)
+            attempt += 1
+            _bump(stats, "retries")
+            print(f"🔁 Retry {attempt}/{max_retries} in {delay:.1f}s after: {e}")
+            time.sleep(delay)
+
+
+# -------------------------------
+# Rule-based fast path
+# -------------------------------
+# Registry of (name, matcher, mapper). The first matcher that accepts a raw
+# record wins and its mapper builds the TicketSchema without calling the LLM.
+SOURCE_MAPPERS = []
+# mapper name -> function returning the record's stable natural key (or None)
+NATURAL_KEYS = {}
+
+
+def register_mapper(name: str, matcher, key=None):
+    """Decorator registering a deterministic mapper for a known source shape.
+
+    `key` optionally extracts a natural key (e.g. the article link) used to
+    derive a stable ticket_id across runs.
+    """
+    def decorator(fn):
+        SOURCE_MAPPERS.append((name, matcher, fn))
+        if key is not None:
+            NATURAL_KEYS[name] = key
+        return fn
+    return decorator
+
+
+def _has_keys(*keys):
+    return lambda raw: all(k in raw for k in keys)
 
 
-def normalize_ticket(raw_obj):
-    """Normalize raw data into a TicketSchema object using the OutputParser."""
-    # Pre-process: ensure ticket_id is not empty before sending to LLM
+def _has_label(label: str):
+    return lambda raw: "properties" in raw and label in (raw.get("labels") or [])
+
+
+def _clean_text(value) -> str:
+    """Strip HTML tags/entities and collapse whitespace."""
+    if value is None:
+        return ""
+    text = html.unescape(re.sub(r"<[^>]+>", " ", str(value)))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _mention_tags(raw: Dict) -> List[str]:
+    """Entity names linked by MENTIONS relationships in the hierarchy export."""
+    tags = []
+    for rel in raw.get("relationships") or []:
+        name = ((rel.get("target") or {}).get("properties") or {}).get("entity_text")
+        if rel.get("type") == "MENTIONS" and name and name not in tags:
+            tags.append(name)
+    return tags
+
+
+def _key(prefix: str, value) -> Optional[str]:
+    value = str(value or "").strip()
+    if not value or value == "No Link":
+        return None
+    return f"{prefix}:{value}"
+
+
+@register_mapper("rss", _has_keys("title", "link", "published", "summary", "source_url"),
+                 key=lambda raw: _key("rss", raw["link"]))
+def _map_rss(raw: Dict) -> TicketSchema:
+    # data_RSS.fetch_and_parse_feed output
+    feed_host = urlparse(raw["source_url"]).netloc
+    return TicketSchema(
+        ticket_id=raw.get("ticket_id", ""),
+        title=_clean_text(raw["title"]),
+        type="rss_article",
+        metadata={
+            "published": _clean_text(raw["published"]),
+            "author_name": _clean_text(raw.get("author", "")),
+            "feed_title": feed_host,
+            "location": "",
+        },
+        description={"description": _clean_text(raw["summary"])},
+        source={"source": feed_host, "url": raw["link"]},
+        tags=list(raw.get("tags") or []),
+    )
+
+
+@register_mapper("github", _has_keys("name", "stars", "description", "url"),
+                 key=lambda raw: _key("github", raw["name"]))
+def _map_github(raw: Dict) -> TicketSchema:
+    # data_github.github_main_ingestion output
+    return TicketSchema(
+        ticket_id=raw.get("ticket_id", ""),
+        title=raw["name"],
+        type="github_repo",
+        metadata={
+            "published": "",
+            "author_name": raw["name"].split("/")[0],
+            "feed_title": "GitHub",
+            "location": "",
+            "stars": str(raw["stars"]),
+        },
+        description={"description": _clean_text(raw["description"])},
+        source={"source": "github", "url": raw["url"]},
+        tags=[],
+    )
+
+
+@register_mapper("startupsavant_startup", _has_label("Startup"),
+                 key=lambda raw: _key("startupsavant", raw["properties"].get("startup_id")))
+def _map_hierarchy_startup(raw: Dict) -> TicketSchema:
+    props = raw["properties"]
+    return TicketSchema(
+        ticket_id=raw.get("ticket_id", ""),
+        title=props["name"],
+        type="startup",
+        metadata={
+            "published": props.get("founded_date", ""),
+            "author_name": "",
+            "feed_title": "StartupSavant",
+            "location": props.get("location", ""),
+            "funding_amount": str(props.get("funding_amount", "")),
+        },
+        description={"description": _clean_text(props.get("description"))},
+        source={"source": props.get("source") or "startupsavant", "url": props.get("website", "")},
+        tags=["Startup"] + [t for t in _mention_tags(raw) if t != props["name"]],
+    )
+
+
+@register_mapper("hierarchy_github_repo", _has_label("GitHubRepo"),
+                 key=lambda raw: _key("github", raw["properties"].get("full_name")))
+def _map_hierarchy_repo(raw: Dict) -> TicketSchema:
+    props = raw["properties"]
+    try:
+        # topics are exported as the string repr of a Python list
+        topics = ast.literal_eval(props.get("topics") or "[]")
+    except (ValueError, SyntaxError):
+        topics = []
+    return TicketSchema(
+        ticket_id=raw.get("ticket_id", ""),
+        title=props["full_name"],
+        type="github_repo",
+        metadata={
+            "published": "",
+            "author_name": props["full_name"].split("/")[0],
+            "feed_title": "GitHub",
+            "location": "",
+            "stars": str(props.get("stars", "")),
+        },
+        description={"description": _clean_text(props.get("description"))},
+        source={"source": "github", "url": props.get("url", "")},
+        tags=[str(t) for t in topics] + _mention_tags(raw),
+    )
+
+
+@register_mapper("hierarchy_article", _has_label("Article"),
+                 key=lambda raw: _key("article", raw["properties"].get("url") or raw["properties"].get("article_id")))
+def _map_hierarchy_article(raw: Dict) -> TicketSchema:
+    props = raw["properties"]
+    return TicketSchema(
+        ticket_id=raw.get("ticket_id", ""),
+        title=_clean_text(props["title"]),
+        type="article",
+        metadata={
+            "published": props.get("published_date", ""),
+            "author_name": "",
+            "feed_title": props.get("source", ""),
+            "location": "",
+        },
+        description={"description": _clean_text(props.get("description"))},
+        source={"source": props.get("source", ""), "url": props.get("url", "")},
+        tags=_mention_tags(raw),
+    )
+
+
+tag_prompt = PromptTemplate(
+    template=(
+        "Extract 3 to 6 short keyword tags (topics, technologies, industries) "
+        "for the following record.\n"
+        "{format_instructions}\n\n"
+        "Title: {title}\n"
+        "Text: {text}"
+    ),
+    input_variables=["title", "text"],
+    partial_variables={"format_instructions": CommaSeparatedListOutputParser().get_format_instructions()},
+)
+
+def get_tag_chain():
+    return resources.singleton("tag_chain", lambda: tag_prompt | get_llm() | CommaSeparatedListOutputParser())
+
+
+def map_known_source(raw_obj: Dict) -> Optional[TicketSchema]:
+    """Build a TicketSchema with the first matching registered mapper, or None."""
+    for name, matcher, mapper in SOURCE_MAPPERS:
+        if not matcher(raw_obj):
+            continue
+        try:
+            return mapper(raw_obj)
+        except Exception as e:
+            print(f"⚠️ Fast-path mapper '{name}' failed, falling back to LLM: {e}")
+            return None
+    return None
+
+
+def natural_key(raw_obj: Dict) -> Optional[str]:
+    """Stable per-source key for a raw record, or None for unknown shapes."""
+    for name, matcher, _ in SOURCE_MAPPERS:
+        if matcher(raw_obj):
+            key_fn = NATURAL_KEYS.get(name)
+            return key_fn(raw_obj) if key_fn else None
+    return None
+
+
+def stable_ticket_id(raw_obj: Dict) -> Optional[str]:
+    """Deterministic ticket_id (UUIDv5 of the natural key) so re-ingestion hits the same Ticket."""
+    key = natural_key(raw_obj)
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, key)) if key else None
+
+
+def record_hash(raw_obj: Dict) -> str:
+    """Content hash of a raw record used for change detection (ticket_id excluded)."""
+    return NormalizationCache.record_key({k: v for k, v in raw_obj.items() if k != "ticket_id"})
+
+
+def extract_tags(ticket: TicketSchema, stats: Optional[Dict] = None) -> Optional[List[str]]:
+    """Tag-only LLM call for fast-path tickets whose source carries no tags.
+
+    Returns None when the call fails so callers can tell it apart from "no tags".
+    """
+    text = (ticket.description or {}).get("description", "")
+    try:
+        tags = _invoke_with_retry(get_tag_chain(), {"title": ticket.title, "text": text[:2000]}, stats)
+        _bump(stats, "llm_tag_calls")
+        return [t.strip() for t in tags if t and t.strip()]
+    except Exception as e:
+        print(f"⚠️ Tag extraction failed for {ticket.ticket_id}: {e}")
+        return None
+
+
+# -------------------------------
+# Normalization cache
+# -------------------------------
+# Bump when the fast-path mappers change their output for the same input.
+NORMALIZER_VERSION = "1"
+
+_normalize_cache: Optional[NormalizationCache] = None
+_normalize_cache_lock = threading.Lock()
+
+
+def normalization_version() -> str:
+    """Fingerprint of everything that shapes a normalized ticket.
+
+    Changing a prompt template, the TicketSchema fields, the mapper registry or
+    the LLM model yields a new version and invalidates the cache.
+    """
+    fingerprint = json.dumps({
+        "normalizer": NORMALIZER_VERSION,
+        "prompt": prompt.template,
+        "tag_prompt": tag_prompt.template,
+        "schema": TicketSchema.model_json_schema(),
+        "mappers": [name for name, _, _ in SOURCE_MAPPERS],
+        "llm": [config.LLM_BACKEND, config.OPENAI_MODEL, llm_model, config.FAST_PATH_LLM_TAGS],
+    }, sort_keys=True)
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+
+def get_normalize_cache() -> Optional[NormalizationCache]:
+    global _normalize_cache
+    if not config.NORMALIZE_CACHE_ENABLED:
+        return None
+    with _normalize_cache_lock:
+        if _normalize_cache is None:
+            _normalize_cache = NormalizationCache(
+                config.NORMALIZE_CACHE_PATH,
+                normalization_version(),
+                max_entries=config.NORMALIZE_CACHE_MAX_ENTRIES,
+            )
+    return _normalize_cache
+
+
+def normalize_ticket(raw_obj, stats: Optional[Dict] = None):
+    """Normalize raw data into a TicketSchema object, consulting the on-disk cache first."""
+    cache = get_normalize_cache()
+    cache_key = None
+    if cache is not None:
+        # hash before a ticket_id is auto-assigned so identical records share a key
+        cache_key = cache.record_key(raw_obj)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return TicketSchema(**cached)
+
+    ticket, cacheable = _normalize_uncached(raw_obj, stats)
+    if ticket is not None and cacheable and cache is not None:
+        cache.put(cache_key, ticket.model_dump())
+    return ticket
+
+
+def _normalize_uncached(raw_obj, stats: Optional[Dict] = None):
+    """Normalize via the fast path or the LLM. Returns (ticket, cacheable)."""
+    # Pre-process: ensure ticket_id is not empty before sending to LLM,
+    # preferring the stable id derived from the record's natural key
     if not raw_obj.get("ticket_id") or not str(raw_obj.get("ticket_id", "")).strip():
-        raw_obj["ticket_id"] = str(uuid.uuid4())
+        raw_obj["ticket_id"] = stable_ticket_id(raw_obj) or str(uuid.uuid4())
     
+    fast_ticket = map_known_source(raw_obj)
+    if fast_ticket is not None:
+        cacheable = True
+        if not fast_ticket.ticket_id:
+            fast_ticket.ticket_id = raw_obj["ticket_id"]
+        if not fast_ticket.tags and config.FAST_PATH_LLM_TAGS:
+            tags = extract_tags(fast_ticket, stats)
+            # don't persist a ticket whose tag call failed; retry it next run
+            cacheable = tags is not None
+            fast_ticket.tags = tags or []
+        _bump(stats, "fast_path")
+        return fast_ticket, cacheable
+
     input_json = json.dumps(raw_obj, ensure_ascii=False)
     
     try:
         # RunnableSequence returns the parsed output directly
-        result = normalize_chain.invoke({"input_json": input_json})
+        _bump(stats, "llm_normalize_calls")
+        result = _invoke_with_retry(get_normalize_chain(), {"input_json": input_json}, stats)
         print(f"Result: {result}")
         
         # result is already parsed by the parser
@@ -159,58 +502,228 @@ def normalize_ticket(raw_obj):
         # print("🐸 parsed ticket", parsed_ticket)
 
         if isinstance(parsed_ticket, TicketSchema):
+            # The input ticket_id is authoritative; don't let the LLM rewrite it
+            parsed_ticket.ticket_id = raw_obj["ticket_id"]
             # Double-check: ensure ticket_id is never empty
             if not parsed_ticket.ticket_id or not parsed_ticket.ticket_id.strip():
                 parsed_ticket.ticket_id = str(uuid.uuid4())
             print(f"✅ Normalized ticket: {parsed_ticket.ticket_id}")
-            return parsed_ticket
+            return parsed_ticket, True
 
         print(f"⚠️ Unexpected result type: {type(parsed_ticket)}")
-        return None
+        return None, False
 
     except Exception as e:
         print(f"⚠️ Failed to normalize record: {e}")
-        return None
+        return None, False
+
+
+def normalize_tickets(raw_records: List[Dict], concurrency: Optional[int] = None) -> List[TicketSchema]:
+    """Normalize records concurrently with a bounded worker pool.
+
+    Input order is preserved and failed records are dropped, so the result
+    feeds straight into `embed_texts` and `ingest_to_neo4j`.
+    """
+    concurrency = concurrency or config.NORMALIZE_CONCURRENCY
+    stats = {"lock": threading.Lock(), "retries": 0}
+    results: List[Optional[TicketSchema]] = [None] * len(raw_records)
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(normalize_ticket, r, stats): i for i, r in enumerate(raw_records)}
+        for fut in tqdm(as_completed(futures), total=len(futures), desc="Normalizing records", unit="rec"):
+            results[futures[fut]] = fut.result()
+    dur = time.time() - start
+
+    normalized = [t for t in results if t]
+    failed = len(raw_records) - len(normalized)
+    rate = len(raw_records) / dur if dur > 0 else 0.0
+    print(f"📊 Normalization summary: {len(normalized)} ok, {failed} failed, "
+          f"{stats['retries']} retries | {rate:.2f} records/sec with {concurrency} workers")
+    print(f"   fast path: {stats.get('fast_path', 0)}, LLM normalize calls: {stats.get('llm_normalize_calls', 0)}, "
+          f"LLM tag calls: {stats.get('llm_tag_calls', 0)}")
+    return normalized
 
 
 # -------------------------------
-# Embedding with SentenceTransformer
+# Embedding (shared E5 service, see embeddings.py)
 # -------------------------------
 def embed_texts(texts: List[str]):
     print("Generating embeddings...")
-    clean_texts = [f"passage: {t.strip()}" for t in texts if t and t.strip()]
+    clean_texts = [t.strip() for t in texts if t and t.strip()]
     start = time.time()
-    embs = embedder.encode(clean_texts, normalize_embeddings=True).tolist()
+    embs = embeddings.embed_passages(clean_texts)
     dur = time.time() - start
     print(f"✨ Embeddings generated for {len(clean_texts)} texts in {dur:.2f}s")
     return embs
 
 
+def embed_chunks(tickets: List[TicketSchema]) -> Dict[str, List[Dict]]:
+    """Chunk every description to the E5 token limit and embed all chunks in one batched pass.
+
+    Returns ticket_id -> [{chunk_id, seq, text, embedding}] for `ingest_to_neo4j`.
+    """
+    print("Chunking descriptions...")
+    start = time.time()
+    owners, texts = [], []
+    for t in tickets:
+        description = (t.description or {}).get("description") if t.description else None
+        for seq, text in enumerate(embeddings.chunk_text(description)):
+            owners.append((t.ticket_id, seq))
+            texts.append(text)
+    chunk_dur = time.time() - start
+
+    embs = embeddings.embed_passages(texts) if texts else []
+    chunks: Dict[str, List[Dict]] = {t.ticket_id: [] for t in tickets}
+    for (ticket_id, seq), text, emb in zip(owners, texts, embs):
+        chunks[ticket_id].append({"chunk_id": f"{ticket_id}:{seq}", "seq": seq, "text": text, "embedding": emb})
+
+    dur = time.time() - start
+    with_chunks = sum(1 for c in chunks.values() if c)
+    print(f"✨ Chunk embeddings: {len(texts)} chunks from {with_chunks}/{len(tickets)} descriptions "
+          f"in {dur:.2f}s (chunking {chunk_dur:.2f}s)")
+    return chunks
+
+
 # -------------------------------
 # Neo4j schema and ingestion
 # -------------------------------
-def init_schema(dim: int):
-    with driver.session() as s:
-        s.run("CREATE CONSTRAINT IF NOT EXISTS FOR (t:Ticket) REQUIRE t.ticket_id IS UNIQUE")
-        s.run("""
-        CREATE VECTOR INDEX ticket_title_embedding IF NOT EXISTS
-        FOR (t:Ticket) ON (t.title_embedding)
-        OPTIONS {indexConfig: {`vector.dimensions`: $dim, `vector.similarity_function`: 'cosine'}}
-        """, {"dim": dim})
+# Constraints and indexes backing the MERGE keys in `ingest_to_neo4j` and the
+# lookups in `retriever.py`. `$dim` is bound for the vector index.
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (t:Ticket) REQUIRE t.ticket_id IS UNIQUE",
+    """
+    CREATE VECTOR INDEX ticket_title_embedding IF NOT EXISTS
+    FOR (t:Ticket) ON (t.title_embedding)
+    OPTIONS {indexConfig: {`vector.dimensions`: $dim, `vector.similarity_function`: 'cosine'}}
+    """,
+    # MERGE (:Entity {parent_id, type}) for metadata/type/content/source children
+    "CREATE INDEX entity_parent_type IF NOT EXISTS FOR (e:Entity) ON (e.parent_id, e.type)",
+    # MERGE (:Entity {parent_id, type:'tag', name})
+    "CREATE INDEX entity_parent_type_name IF NOT EXISTS FOR (e:Entity) ON (e.parent_id, e.type, e.name)",
+    # retriever filters by tag/source name and metadata location
+    "CREATE INDEX entity_type_name IF NOT EXISTS FOR (e:Entity) ON (e.type, e.name)",
+    "CREATE FULLTEXT INDEX entity_lookup_fulltext IF NOT EXISTS FOR (e:Entity) ON EACH [e.name, e.location]",
+    # canonical nodes of graph_model "shared"
+    "CREATE CONSTRAINT tag_key IF NOT EXISTS FOR (t:Tag) REQUIRE t.key IS UNIQUE",
+    "CREATE CONSTRAINT source_key IF NOT EXISTS FOR (s:Source) REQUIRE s.key IS UNIQUE",
+    "CREATE CONSTRAINT location_key IF NOT EXISTS FOR (l:Location) REQUIRE l.key IS UNIQUE",
+    # description chunks and their own vector index
+    "CREATE CONSTRAINT chunk_id IF NOT EXISTS FOR (c:Chunk) REQUIRE c.chunk_id IS UNIQUE",
+    """
+    CREATE VECTOR INDEX chunk_embedding IF NOT EXISTS
+    FOR (c:Chunk) ON (c.embedding)
+    OPTIONS {indexConfig: {`vector.dimensions`: $dim, `vector.similarity_function`: 'cosine'}}
+    """,
+    # hybrid retrieval: exact names in titles and descriptions
+    """
+    CREATE FULLTEXT INDEX ticket_text_fulltext IF NOT EXISTS
+    FOR (n:Ticket|Entity) ON EACH [n.title, n.text]
+    OPTIONS {indexConfig: {`fulltext.analyzer`: 'english'}}
+    """,
+]
+
+
+def index_status() -> List[Dict]:
+    """Name, type, state and population percentage of every index in the database."""
+    with resources.get_neo4j_driver().session() as s:
+        return s.run(
+            "SHOW INDEXES YIELD name, type, state, populationPercent "
+            "RETURN name, type, state, populationPercent ORDER BY name"
+        ).data()
+
+
+def wait_for_indexes(timeout: Optional[float] = None, poll: float = 1.0) -> bool:
+    """Block until every index is ONLINE, printing population progress. Returns False on timeout."""
+    timeout = config.NEO4J_INDEX_WAIT_TIMEOUT if timeout is None else timeout
+    deadline = time.time() + timeout
+    while True:
+        pending = [ix for ix in index_status() if ix["state"] != "ONLINE"]
+        if not pending:
+            return True
+        if any(ix["state"] == "FAILED" for ix in pending) or time.time() >= deadline:
+            for ix in pending:
+                print(f"⚠️ Index {ix['name']} is {ix['state']} ({ix['populationPercent']:.0f}% populated)")
+            return False
+        progress = ", ".join(f"{ix['name']} {ix['populationPercent']:.0f}%" for ix in pending)
+        print(f"⏳ Waiting for indexes: {progress}")
+        time.sleep(poll)
+
+
+def init_schema(dim: int, wait: bool = True):
+    with resources.get_neo4j_driver().session() as s:
+        for stmt in SCHEMA_STATEMENTS:
+            s.run(stmt, {"dim": dim})
+    if wait and not wait_for_indexes():
+        print("⚠️ Some indexes are not online yet; ingestion may fall back to label scans.")
+    for ix in index_status():
+        print(f"   {ix['name']:<32} {ix['type']:<10} {ix['state']:<10} {ix['populationPercent']:.0f}%")
     print("✅ Neo4j schema ready.")
 
 
-def ingest_to_neo4j(tickets: List[TicketSchema]):
-    print("🚀 Ingesting parsed Ticket entities into Neo4j...")
+def fetch_existing_hashes(ticket_ids: List[str]) -> Dict[str, Optional[str]]:
+    """Bulk lookup of `source_hash` for tickets already in the graph (uses the ticket_id constraint)."""
+    def _read(tx, ids):
+        result = tx.run(
+            "UNWIND $ids AS id MATCH (t:Ticket {ticket_id: id}) RETURN t.ticket_id AS id, t.source_hash AS hash",
+            ids=ids,
+        )
+        return {rec["id"]: rec["hash"] for rec in result}
+
+    existing = {}
+    batch = config.INCREMENTAL_CHECK_BATCH
+    with resources.get_neo4j_driver().session() as s:
+        for i in range(0, len(ticket_ids), batch):
+            existing.update(s.execute_read(_read, ticket_ids[i:i + batch]))
+    return existing
+
+
+def assign_source_hashes(raw_records: List[Dict]) -> Dict[str, str]:
+    """Give records their stable ticket_id in place; returns ticket_id -> content hash."""
+    source_hashes = {}
+    for r in raw_records:
+        if not r.get("ticket_id"):
+            tid = stable_ticket_id(r)
+            if tid:
+                r["ticket_id"] = tid
+        if r.get("ticket_id"):
+            source_hashes[r["ticket_id"]] = record_hash(r)
+    return source_hashes
+
+
+def filter_new_or_changed(raw_records: List[Dict]):
+    """Assign stable ticket_ids and drop records whose content is already in Neo4j.
+
+    Returns (records_to_process, source_hashes) where source_hashes maps
+    ticket_id -> content hash to be stored on the Ticket for the next run.
+    """
+    source_hashes = assign_source_hashes(raw_records)
 
-    query = """
+    start = time.time()
+    existing = fetch_existing_hashes(list(source_hashes)) if source_hashes else {}
+    to_process = [
+        r for r in raw_records
+        if not r.get("ticket_id") or existing.get(r["ticket_id"]) != source_hashes[r["ticket_id"]]
+    ]
+    changed = sum(1 for tid in existing if existing[tid] != source_hashes.get(tid))
+    new = len(to_process) - changed
+    skipped = len(raw_records) - len(to_process)
+    print(f"🔎 Incremental check in {time.time() - start:.2f}s: {new} new, {changed} changed, "
+          f"{skipped} unchanged (skipped)")
+    return to_process, source_hashes
+
+
+# Root Ticket plus its private metadata/type/content children.
+INGEST_TICKET_CYPHER = """
     UNWIND $rows AS row
 
     // Root Ticket Node
     MERGE (root:Ticket {ticket_id: row.ticket_id})
     SET root.title = row.title,
         root.type = coalesce(row.type, 'ticket'),
-        root.title_embedding = row.title_embedding
+        root.title_embedding = row.title_embedding,
+        root.source_hash = coalesce(row.source_hash, root.source_hash),
+        root.updated_at = timestamp()
 
     // Metadata Node
     WITH root, row
@@ -235,7 +748,10 @@ def ingest_to_neo4j(tickets: List[TicketSchema]):
         SET content.text = coalesce(row.description.description, '')
     MERGE (root)-[:HAS_CONTENT]->(content)
     )
+"""
 
+# graph_model "per_ticket": private source/tag copies under each ticket.
+PER_TICKET_LINKS_CYPHER = """
     // Source Node — match `source.source`
     WITH root, row
     FOREACH (_ IN CASE WHEN row.source IS NOT NULL THEN [1] ELSE [] END |
@@ -250,7 +766,76 @@ def ingest_to_neo4j(tickets: List[TicketSchema]):
     MERGE (tag:Entity {parent_id: row.ticket_id, type:'tag', name: tagName})
     MERGE (root)-[:HAS_TAG]->(tag)
     )
-    """
+"""
+
+# graph_model "shared": canonical Source/Location/Tag nodes linked from many tickets.
+SHARED_LINKS_CYPHER = """
+    // Drop links from a previous version of this ticket
+    WITH root, row
+    OPTIONAL MATCH (root)-[old:HAS_SOURCE|HAS_LOCATION|HAS_TAG]->()
+    DELETE old
+
+    // Shared Source Node
+    WITH DISTINCT root, row
+    FOREACH (src IN CASE WHEN row.source_ref IS NOT NULL THEN [row.source_ref] ELSE [] END |
+    MERGE (source:Source {key: src.key})
+        ON CREATE SET source:Entity, source.type = 'source', source.name = src.name
+    MERGE (root)-[:HAS_SOURCE]->(source)
+    )
+
+    // Shared Location Node
+    WITH root, row
+    FOREACH (loc IN CASE WHEN row.location_ref IS NOT NULL THEN [row.location_ref] ELSE [] END |
+    MERGE (location:Location {key: loc.key})
+        ON CREATE SET location:Entity, location.type = 'location', location.name = loc.name
+    MERGE (root)-[:HAS_LOCATION]->(location)
+    )
+
+    // Shared Tags
+    WITH root, row
+    FOREACH (tg IN coalesce(row.tag_refs, []) |
+    MERGE (tag:Tag {key: tg.key})
+        ON CREATE SET tag:Entity, tag.type = 'tag', tag.name = tg.name
+    MERGE (root)-[:HAS_TAG]->(tag)
+    )
+"""
+
+
+# Description chunks: replace the ticket's Chunk nodes with the new set.
+CHUNKS_CYPHER = """
+    // Drop chunks beyond the new chunk count
+    WITH root, row
+    OPTIONAL MATCH (root)-[:HAS_CHUNK]->(old:Chunk) WHERE old.seq >= size(row.chunks)
+    DETACH DELETE old
+
+    // Chunk Nodes (vector index `chunk_embedding`)
+    WITH DISTINCT root, row
+    FOREACH (ch IN row.chunks |
+    MERGE (chunk:Chunk {chunk_id: ch.chunk_id})
+        SET chunk.ticket_id = row.ticket_id,
+            chunk.seq       = ch.seq,
+            chunk.text      = ch.text,
+            chunk.embedding = ch.embedding
+    MERGE (root)-[:HAS_CHUNK]->(chunk)
+    )
+"""
+
+
+def _shared_ref(name: Optional[str]) -> Optional[Dict[str, str]]:
+    key = graph_model.canonical_key(name)
+    return {"key": key, "name": " ".join(str(name).split())} if key else None
+
+
+def ingest_to_neo4j(tickets: List[TicketSchema],
+                    source_hashes: Optional[Dict[str, str]] = None,
+                    chunks: Optional[Dict[str, List[Dict]]] = None):
+    """Write tickets; `chunks` (ticket_id -> chunk rows from `embed_chunks`) replaces their Chunk nodes."""
+    print("🚀 Ingesting parsed Ticket entities into Neo4j...")
+    source_hashes = source_hashes or {}
+    shared = graph_model.is_shared()
+    query = INGEST_TICKET_CYPHER + (SHARED_LINKS_CYPHER if shared else PER_TICKET_LINKS_CYPHER)
+    if chunks is not None:
+        query += CHUNKS_CYPHER
 
     rows = []
     for t in tqdm(tickets, desc="Preparing tickets for Neo4j", unit="ticket"):
@@ -259,6 +844,7 @@ def ingest_to_neo4j(tickets: List[TicketSchema]):
             "title": t.title,
             "type": t.type,
             "title_embedding": getattr(t, "title_embedding", None),
+            "source_hash": source_hashes.get(t.ticket_id),
 
             "metadata": t.metadata if t.metadata else None,
 
@@ -272,29 +858,480 @@ def ingest_to_neo4j(tickets: List[TicketSchema]):
 
             "tags": t.tags if t.tags else []
         })
-    # Push to Neo4j
+        if chunks is not None:
+            rows[-1]["chunks"] = chunks.get(t.ticket_id, [])
+        if shared:
+            row = rows[-1]
+            row["source_ref"] = _shared_ref((t.source or {}).get("source"))
+            row["location_ref"] = _shared_ref((t.metadata or {}).get("location"))
+            refs = [_shared_ref(tag) for tag in row["tags"]]
+            row["tag_refs"] = list({r["key"]: r for r in refs if r}.values())
+    # Push to Neo4j in chunks
+    summary = write_rows_in_batches(query, rows)
+    if summary["written"]:
+        version = bump_graph_version()
+        if config.LOCAL_VECTOR_INDEX_ENABLED:
+            import local_index
+            local_index.get_local_index().refresh(resources.get_neo4j_driver(), version)
+    return summary
+
+
+def bump_graph_version() -> int:
+    """Invalidate query-result caches in retriever by advancing the GraphVersion counter."""
+    with resources.get_neo4j_driver().session() as s:
+        return s.execute_write(lambda tx: tx.run(graph_model.BUMP_GRAPH_VERSION_CYPHER).single()["version"])
+
+
+def _run_write(tx, query: str, rows: List[Dict]):
+    tx.run(query, {"rows": rows}).consume()
+
+
+def _write_batch(query: str, rows: List[Dict], failed: List[str]) -> int:
+    """Write one batch in a managed transaction, bisecting on failure to isolate bad rows.
+
+    Transient errors are retried by `execute_write` (up to
+    config.NEO4J_WRITE_RETRY_TIME); if they still fail the whole batch is
+    reported, since splitting it would not help. Returns rows written.
+    """
+    try:
+        with resources.get_neo4j_driver().session() as s:
+            s.execute_write(_run_write, query, rows)
+        return len(rows)
+    except (ServiceUnavailable, SessionExpired, TransientError) as e:
+        print(f"⚠️ Batch of {len(rows)} rows failed after retries: {e}")
+        failed.extend(r["ticket_id"] for r in rows)
+        return 0
+    except Exception as e:
+        if len(rows) == 1:
+            print(f"❌ Bad row {rows[0]['ticket_id']}: {e}")
+            failed.append(rows[0]["ticket_id"])
+            return 0
+        mid = len(rows) // 2
+        return _write_batch(query, rows[:mid], failed) + _write_batch(query, rows[mid:], failed)
+
+
+def write_rows_in_batches(query: str, rows: List[Dict],
+                          batch_size: Optional[int] = None,
+                          concurrency: Optional[int] = None) -> Dict:
+    """Write UNWIND rows in configurable batches over one or more concurrent sessions."""
+    batch_size = batch_size or config.NEO4J_WRITE_BATCH_SIZE
+    concurrency = concurrency or config.NEO4J_WRITE_CONCURRENCY
+    batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+    failed: List[str] = []
+    latencies: List[float] = []
+
+    def _timed(batch):
+        t0 = time.time()
+        written = _write_batch(query, batch, failed)
+        return written, time.time() - t0
+
     start = time.time()
-    with driver.session() as s:
-        s.run(query, {"rows": rows})
+    written = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(_timed, b) for b in batches]
+        for fut in tqdm(as_completed(futures), total=len(futures), desc="Writing batches", unit="batch"):
+            n, latency = fut.result()
+            written += n
+            latencies.append(latency)
     duration = time.time() - start
 
-    print(f"✅ Successfully ingested {len(rows)} tickets into Neo4j in {duration:.2f}s.")
+    rate = written / duration if duration > 0 else 0.0
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] if latencies else 0.0
+    worst = latencies[-1] if latencies else 0.0
+    print(f"✅ Successfully ingested {written}/{len(rows)} tickets into Neo4j in {duration:.2f}s "
+          f"({rate:.1f} rows/sec, {len(batches)} batches of ≤{batch_size}, {concurrency} sessions, "
+          f"batch latency p50 {p50:.2f}s / max {worst:.2f}s).")
+    if failed:
+        print(f"⚠️ {len(failed)} tickets failed to write: {failed[:10]}{' ...' if len(failed) > 10 else ''}")
+    return {"written": written, "failed": failed, "duration": duration, "batch_latencies": latencies}
+
+
+# -------------------------------
+# Migration: per-ticket -> shared Tag/Source/Location nodes
+# -------------------------------
+_MIGRATION_STEPS = [
+    # (label, relationship, query returning eid/ticket_id/name for unmigrated items, delete old node?)
+    ("Tag", "HAS_TAG", """
+        MATCH (t:Ticket)-[:HAS_TAG]->(e:Entity {type:'tag'}) WHERE e.parent_id IS NOT NULL
+        RETURN elementId(e) AS eid, t.ticket_id AS ticket_id, e.name AS name LIMIT $limit
+    """, True),
+    ("Source", "HAS_SOURCE", """
+        MATCH (t:Ticket)-[:HAS_SOURCE]->(e:Entity {type:'source'}) WHERE e.parent_id IS NOT NULL
+        RETURN elementId(e) AS eid, t.ticket_id AS ticket_id, e.name AS name LIMIT $limit
+    """, True),
+    ("Location", "HAS_LOCATION", """
+        MATCH (t:Ticket)-[:HAS_METADATA]->(e:Entity {type:'metadata'})
+        WHERE trim(coalesce(e.location, '')) <> '' AND NOT (t)-[:HAS_LOCATION]->(:Location)
+        RETURN elementId(e) AS eid, t.ticket_id AS ticket_id, e.location AS name LIMIT $limit
+    """, False),
+]
+
+
+def migrate_to_shared_graph(batch_size: int = 1000):
+    """Convert existing per-ticket tag/source copies (and metadata locations) into shared nodes.
+
+    Idempotent and resumable: each step repeats until no unmigrated items are
+    left. Metadata nodes are kept; per-ticket tag/source nodes are deleted.
+    Run once before switching config.GRAPH_MODEL to "shared".
+    """
+    for label, rel, select_query, delete_old in _MIGRATION_STEPS:
+        delete_clause = "WITH e DETACH DELETE e" if delete_old else ""
+        write_query = f"""
+        UNWIND $rows AS row
+        MATCH (t:Ticket {{ticket_id: row.ticket_id}})
+        MATCH (e) WHERE elementId(e) = row.eid
+        FOREACH (_ IN CASE WHEN row.key <> '' THEN [1] ELSE [] END |
+        MERGE (n:{label} {{key: row.key}})
+            ON CREATE SET n:Entity, n.type = toLower('{label}'), n.name = row.name
+        MERGE (t)-[:{rel}]->(n)
+        )
+        {delete_clause}
+        """
+        migrated = 0
+        while True:
+            with resources.get_neo4j_driver().session() as s:
+                found = s.execute_read(lambda tx: tx.run(select_query, limit=batch_size).data())
+                if not found:
+                    break
+                rows = [{**r, "key": graph_model.canonical_key(r["name"])} for r in found]
+                s.execute_write(_run_write, write_query, rows)
+            migrated += len(rows)
+            if not delete_old and not any(r["key"] for r in rows):
+                break
+        print(f"✅ Migrated {migrated} {label} links to shared nodes.")
+    bump_graph_version()
+
+
+# -------------------------------
+# Backfill: description chunks for tickets ingested before chunking
+# -------------------------------
+# Incremental runs skip unchanged tickets (source_hash), so enabling
+# CHUNK_EMBEDDINGS_ENABLED alone never chunks the tickets already stored.
+_UNCHUNKED_TICKETS_CYPHER = """
+    MATCH (t:Ticket) WHERE t.ticket_id > $after AND NOT (t)-[:HAS_CHUNK]->()
+    OPTIONAL MATCH (t)-[:HAS_CONTENT]->(c:Entity)
+    RETURN t.ticket_id AS ticket_id, t.title AS title, c.text AS text
+    ORDER BY ticket_id LIMIT $limit
+"""
+_BACKFILL_CHUNKS_CYPHER = """
+    UNWIND $rows AS row
+    MATCH (root:Ticket {ticket_id: row.ticket_id})
+""" + CHUNKS_CYPHER
+
+
+def backfill_chunks(batch_size: int = 1000) -> int:
+    """Create the chunk_embedding index and add Chunk nodes to every ticket that has none.
+
+    Resumable: tickets are walked in ticket_id order and only those without
+    chunks are read. Run before switching config.CHUNK_EMBEDDINGS_ENABLED on
+    for a database built without it. Returns the number of tickets chunked.
+    """
+    with resources.get_neo4j_driver().session() as s:
+        found = s.run("MATCH (t:Ticket) WHERE t.title_embedding IS NOT NULL "
+                      "RETURN size(t.title_embedding) AS dim LIMIT 1").data()
+    if not found:
+        print("✅ No embedded tickets; nothing to backfill.")
+        return 0
+    init_schema(found[0]["dim"])
+
+    after, chunked = "", 0
+    while True:
+        with resources.get_neo4j_driver().session() as s:
+            found = s.execute_read(lambda tx: tx.run(_UNCHUNKED_TICKETS_CYPHER, after=after,
+                                                     limit=batch_size).data())
+        if not found:
+            break
+        after = found[-1]["ticket_id"]
+        tickets = [TicketSchema(ticket_id=r["ticket_id"], title=r["title"] or "",
+                                description={"description": r["text"] or ""}) for r in found]
+        rows = [{"ticket_id": tid, "chunks": chunks}
+                for tid, chunks in embed_chunks(tickets).items() if chunks]
+        if rows:
+            chunked += write_rows_in_batches(_BACKFILL_CHUNKS_CYPHER, rows)["written"]
+    print(f"✅ Backfilled description chunks for {chunked} tickets.")
+    if chunked:
+        version = bump_graph_version()
+        if config.LOCAL_VECTOR_INDEX_ENABLED and config.CHUNK_EMBEDDINGS_ENABLED:
+            import local_index
+            local_index.get_local_index().refresh(resources.get_neo4j_driver(), version)
+    return chunked
+
+
+
+# -------------------------------
+# Bulk import (neo4j-admin) for initial corpus builds
+# -------------------------------
+# One file per node/relationship kind, in the neo4j-admin CSV format, with the
+# same labels, properties and relationships that `ingest_to_neo4j` produces.
+# Entity children get synthetic ids in the "Entity" id space (`:ID(Entity)`
+# stores no property), so only ticket_id, chunk_id and shared keys persist.
+BULK_FILES = {
+    "tickets": ("nodes", ["ticket_id:ID(Ticket)", ":LABEL", "title", "type", "title_embedding:double[]",
+                          "source_hash", "updated_at:long"]),
+    "entities": ("nodes", [":ID(Entity)", ":LABEL", "parent_id", "type", "name", "text",
+                           "published", "author_name", "feed_title", "location"]),
+    "shared_entities": ("nodes", [":ID(Entity)", ":LABEL", "key", "type", "name"]),
+    "chunks": ("nodes", ["chunk_id:ID(Chunk)", ":LABEL", "ticket_id", "seq:long", "text", "embedding:double[]"]),
+    "graph_version": ("nodes", [":ID(GraphVersion)", ":LABEL", "name", "version:long", "updated_at:long"]),
+    "ticket_entity_rels": ("relationships", [":START_ID(Ticket)", ":END_ID(Entity)", ":TYPE"]),
+    "entity_entity_rels": ("relationships", [":START_ID(Entity)", ":END_ID(Entity)", ":TYPE"]),
+    "ticket_chunk_rels": ("relationships", [":START_ID(Ticket)", ":END_ID(Chunk)", ":TYPE"]),
+}
+BULK_ARRAY_DELIMITER = ";"
+_array_formats: Dict[int, str] = {}
+
+
+def _bulk_value(value, column: str) -> str:
+    if value is None:
+        return ""
+    if column.endswith("[]"):
+        # 9 significant digits round-trip the model's float32 outputs; one %-format per
+        # dimension is several times faster than joining repr() of each float
+        fmt = _array_formats.get(len(value))
+        if fmt is None:
+            fmt = _array_formats[len(value)] = BULK_ARRAY_DELIMITER.join(["%.9g"] * len(value))
+        return fmt % tuple(value)
+    if column.endswith(":long"):
+        return str(int(value))
+    # strings are always quoted so that '' imports as an empty string, not null
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class BulkImportWriter:
+    """Streams tickets into neo4j-admin import files under `out_dir`.
+
+    Call `add()` per batch and `close()` at the end; tickets already written
+    are skipped (the first copy wins) and shared Tag/Source/Location nodes are
+    written once per key.
+    """
+
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+        self.shared = graph_model.is_shared()
+        self.counts = {name: 0 for name in BULK_FILES}
+        self.duplicates = 0
+        self.dim = None
+        self._tickets = set()
+        self._shared_keys = set()
+        self._files = {}
+        for name, (_, header) in BULK_FILES.items():
+            f = open(os.path.join(out_dir, f"{name}.csv"), "w", encoding="utf-8", newline="")
+            f.write(",".join(header) + "\n")
+            self._files[name] = f
+
+    def _row(self, name: str, *values):
+        header = BULK_FILES[name][1]
+        self._files[name].write(",".join(_bulk_value(v, c) for v, c in zip(values, header)) + "\n")
+        self.counts[name] += 1
+
+    def _entity(self, entity_id, labels, parent_id, type_, name=None, text=None, meta=None):
+        meta = meta or {}
+        self._row("entities", entity_id, labels, parent_id, type_, name, text,
+                  meta.get("published"), meta.get("author_name"), meta.get("feed_title"), meta.get("location"))
+
+    def _shared_entity(self, kind: str, ref: Optional[Dict[str, str]], rel: str, ticket_id: str):
+        if not ref:
+            return
+        entity_id = f"shared:{kind}:{ref['key']}"
+        if entity_id not in self._shared_keys:
+            self._shared_keys.add(entity_id)
+            self._row("shared_entities", entity_id, f"{kind.capitalize()};Entity", ref["key"], kind, ref["name"])
+        self._row("ticket_entity_rels", ticket_id, entity_id, rel)
+
+    def add(self, tickets: List[TicketSchema], source_hashes: Optional[Dict[str, str]] = None,
+            chunks: Optional[Dict[str, List[Dict]]] = None):
+        source_hashes = source_hashes or {}
+        now = int(time.time() * 1000)
+        for t in tickets:
+            tid = t.ticket_id
+            if tid in self._tickets:
+                self.duplicates += 1
+                continue
+            self._tickets.add(tid)
+            embedding = getattr(t, "title_embedding", None)
+            if embedding is not None:
+                self.dim = self.dim or len(embedding)
+            self._row("tickets", tid, "Ticket", t.title, t.type or "ticket", embedding,
+                      source_hashes.get(tid), now)
+
+            if t.metadata:
+                meta = {k: t.metadata.get(k) or "" for k in ("published", "author_name", "feed_title", "location")}
+                self._entity(f"{tid}|metadata", "Entity", tid, "metadata", meta=meta)
+                self._row("ticket_entity_rels", tid, f"{tid}|metadata", "HAS_METADATA")
+                self._entity(f"{tid}|type", "Entity", tid, "type", name=t.type or "N/A")
+                self._row("entity_entity_rels", f"{tid}|metadata", f"{tid}|type", "HAS_TYPE")
+            if t.description:
+                self._entity(f"{tid}|content", "Entity", tid, "content",
+                             text=t.description.get("description") or "")
+                self._row("ticket_entity_rels", tid, f"{tid}|content", "HAS_CONTENT")
+
+            if self.shared:
+                self._shared_entity("source", _shared_ref((t.source or {}).get("source")), "HAS_SOURCE", tid)
+                self._shared_entity("location", _shared_ref((t.metadata or {}).get("location")), "HAS_LOCATION", tid)
+                refs = {r["key"]: r for r in (_shared_ref(tag) for tag in t.tags or []) if r}
+                for ref in refs.values():
+                    self._shared_entity("tag", ref, "HAS_TAG", tid)
+            else:
+                if t.source:
+                    self._entity(f"{tid}|source", "Entity", tid, "source", name=t.source.get("source") or "")
+                    self._row("ticket_entity_rels", tid, f"{tid}|source", "HAS_SOURCE")
+                for tag in dict.fromkeys(t.tags or []):
+                    self._entity(f"{tid}|tag|{tag}", "Entity", tid, "tag", name=tag)
+                    self._row("ticket_entity_rels", tid, f"{tid}|tag|{tag}", "HAS_TAG")
+
+            for ch in (chunks or {}).get(tid, []):
+                self._row("chunks", ch["chunk_id"], "Chunk", tid, ch["seq"], ch["text"], ch["embedding"])
+                self._row("ticket_chunk_rels", tid, ch["chunk_id"], "HAS_CHUNK")
+
+    def close(self) -> Dict:
+        """Finish the files and write `manifest.json`; returns the manifest."""
+        self._row("graph_version", "tickets", "GraphVersion", "tickets", 1, int(time.time() * 1000))
+        for f in self._files.values():
+            f.close()
+        manifest = {
+            "files": {name: {"kind": kind, "path": f"{name}.csv", "rows": self.counts[name]}
+                      for name, (kind, _) in BULK_FILES.items()},
+            "dim": self.dim,
+            "graph_model": graph_model.graph_model(),
+            "array_delimiter": BULK_ARRAY_DELIMITER,
+        }
+        with open(os.path.join(self.out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def bulk_import_command(out_dir: str, database: str = "neo4j") -> str:
+    """The neo4j-admin (5.x) command that loads `out_dir` into an empty `database`."""
+    args = [f"neo4j-admin database import full {database} --overwrite-destination",
+            "--multiline-fields=true", f'--array-delimiter="{BULK_ARRAY_DELIMITER}"']
+    for name, (kind, _) in BULK_FILES.items():
+        args.append(f"--{kind}={os.path.join(os.path.abspath(out_dir), name + '.csv')}")
+    return " \\\n    ".join(args)
+
+
+def validate_bulk_files(out_dir: str) -> List[str]:
+    """Check the shape of a bulk-import directory without Neo4j; returns the problems found.
+
+    Verifies headers, column counts, id uniqueness per id space, embedding
+    dimensions and that every relationship endpoint exists.
+    """
+    import csv
+
+    with open(os.path.join(out_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    problems, ids = [], {}
+    rels = {"HAS_METADATA", "HAS_TYPE", "HAS_CONTENT", "HAS_SOURCE", "HAS_TAG", "HAS_LOCATION", "HAS_CHUNK"}
+    # nodes first, so relationship endpoints can be checked against them
+    ordered = sorted(manifest["files"].items(), key=lambda kv: kv[1]["kind"] != "nodes")
+    for name, info in ordered:
+        with open(os.path.join(out_dir, info["path"]), encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header != BULK_FILES[name][1]:
+                problems.append(f"{name}: unexpected header {header}")
+                continue
+            rows = 0
+            for line, row in enumerate(reader, start=2):
+                rows += 1
+                if len(row) != len(header):
+                    problems.append(f"{name}:{line}: {len(row)} columns, expected {len(header)}")
+                    continue
+                for column, value in zip(header, row):
+                    if ":ID(" in column:
+                        space = column.split("(")[1].rstrip(")")
+                        if value in ids.setdefault(space, set()):
+                            problems.append(f"{name}:{line}: duplicate {space} id {value!r}")
+                        ids[space].add(value)
+                    elif column.startswith((":START_ID(", ":END_ID(")):
+                        space = column.split("(")[1].rstrip(")")
+                        if value not in ids.get(space, set()):
+                            problems.append(f"{name}:{line}: {column} {value!r} has no node")
+                    elif column == ":TYPE" and value not in rels:
+                        problems.append(f"{name}:{line}: unknown relationship type {value!r}")
+                    elif column.endswith("[]") and value:
+                        try:
+                            vec = [float(x) for x in value.split(manifest["array_delimiter"])]
+                        except ValueError:
+                            problems.append(f"{name}:{line}: {column} is not a float array")
+                            continue
+                        if manifest["dim"] and len(vec) != manifest["dim"]:
+                            problems.append(f"{name}:{line}: {column} has {len(vec)} dims, expected {manifest['dim']}")
+            if rows != info["rows"]:
+                problems.append(f"{name}: {rows} rows, manifest says {info['rows']}")
+    return problems
+
+
+def iter_bulk_batches(sources: Optional[List[str]] = None, batch_size: Optional[int] = None):
+    """Raw records for a bulk export, `batch_size` at a time, from the full hierarchy export and GitHub."""
+    sources = sources or config.BULK_SOURCES
+    batch_size = batch_size or config.BULK_BATCH_SIZE
+    if "hierarchy" in sources:
+        yield from data_hierarchy.iter_batches(batch_size, limit=None, labels=config.HIERARCHY_LABELS)
+    if "github" in sources:
+        repos = data_github.harvest()
+        for i in range(0, len(repos), batch_size):
+            yield [data_github.repo_record(r) for r in repos[i:i + batch_size]]
+
+
+def bulk_export_pipeline(out_dir: str, sources: Optional[List[str]] = None, batch_size: Optional[int] = None) -> Dict:
+    """Normalize, embed and write the corpus to neo4j-admin import files one source batch at a time.
+
+    Only the current batch is held in memory; returns the writer's manifest.
+    """
+    start = time.time()
+    writer = BulkImportWriter(out_dir)
+    raw_total = 0
+    for batch in iter_bulk_batches(sources, batch_size):
+        raw_total += len(batch)
+        # stable ids and hashes let later incremental runs skip the imported records
+        source_hashes = assign_source_hashes(batch)
+        normalized = normalize_tickets(batch)
+        if not normalized:
+            continue
+        for t, emb in zip(normalized, embed_texts([t.title for t in normalized])):
+            t.title_embedding = emb
+        chunks = embed_chunks(normalized) if config.CHUNK_EMBEDDINGS_ENABLED else None
+        writer.add(normalized, source_hashes, chunks)
+        print(f"📦 {raw_total} records read, {writer.counts['tickets']} tickets written")
+    manifest = writer.close()
+
+    rows = sum(f["rows"] for f in manifest["files"].values())
+    print(f"📦 Wrote {rows} import rows ({writer.counts['tickets']} tickets, {writer.duplicates} duplicates skipped) "
+          f"to {out_dir} in {time.time() - start:.2f}s. Load them with:\n")
+    print(bulk_import_command(out_dir))
+    print(f"\nthen create the indexes: python metadataToNeo4j.py --bulk-finish {manifest['dim']}")
+    return manifest
+
+
+def finish_bulk_import(dim: int):
+    """After `neo4j-admin database import`, create the constraints and indexes `ingest_to_neo4j` relies on."""
+    init_schema(dim)
 
 
 
 # -------------------------------
 # Main ingestion pipeline
 # -------------------------------
-def ingest_pipeline():
+def ingest_pipeline(incremental: Optional[bool] = None):
+    """Load, normalize, embed and write to Neo4j."""
     raw_data = load_data()
     print(f"📦 Loaded {len(raw_data)} raw records.")
 
-    # normalize with progress bar and timing
-    normalized = []
+    if incremental is None:
+        incremental = config.INCREMENTAL_INGESTION
+    source_hashes = {}
+    if incremental:
+        raw_data, source_hashes = filter_new_or_changed(raw_data)
+        if not raw_data:
+            print("✅ Nothing new to ingest.")
+            data_RSS.commit_feed_state()
+            return
+
+    # normalize concurrently with progress bar and timing
     start_norm = time.time()
-    for r in tqdm(raw_data, desc="Normalizing records", unit="rec"):
-        normalized.append(normalize_ticket(r))
-    normalized = [t for t in normalized if t]
+    normalized = normalize_tickets(raw_data)
     dur_norm = time.time() - start_norm
     print(f"✨ Normalization finished: {len(normalized)} valid tickets in {dur_norm:.2f}s")
 
@@ -304,29 +1341,72 @@ def ingest_pipeline():
 
     titles = [t.title for t in normalized]
     # embedding (timed inside embed_texts)
+    start_emb = time.time()
     title_embs = embed_texts(titles)
+    dur_titles = time.time() - start_emb
 
     # attach embeddings with progress
     for t, emb in tqdm(list(zip(normalized, title_embs)), desc="Attaching embeddings", unit="ticket"):
         t.title_embedding = emb
 
+    chunks = None
+    if config.CHUNK_EMBEDDINGS_ENABLED:
+        start_chunks = time.time()
+        chunks = embed_chunks(normalized)
+        dur_chunks = time.time() - start_chunks
+        print(f"📎 Description chunks added {dur_chunks:.2f}s to {dur_titles:.2f}s of title embedding "
+              f"({dur_chunks / dur_titles if dur_titles else 0:.1f}x).")
+
     init_schema(len(title_embs[0]))
 
     start_ing = time.time()
-    ingest_to_neo4j(normalized)
+    summary = ingest_to_neo4j(normalized, source_hashes, chunks)
     dur_ing = time.time() - start_ing
     print(f"Ingestion complete! Took {dur_ing:.2f}s")
+    # only mark the fetched feeds as seen once every record made it into the graph
+    if len(normalized) == len(raw_data) and not summary["failed"]:
+        data_RSS.commit_feed_state()
+    else:
+        print("⚠️ Some records were not ingested; RSS feeds will be fetched again next run.")
 
     total = time.time() - start_norm
     print(f"Total pipeline time: {total:.2f}s")
 
+    cache = get_normalize_cache()
+    if cache is not None:
+        cache.print_stats()
+    embedding_cache = embeddings.get_embedding_cache()
+    if embedding_cache is not None:
+        embedding_cache.print_stats()
 
-if __name__ == "__main__":
 
-
-    # test_connection(driver)
-    # ingest_pipeline()
-
-
-    article = load_data()
-    normalize_ticket(article[0])
\ No newline at end of file
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="TrendScout AI ingestion.")
+    parser.add_argument("--bulk-export", metavar="DIR", help="write neo4j-admin import files instead of MERGEing")
+    parser.add_argument("--bulk-sources", nargs="+", choices=["hierarchy", "github"],
+                        help="sources read by --bulk-export (default: config.BULK_SOURCES)")
+    parser.add_argument("--bulk-validate", metavar="DIR", help="check the shape of a bulk-import directory")
+    parser.add_argument("--bulk-finish", metavar="DIM", type=int, help="create indexes after neo4j-admin import")
+    parser.add_argument("--backfill-chunks", action="store_true",
+                        help="add description chunks to tickets stored before CHUNK_EMBEDDINGS_ENABLED")
+    args = parser.parse_args()
+
+    if args.bulk_export:
+        bulk_export_pipeline(args.bulk_export, sources=args.bulk_sources)
+    elif args.bulk_validate:
+        problems = validate_bulk_files(args.bulk_validate)
+        for problem in problems[:50]:
+            print(f"❌ {problem}")
+        print("✅ Bulk-import files look valid." if not problems else f"⚠️ {len(problems)} problems found.")
+    elif args.bulk_finish:
+        finish_bulk_import(args.bulk_finish)
+    elif args.backfill_chunks:
+        backfill_chunks()
+    else:
+        # test_connection(resources.get_neo4j_driver())
+        # ingest_pipeline()
+
+        article = load_data()
+        normalize_ticket(article[0])
\ No newline at end of file
@@ -0,0 +1,101 @@
+import os, json, time, hashlib, sqlite3, threading
+from typing import Optional, Dict, Any
+
+
+# ---------------------------------------------------------------------
+# Persistent normalization cache (SQLite)
+# ---------------------------------------------------------------------
+class NormalizationCache:
+    """On-disk cache of normalized tickets keyed by raw-record content hash.
+
+    Keys are a SHA-256 of the canonical raw record JSON. Every entry is tagged
+    with a `version` string (derived from the prompt templates and the
+    TicketSchema fields), and entries from any other version are dropped when
+    the cache is opened, so prompt or schema edits invalidate it automatically.
+    Size is bounded by `max_entries` with least-recently-used eviction.
+    """
+
+    def __init__(self, path: str, version: str, max_entries: int = 50000):
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key         TEXT PRIMARY KEY,
+                    version     TEXT NOT NULL,
+                    value       TEXT NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access)")
+            stale = self._conn.execute("DELETE FROM entries WHERE version != ?", (version,)).rowcount
+            self._size = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if stale:
+            print(f"♻️ Normalization cache: dropped {stale} entries from an older prompt/schema version.")
+
+    @staticmethod
+    def record_key(raw_obj: Dict[str, Any]) -> str:
+        """Stable hash of a raw record (key order independent)."""
+        canonical = json.dumps(raw_obj, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND version = ?", (key, self.version)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._conn:
+                self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any]):
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._conn:
+            existed = self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, version, value, last_access) VALUES (?, ?, ?, ?)",
+                (key, self.version, payload, time.time()),
+            )
+            if not existed:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict(self._size - self.max_entries)
+
+    def _evict(self, n: int):
+        # caller holds the lock and an open transaction
+        removed = self._conn.execute(
+            "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY last_access ASC LIMIT ?)", (n,)
+        ).rowcount
+        self._size -= removed
+        self.evictions += removed
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": self._size,
+        }
+
+    def print_stats(self):
+        st = self.stats()
+        print(f"🗄️ Normalization cache: {st['hits']} hits, {st['misses']} misses "
+              f"({st['hit_rate']:.0%} hit rate), {st['evictions']} evicted, {st['entries']} entries stored")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,116 @@
+import os, json, time, hashlib, sqlite3, threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+# ---------------------------------------------------------------------
+# In-memory LRU + TTL cache with optional SQLite persistence
+# ---------------------------------------------------------------------
+_MISSING = object()
+
+
+def make_key(*parts: Any) -> str:
+    """Stable hash of JSON-serializable key parts."""
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def normalize_query_text(text: str) -> str:
+    return " ".join(str(text or "").split()).lower()
+
+
+class TTLCache:
+    """LRU cache whose entries expire after `ttl` seconds.
+
+    With `path`, entries are also written to a SQLite table (shared by all
+    caches using the same file, separated by `name`) and read back on a memory
+    miss, so they survive process restarts.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float, path: Optional[str] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS query_cache (
+                        cache      TEXT NOT NULL,
+                        key        TEXT NOT NULL,
+                        value      TEXT NOT NULL,
+                        expires_at REAL NOT NULL,
+                        PRIMARY KEY (cache, key)
+                    )""")
+                self._conn.execute("DELETE FROM query_cache WHERE expires_at < ?", (time.time(),))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] >= now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._data[key]
+
+            value = self._load(key, now)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._remember(key, value[0], value[1])
+            return value[0]
+
+    def put(self, key: str, value: Any):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO query_cache (cache, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                        (self.name, key, json.dumps(value, ensure_ascii=False, default=str), expires_at),
+                    )
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM query_cache WHERE cache = ?", (self.name,))
+
+    def _remember(self, key: str, value: Any, expires_at: float):
+        # caller holds the lock
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def _load(self, key: str, now: float):
+        # caller holds the lock
+        if self._conn is None:
+            return _MISSING
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM query_cache WHERE cache = ? AND key = ?", (self.name, key)
+        ).fetchone()
+        if row is None or row[1] < now:
+            return _MISSING
+        return json.loads(row[0]), row[1]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._data),
+        }
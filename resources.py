@@ -0,0 +1,97 @@
+"""
+Lazily constructed, process-wide singletons for expensive clients and models.
+
+Nothing heavy is imported or created until first use, so importing
+`retriever`, `metadataToNeo4j` or `llm_response` is cheap and does not touch
+the network. Each component records its import and initialization time;
+`startup_report()` prints them.
+"""
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import config
+
+
+_instances: Dict[str, Any] = {}
+_timings: Dict[str, Dict[str, float]] = {}
+_lock = threading.RLock()
+
+
+def _import(component: str, module: str):
+    """Import a module, charging the time to `component`'s import cost."""
+    start = time.perf_counter()
+    mod = importlib.import_module(module)
+    timing = _timings.setdefault(component, {"import": 0.0, "init": 0.0})
+    timing["import"] += time.perf_counter() - start
+    return mod
+
+
+def singleton(name: str, factory: Callable[[], Any]) -> Any:
+    """Return the cached instance for `name`, building it with `factory` on first use."""
+    if name in _instances:
+        return _instances[name]
+    with _lock:
+        if name not in _instances:
+            timing = _timings.setdefault(name, {"import": 0.0, "init": 0.0})
+            start = time.perf_counter()
+            instance = factory()
+            # factory time minus what _import already charged as import cost
+            timing["init"] = time.perf_counter() - start - timing["import"]
+            _instances[name] = instance
+    return _instances[name]
+
+
+# ---------------------------------------------------------------------
+# Components
+# ---------------------------------------------------------------------
+def get_neo4j_driver():
+    def _build():
+        neo4j = _import("neo4j", "neo4j")
+        return neo4j.GraphDatabase.driver(
+            config.NEO4J_URI,
+            auth=(config.NEO4J_USER, config.NEO4J_PASSWORD),
+            max_transaction_retry_time=config.NEO4J_WRITE_RETRY_TIME,
+        )
+    return singleton("neo4j", _build)
+
+
+def get_openai_client():
+    def _build():
+        openai = _import("openai", "openai")
+        return openai.OpenAI(api_key=config.OPENAI_API_KEY)
+    return singleton("openai", _build)
+
+
+def get_embedder():
+    """Shared E5 embedder for queries and passages (see embeddings.py)."""
+    def _build():
+        embeddings = _import("embedder", "embeddings")
+        _import("embedder", "transformers")
+        return embeddings.build_embedder()
+    return singleton("embedder", _build)
+
+
+WARMUP_COMPONENTS = {
+    "neo4j": get_neo4j_driver,
+    "openai": get_openai_client,
+    "embedder": get_embedder,
+}
+
+
+def warm_up(components: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    """Eagerly build the given components (all by default) and return the timing report."""
+    for name in components or list(WARMUP_COMPONENTS):
+        WARMUP_COMPONENTS[name]()
+    return startup_report()
+
+
+def startup_report(print_report: bool = True) -> Dict[str, Dict[str, float]]:
+    """Import and initialization seconds per component built so far."""
+    report = {name: dict(t) for name, t in _timings.items()}
+    if print_report and report:
+        print("⏱️ Startup cost per component:")
+        for name, t in report.items():
+            print(f"   {name:<22} import {t['import']:.2f}s  init {t['init']:.2f}s")
+    return report
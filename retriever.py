@@ -1,38 +1,80 @@
 from __future__ import annotations
 from typing import List, Dict, Any, Optional, Tuple
-from neo4j import GraphDatabase
-from transformers import AutoTokenizer, AutoModel
-import torch, json, config
-from openai import OpenAI
+import json, re, time, threading, config
+from concurrent.futures import ThreadPoolExecutor
+import embeddings
+import graph_model
+import local_extractor
+import resources
+from query_cache import TTLCache, make_key, normalize_query_text
 
 
 # ---------------------------------------------------------------------
-# Load E5 Embedding Model
+# E5 Embedding (shared with ingestion, loaded lazily on first query)
 # ---------------------------------------------------------------------
-print(f"Loading E5 model: {config.E5_MODEL_NAME}")
-_tokenizer = AutoTokenizer.from_pretrained(config.E5_MODEL_NAME)
-_model = AutoModel.from_pretrained(config.E5_MODEL_NAME)
-
-@torch.no_grad()
 def embed_e5_query(text: str) -> List[float]:
     """Return normalized E5 embedding for a user query."""
-    text = text.strip()
-    if not text.lower().startswith("query:"):
-        text = "query: " + text
-    inputs = _tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-    outputs = _model(**inputs)
-    emb = outputs.last_hidden_state.mean(dim=1)
-    emb = torch.nn.functional.normalize(emb, p=2, dim=1)
-    return emb[0].cpu().tolist()
+    return embeddings.embed_query(text)
 
-driver = GraphDatabase.driver(config.NEO4J_URI, auth=(config.NEO4J_USER, config.NEO4J_PASSWORD))
 
-client = OpenAI(api_key=config.OPENAI_API_KEY)
+# ---------------------------------------------------------------------
+# Query-level caches
+# ---------------------------------------------------------------------
+# query text -> extracted entities, summary -> embedding,
+# (embedding, filters, top_k, graph version) -> ranked results
+def _make_cache(name: str, ttl: float) -> Optional[TTLCache]:
+    if not config.QUERY_CACHE_ENABLED:
+        return None
+    return TTLCache(name, config.QUERY_CACHE_MAX_ENTRIES, ttl, path=config.QUERY_CACHE_PATH)
 
 
-def extract_entities_with_gpt4(user_query: str) -> Tuple[List[str], List[str], List[str], str]:
-    """Use OpenAI API to extract tags, locations, sources, and summary."""
-    prompt = f"""
+_entity_cache = _make_cache("entities", config.QUERY_CACHE_TTL_ENTITIES)
+_embedding_cache = _make_cache("embeddings", config.QUERY_CACHE_TTL_EMBEDDINGS)
+_results_cache = _make_cache("results", config.QUERY_CACHE_TTL_RESULTS)
+
+_graph_version = {"value": None, "checked_at": 0.0}
+_graph_version_lock = threading.Lock()
+
+
+def current_graph_version() -> int:
+    """GraphVersion counter bumped by ingest_to_neo4j, re-read at most every GRAPH_VERSION_CHECK_INTERVAL s."""
+    with _graph_version_lock:
+        now = time.time()
+        if _graph_version["value"] is None or now - _graph_version["checked_at"] > config.GRAPH_VERSION_CHECK_INTERVAL:
+            with resources.get_neo4j_driver().session() as s:
+                _graph_version["value"] = s.run(graph_model.READ_GRAPH_VERSION_CYPHER).single()["version"]
+            _graph_version["checked_at"] = now
+        return _graph_version["value"]
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counts and hit rate per cache level."""
+    return {c.name: c.stats() for c in (_entity_cache, _embedding_cache, _results_cache) if c is not None}
+
+
+def embed_e5_query_cached(text: str) -> List[float]:
+    if _embedding_cache is None:
+        return embed_e5_query(text)
+    # model_tag() includes backend and precision, so switching them never serves old vectors
+    key = make_key(embeddings.model_tag(), text.strip())
+    vector = _embedding_cache.get(key)
+    if vector is None:
+        vector = embed_e5_query(text)
+        _embedding_cache.put(key, vector)
+    return vector
+
+
+def _unpack_entities(data: Dict[str, Any], user_query: str) -> Tuple[List[str], List[str], List[str], str]:
+    tags = data.get("tags", [])
+    locations = data.get("locations", [])
+    sources = data.get("sources", [])
+    summary = data.get("summary", user_query)
+    return tags, locations, sources, summary
+
+
+def build_entity_prompt(user_query: str) -> str:
+    """Prompt asking GPT-4o-mini for tags, locations, sources and a summary as JSON."""
+    return f"""
     You are an AI that extracts structured entities from a natural language query.
 
     Your task:
@@ -66,130 +108,398 @@ def extract_entities_with_gpt4(user_query: str) -> Tuple[List[str], List[str], L
     Output JSON:
     """
 
+
+def extract_entities_with_gpt4(user_query: str) -> Tuple[List[str], List[str], List[str], str]:
+    """Use OpenAI API to extract tags, locations, sources, and summary."""
+    cache_key = make_key("gpt-4o-mini", normalize_query_text(user_query))
+    cached = _entity_cache.get(cache_key) if _entity_cache is not None else None
+    if cached is not None:
+        return _unpack_entities(cached, user_query)
+
+    prompt = build_entity_prompt(user_query)
+
     try:
-        response = client.chat.completions.create(
+        response = resources.get_openai_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             temperature=0,
         )
         content = response.choices[0].message.content.strip()
         data = json.loads(content)
+        # only successful extractions are cached
+        if _entity_cache is not None:
+            _entity_cache.put(cache_key, data)
     except Exception as e:
         print("⚠️ GPT extraction failed:", e)
         data = {"tags": [], "locations": [], "sources": [], "summary": user_query}
 
-    tags = data.get("tags", [])
-    locations = data.get("locations", [])
-    sources = data.get("sources", [])
-    summary = data.get("summary", user_query)
-    return tags, locations, sources, summary
+    return _unpack_entities(data, user_query)
+
+
+def extract_entities(user_query: str) -> Tuple[List[str], List[str], List[str], str]:
+    """Extract filters with the extractor selected by config.ENTITY_EXTRACTOR.
+
+    "local" uses the graph gazetteer and only calls the LLM when it finds
+    nothing (if ENTITY_EXTRACTOR_LLM_FALLBACK); "llm" always calls GPT.
+    """
+    if config.ENTITY_EXTRACTOR == "local":
+        tags, locations, sources, summary = local_extractor.extract_entities_local(
+            user_query, resources.get_neo4j_driver(), current_graph_version())
+        if tags or locations or sources or not config.ENTITY_EXTRACTOR_LLM_FALLBACK:
+            return tags, locations, sources, summary
+        print("ℹ️ Local extractor found no entities; falling back to GPT extraction.")
+    return extract_entities_with_gpt4(user_query)
 
 
 # ---------------------------------------------------------------------
 # Neo4j Semantic Search + Tag Filtering (inside Neo4j)
 # ---------------------------------------------------------------------
-def semantic_search_with_tag_filter_in_neo4j(
-    tx,
-    query_vector: List[float],
-    tags: List[str],
-    locations: List[str],
-    sources: List[str],
-    semantic_limit: int = 200,
-    top_k: int = 10
-):
-    """
-    Perform hybrid search:
-    1. If filters (tags, locations, sources) are present -> Try Filtered Exact Search (KNN).
-    2. If Filtered Search returns NO results -> Fallback to Vector Index (ANN).
-    3. If NO filters -> Use Vector Index (ANN).
-    """
-    
-    # Define queries
-    vector_index_cypher = """
-        CALL db.index.vector.queryNodes('ticket_title_embedding', $top_k, $qv)
-        YIELD node AS t, score AS sim
-        
-        // Get full ticket context
-        OPTIONAL MATCH (t)-[r]->(n:Entity)
-        WITH t, sim, collect({rel: type(r), node: n}) AS related
-        
-        // Extract tags for consistency in return format
+# Shared tail: collect tags and the projected ticket context for the ranked
+# `t, sim` rows. Only the fields the source cards and the answer prompt use are
+# returned (tags come back separately, content is cut to
+# config.CONTEXT_MAX_CONTENT_CHARS), instead of every property of every node.
+_CONTEXT_RETURN = f"""
         OPTIONAL MATCH (t)-[:HAS_TAG]->(tag:Entity)
-        WITH t, sim, related, collect(tag.name) AS tags
-        
+        WITH t, sim, collect(tag.name) AS tag_names
+        OPTIONAL MATCH (t)-[r:HAS_METADATA|HAS_CONTENT|HAS_SOURCE|HAS_LOCATION]->(n:Entity)
+        WITH t, sim, tag_names, collect({{rel: type(r), node: n}}) AS related
         RETURN
         t.ticket_id AS ticket_id,
         t.title AS title,
         t.type AS type,
-        tags,
+        tag_names AS tags,
         sim,
-        [x IN related | {
+        [x IN related | {{
             relationship: x.rel,
             node_type: x.node.type,
-            node_props: properties(x.node)
-        }] AS relationships
-    """
+            node_props: CASE x.node.type
+                WHEN 'content' THEN {{text: left(coalesce(x.node.text, ''), {int(config.CONTEXT_MAX_CONTENT_CHARS)})}}
+                WHEN 'metadata' THEN {{published: x.node.published, author_name: x.node.author_name,
+                                       feed_title: x.node.feed_title, location: x.node.location}}
+                ELSE {{name: x.node.name}}
+            END
+        }}] AS relationships
+        ORDER BY sim DESC
+"""
+
+# Per graph model: how a filter anchors a pre-filtered search on its few
+# matching nodes, and how it is checked as a predicate on a candidate `t`.
+# Filter values are passed as graph_model.canonical_keys (lower-cased).
+_FILTER_ANCHORS = {
+    graph_model.PER_TICKET: {
+        "tags": "MATCH (a:Entity {type:'tag'}) WHERE toLower(a.name) IN $tags MATCH (a)<-[:HAS_TAG]-(t:Ticket)",
+        "locations": "MATCH (a:Entity {type:'metadata'}) WHERE any(x IN $locations WHERE toLower(a.location) CONTAINS x) MATCH (a)<-[:HAS_METADATA]-(t:Ticket)",
+        "sources": "MATCH (a:Entity {type:'source'}) WHERE any(x IN $sources WHERE toLower(a.name) CONTAINS x) MATCH (a)<-[:HAS_SOURCE]-(t:Ticket)",
+    },
+    graph_model.SHARED: {
+        "tags": "MATCH (a:Tag) WHERE a.key IN $tags MATCH (a)<-[:HAS_TAG]-(t:Ticket)",
+        "locations": "MATCH (a:Location) WHERE any(x IN $locations WHERE a.key CONTAINS x) MATCH (a)<-[:HAS_LOCATION]-(t:Ticket)",
+        "sources": "MATCH (a:Source) WHERE any(x IN $sources WHERE a.key CONTAINS x) MATCH (a)<-[:HAS_SOURCE]-(t:Ticket)",
+    },
+}
+_FILTER_CHECKS = {
+    graph_model.PER_TICKET: {
+        "tags": "EXISTS { MATCH (t)-[:HAS_TAG]->(x:Entity) WHERE toLower(x.name) IN $tags }",
+        "locations": "EXISTS { MATCH (t)-[:HAS_METADATA]->(x:Entity) WHERE any(l IN $locations WHERE toLower(x.location) CONTAINS l) }",
+        "sources": "EXISTS { MATCH (t)-[:HAS_SOURCE]->(x:Entity) WHERE any(s IN $sources WHERE toLower(x.name) CONTAINS s) }",
+    },
+    graph_model.SHARED: {
+        "tags": "EXISTS { MATCH (t)-[:HAS_TAG]->(x:Tag) WHERE x.key IN $tags }",
+        "locations": "EXISTS { MATCH (t)-[:HAS_LOCATION]->(x:Location) WHERE any(l IN $locations WHERE x.key CONTAINS l) }",
+        "sources": "EXISTS { MATCH (t)-[:HAS_SOURCE]->(x:Source) WHERE any(s IN $sources WHERE x.key CONTAINS s) }",
+    },
+}
+
+VECTOR_INDEX_CYPHER = """
+        CALL db.index.vector.queryNodes('ticket_title_embedding', $top_k, $qv)
+        YIELD node AS t, score AS sim
+""" + _CONTEXT_RETURN
+
+
+# Chunk hits (config.CHUNK_EMBEDDINGS_ENABLED) are mapped to their Ticket and
+# aggregated with the title score using config.CHUNK_SCORE_AGGREGATION.
+def _chunk_aggregation() -> str:
+    agg = (config.CHUNK_SCORE_AGGREGATION or "max").lower()
+    if agg not in ("max", "sum"):
+        raise ValueError(f"unsupported CHUNK_SCORE_AGGREGATION: {agg}")
+    return agg
+
+
+def _title_and_chunk_hits(k_param: str, where: str = "") -> str:
+    """ANN over both vector indexes as `t, score` rows, one per title or chunk hit."""
+    where_clause = f"WHERE {where}" if where else ""
+    return f"""
+        CALL {{
+            CALL db.index.vector.queryNodes('ticket_title_embedding', ${k_param}, $qv)
+            YIELD node AS t, score
+            {where_clause}
+            RETURN t, score
+            UNION ALL
+            CALL db.index.vector.queryNodes('chunk_embedding', ${k_param} * {int(config.CHUNK_SEARCH_OVERFETCH)}, $qv)
+            YIELD node AS c, score
+            MATCH (t:Ticket)-[:HAS_CHUNK]->(c)
+            {where_clause}
+            RETURN t, score
+        }}
+        WITH t, {_chunk_aggregation()}(score) AS sim
+        ORDER BY sim DESC
+        LIMIT $top_k
+"""
 
-    filtered_cypher = """
-        WITH $qv AS qv, $tags AS tags, $locations AS locations, $sources AS sources
-        MATCH (t:Entity {type:'ticket'})
-        WHERE t.title_embedding IS NOT NULL
 
-        // 1. Tag Filtering
-        OPTIONAL MATCH (t)-[:HAS_TAG]->(tag:Entity)
-        WITH t, qv, tags, locations, sources, collect(DISTINCT tag.name) AS tag_names
-        WHERE size(tags) = 0 OR any(tag IN tag_names WHERE toLower(tag) IN [tagName IN tags | toLower(tagName)])
-
-        // 2. Location Filtering (via Metadata)
-        OPTIONAL MATCH (t)-[:HAS_METADATA]->(meta:Entity)
-        WITH t, qv, tags, locations, sources, tag_names, meta
-        WHERE size(locations) = 0 OR (meta.location IS NOT NULL AND any(loc IN locations WHERE toLower(meta.location) CONTAINS toLower(loc)))
-
-        // 3. Source Filtering
-        OPTIONAL MATCH (t)-[:HAS_SOURCE]->(source:Entity)
-        WITH t, qv, tags, locations, sources, tag_names, meta, source
-        WHERE size(sources) = 0 OR (source.name IS NOT NULL AND any(src IN sources WHERE toLower(source.name) CONTAINS toLower(src)))
-
-        // 4. Similarity Calculation
-        WITH t, qv, tag_names,
-             vector.similarity.cosine(qv, t.title_embedding) AS sim
+def vector_index_cypher() -> str:
+    """Unfiltered ANN over titles, plus description chunks when enabled."""
+    if not config.CHUNK_EMBEDDINGS_ENABLED:
+        return VECTOR_INDEX_CYPHER
+    return _title_and_chunk_hits("top_k") + _CONTEXT_RETURN
+
+
+# Optional in-process snapshot (local_index.py): Neo4j only hydrates the hits.
+HYDRATE_CYPHER = """
+        UNWIND $hits AS hit
+        MATCH (t:Ticket {ticket_id: hit.ticket_id})
+        WITH t, hit.sim AS sim
+""" + _CONTEXT_RETURN
+
+
+def local_ann_hits(query_vector: List[float], top_k: int) -> Optional[List[Dict[str, Any]]]:
+    """Top-k [{ticket_id, sim}] from the local vector index, or None when it is disabled."""
+    if not config.LOCAL_VECTOR_INDEX_ENABLED:
+        return None
+    import local_index
+
+    index = local_index.ensure_fresh(resources.get_neo4j_driver(), current_graph_version())
+    if config.CHUNK_EMBEDDINGS_ENABLED:
+        return index.search(query_vector, top_k, _chunk_aggregation(), config.CHUNK_SEARCH_OVERFETCH + 1)
+    return index.search(query_vector, top_k)
+
+
+def ann_search(tx, query_vector: List[float], top_k: int) -> List[Dict[str, Any]]:
+    """Unfiltered nearest neighbours: local snapshot + hydration if enabled, else the Neo4j vector index."""
+    hits = local_ann_hits(query_vector, top_k)
+    if hits is None:
+        return tx.run(vector_index_cypher(), qv=query_vector, top_k=top_k).data()
+    return tx.run(HYDRATE_CYPHER, hits=hits).data()
+
+
+def _active_filters(filters: Dict[str, List[str]]) -> List[str]:
+    return [name for name in ("tags", "locations", "sources") if filters.get(name)]
+
+
+def build_prefilter_cypher(model: str, active: List[str]) -> str:
+    """Exact KNN over the tickets reached from the first filter's matching nodes."""
+    anchor, rest = active[0], active[1:]
+    where = " AND ".join(["t.title_embedding IS NOT NULL"] + [_FILTER_CHECKS[model][name] for name in rest])
+    if not config.CHUNK_EMBEDDINGS_ENABLED:
+        score = "WITH t, vector.similarity.cosine($qv, t.title_embedding) AS sim"
+    else:
+        combine = ("CASE WHEN s > acc THEN s ELSE acc END" if _chunk_aggregation() == "max" else "acc + s")
+        score = f"""WITH t, vector.similarity.cosine($qv, t.title_embedding) AS title_sim
+        OPTIONAL MATCH (t)-[:HAS_CHUNK]->(c:Chunk)
+        WITH t, title_sim, collect(vector.similarity.cosine($qv, c.embedding)) AS chunk_sims
+        WITH t, reduce(acc = title_sim, s IN chunk_sims | {combine}) AS sim"""
+    return f"""
+        {_FILTER_ANCHORS[model][anchor]}
+        WITH DISTINCT t
+        WHERE {where}
+        {score}
         ORDER BY sim DESC
         LIMIT $top_k
+""" + _CONTEXT_RETURN
 
-        // Get full ticket context
-        OPTIONAL MATCH (t)-[r]->(n:Entity)
-        WITH t, sim, tag_names, collect({rel: type(r), node: n}) AS related
-        RETURN
-        t.ticket_id AS ticket_id,
-        t.title AS title,
-        t.type AS type,
-        tag_names AS tags,
-        sim,
-        [x IN related | {
-            relationship: x.rel,
-            node_type: x.node.type,
-            node_props: properties(x.node)
-        }] AS relationships
+
+def build_ann_postfilter_cypher(model: str, active: List[str]) -> str:
+    """Over-fetch $k neighbours from the vector index, keep those passing every filter."""
+    where = " AND ".join(_FILTER_CHECKS[model][name] for name in active)
+    if config.CHUNK_EMBEDDINGS_ENABLED:
+        return _title_and_chunk_hits("k", where) + _CONTEXT_RETURN
+    return f"""
+        CALL db.index.vector.queryNodes('ticket_title_embedding', $k, $qv)
+        YIELD node AS t, score AS sim
+        WHERE {where}
+        WITH t, sim
+        ORDER BY sim DESC
+        LIMIT $top_k
+""" + _CONTEXT_RETURN
+
+
+def filtered_search_plan(query_vector: List[float], filters: Dict[str, List[str]], top_k: int):
+    """Cost-based filtered search: pre-filtered exact KNN for selective filters,
+    otherwise ANN over-fetch with post-filtering and adaptive widening of k.
+
+    Driver-agnostic generator shared by the sync and async retrievers: it yields
+    (query, params) pairs, expects the resulting rows to be sent back, and
+    returns the final hits. The candidate estimate is the smallest anchor
+    fan-out among the active filters, an upper bound on the true conjunctive
+    match count.
     """
+    model = graph_model.graph_model()
+    active = _active_filters(filters)
+    total = (yield "MATCH (t:Ticket) RETURN count(t) AS n", {})[0]["n"]
+    estimate = total
+    for name in active:
+        rows = yield f"{_FILTER_ANCHORS[model][name]} RETURN count(DISTINCT t) AS n", dict(filters)
+        estimate = min(estimate, rows[0]["n"])
+    if estimate == 0:
+        return []
+
+    strategy, k, max_k = choose_filter_strategy(estimate, total, top_k)
+    if strategy == "prefilter":
+        print(f"🔍 Pre-filtered exact search over ~{estimate}/{total} tickets...")
+        return (yield build_prefilter_cypher(model, active), dict(filters, qv=query_vector, top_k=top_k))
 
-    # Logic
-    has_filters = bool(tags or locations or sources)
+    query = build_ann_postfilter_cypher(model, active)
+    while True:
+        print(f"🔍 Filtered ANN: over-fetching k={k} (~{estimate}/{total} tickets match)...")
+        results = yield query, dict(filters, qv=query_vector, k=k, top_k=top_k)
+        if len(results) >= top_k or k >= max_k:
+            return results
+        k = min(max_k, k * 4)
+
+
+def filtered_vector_search(tx, query_vector: List[float], filters: Dict[str, List[str]], top_k: int):
+    plan = filtered_search_plan(query_vector, filters, top_k)
+    try:
+        query, params = next(plan)
+        while True:
+            query, params = plan.send(tx.run(query, **params).data())
+    except StopIteration as done:
+        return done.value
+
+
+def choose_filter_strategy(estimate: int, total: int, top_k: int) -> Tuple[str, int, int]:
+    """Return ("prefilter" | "ann", initial k, max k) for a filtered search."""
+    max_k = min(config.FILTERED_ANN_MAX_K, total)
+    selectivity = estimate / total if total else 1.0
+    if estimate <= config.PREFILTER_MAX_CANDIDATES or selectivity * max_k < top_k:
+        return "prefilter", 0, max_k
+    # expect ~top_k / selectivity neighbours to be needed; start there
+    k = min(max_k, max(top_k * config.FILTERED_ANN_OVERFETCH, int(top_k / selectivity)))
+    return "ann", k, max_k
+
+
+def normalize_filters(tags: List[str], locations: List[str], sources: List[str]) -> Dict[str, List[str]]:
+    return {
+        "tags": graph_model.canonical_keys(tags),
+        "locations": graph_model.canonical_keys(locations),
+        "sources": graph_model.canonical_keys(sources),
+    }
+
+
+def semantic_search_with_tag_filter_in_neo4j(
+    tx,
+    query_vector: List[float],
+    tags: List[str],
+    locations: List[str],
+    sources: List[str],
+    semantic_limit: int = 200,
+    top_k: int = 10
+):
+    """
+    Perform hybrid search:
+    1. If filters (tags, locations, sources) are present -> filtered search, choosing
+       between pre-filtered exact KNN and ANN over-fetch + post-filter by estimated selectivity.
+    2. If Filtered Search returns NO results -> Fallback to Vector Index (ANN).
+    3. If NO filters -> Use Vector Index (ANN).
+    """
+    filters = normalize_filters(tags, locations, sources)
     results = []
 
-    if has_filters:
-        print("🔍 Using Filtered Exact Search (KNN)...")
-        results = tx.run(filtered_cypher, qv=query_vector, tags=tags, locations=locations, sources=sources, top_k=top_k).data()
-        
+    if _active_filters(filters):
+        results = filtered_vector_search(tx, query_vector, filters, top_k)
+
         if not results:
             print("⚠️ No results found with filters. Falling back to Vector Index (ANN)...")
-            results = tx.run(vector_index_cypher, qv=query_vector, top_k=top_k).data()
+            results = ann_search(tx, query_vector, top_k)
     else:
         print("⚡ Using Vector Index (ANN) for search...")
-        results = tx.run(vector_index_cypher, qv=query_vector, top_k=top_k).data()
+        results = ann_search(tx, query_vector, top_k)
 
     return results
 
 
+# ---------------------------------------------------------------------
+# Hybrid retrieval: fulltext + vector, fused with reciprocal rank fusion
+# ---------------------------------------------------------------------
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+# only upper-case AND/OR/NOT are operators; lower-cased they are plain (stop) words
+_LUCENE_OPERATORS = {"AND", "OR", "NOT"}
+_search_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lexical")
+
+
+def is_hybrid() -> bool:
+    return (config.RETRIEVAL_MODE or "vector").lower() == "hybrid"
+
+
+def lucene_query(text: str) -> str:
+    """Escape Lucene syntax so the raw query is matched term by term (terms are OR-ed)."""
+    return " ".join(tok.lower() if tok in _LUCENE_OPERATORS else _LUCENE_SPECIAL.sub(r"\\\1", tok)
+                    for tok in str(text or "").split())
+
+
+def build_lexical_cypher(model: str, active: List[str]) -> str:
+    """Fulltext hits on ticket titles and content text, mapped to their Ticket and filtered."""
+    where = " AND ".join(["t:Ticket"] + [_FILTER_CHECKS[model][name] for name in active])
+    return f"""
+        CALL db.index.fulltext.queryNodes('ticket_text_fulltext', $lucene, {{limit: $k}})
+        YIELD node, score
+        OPTIONAL MATCH (owner:Ticket)-[:HAS_CONTENT]->(node)
+        WITH coalesce(owner, node) AS t, score
+        WHERE {where}
+        WITH t, max(score) AS sim
+        ORDER BY sim DESC
+        LIMIT $top_k
+""" + _CONTEXT_RETURN
+
+
+def lexical_search_params(text: str, filters: Dict[str, List[str]], top_k: int) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """(cypher, params) for a fulltext search, or None when the text has no terms."""
+    lucene = lucene_query(text)
+    if not lucene:
+        return None
+    query = build_lexical_cypher(graph_model.graph_model(), _active_filters(filters))
+    return query, {"lucene": lucene, "k": top_k * config.HYBRID_LEXICAL_OVERFETCH, "top_k": top_k, **filters}
+
+
+def lexical_search_in_neo4j(text: str, tags: List[str], locations: List[str], sources: List[str],
+                            top_k: int = 10) -> List[Dict[str, Any]]:
+    """Fulltext search in its own session, so it can run next to the vector search."""
+    prepared = lexical_search_params(text, normalize_filters(tags, locations, sources), top_k)
+    if prepared is None:
+        return []
+    query, params = prepared
+    try:
+        with resources.get_neo4j_driver().session() as s:
+            return s.execute_read(lambda tx: tx.run(query, **params).data())
+    except Exception as e:
+        print("⚠️ Fulltext search failed (is ticket_text_fulltext created?):", e)
+        return []
+
+
+def rrf_fuse(ranked_lists: List[Tuple[List[Dict[str, Any]], float]], k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Reciprocal rank fusion: score(ticket) = sum(weight / (k + rank)) over the lists it appears in.
+
+    Rows keep their first-seen context; `sim` becomes the fused score and
+    `score_type` is set to "rrf" so it is not shown as a cosine similarity.
+    """
+    k = config.HYBRID_RRF_K if k is None else k
+    scores: Dict[str, float] = {}
+    rows: Dict[str, Dict[str, Any]] = {}
+    for results, weight in ranked_lists:
+        for rank, row in enumerate(results or [], start=1):
+            tid = row["ticket_id"]
+            scores[tid] = scores.get(tid, 0.0) + weight / (k + rank)
+            rows.setdefault(tid, row)
+    return [{**rows[tid], "sim": scores[tid], "score_type": "rrf"}
+            for tid in sorted(scores, key=scores.get, reverse=True)]
+
+
+def fuse_hybrid(vector_results: List[Dict[str, Any]], lexical_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    print(f"🔀 Hybrid: fusing {len(vector_results or [])} vector + {len(lexical_results or [])} fulltext hits (RRF)")
+    return rrf_fuse([(vector_results, config.HYBRID_VECTOR_WEIGHT),
+                     (lexical_results, config.HYBRID_LEXICAL_WEIGHT)])
+
+
 # ---------------------------------------------------------------------
 # Main Pipeline
 # ---------------------------------------------------------------------
@@ -199,25 +509,67 @@ def text_query_to_results(user_query: str,
                           top_n: int = 5) -> Dict[str, Any]:
     print(f"\n💬 USER QUERY: {user_query}")
 
-    tags, locations, sources, summary = extract_entities_with_gpt4(user_query)
+    tags, locations, sources, summary = extract_entities(user_query)
     print("🎯 Summary:", summary)
     print("🏷️ Tags:", tags)
     print("📍 Locations:", locations)
     print("📡 Sources:", sources)
 
-    query_vector = embed_e5_query(summary)
-
-    with driver.session() as s:
-        results = s.execute_read(
-            semantic_search_with_tag_filter_in_neo4j,
-            query_vector,
-            tags,
-            locations,
-            sources,
-            semantic_limit,
-            semantic_top_k
-        )
-
+    query_vector = embed_e5_query_cached(summary)
+
+    results = None
+    hybrid = is_hybrid()
+    if _results_cache is not None:
+        results_key = results_cache_key(query_vector, tags, locations, sources, semantic_top_k,
+                                        lexical_text=user_query if hybrid else None)
+        results = _results_cache.get(results_key)
+
+    if results is None:
+        lexical_future = None
+        if hybrid:
+            # fulltext runs in parallel with the vector search below
+            lexical_future = _search_executor.submit(
+                lexical_search_in_neo4j, user_query, tags, locations, sources, semantic_top_k)
+        with resources.get_neo4j_driver().session() as s:
+            results = s.execute_read(
+                semantic_search_with_tag_filter_in_neo4j,
+                query_vector,
+                tags,
+                locations,
+                sources,
+                semantic_limit,
+                semantic_top_k
+            )
+        if lexical_future is not None:
+            results = fuse_hybrid(results, lexical_future.result())
+        if _results_cache is not None:
+            _results_cache.put(results_key, results)
+
+    print(f"📦 Retrieval payload: {payload_bytes(results)} bytes for {len(results or [])} tickets")
+    if _results_cache is not None:
+        print("🗄️ Cache hit rates:", ", ".join(f"{name} {st['hit_rate']:.0%}" for name, st in cache_stats().items()))
+
+    return parse_results(results, top_n)
+
+
+def results_cache_key(query_vector: List[float], tags: List[str], locations: List[str],
+                      sources: List[str], top_k: int, lexical_text: Optional[str] = None) -> str:
+    chunking = config.CHUNK_SCORE_AGGREGATION if config.CHUNK_EMBEDDINGS_ENABLED else None
+    hybrid = None
+    if lexical_text is not None:
+        hybrid = (normalize_query_text(lexical_text), config.HYBRID_VECTOR_WEIGHT,
+                  config.HYBRID_LEXICAL_WEIGHT, config.HYBRID_RRF_K)
+    return make_key(make_key(query_vector), tags, locations, sources, top_k,
+                    graph_model.graph_model(), chunking, hybrid, current_graph_version())
+
+
+def payload_bytes(results: Any) -> int:
+    """Approximate wire size of a result set (its JSON encoding)."""
+    return len(json.dumps(results, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def parse_results(results: List[Dict[str, Any]], top_n: int) -> List[Dict[str, Any]]:
+    """Rank and shape raw Neo4j rows into the structure consumed by llm_response and app."""
     if not results:
         return []
 
@@ -231,6 +583,7 @@ def text_query_to_results(user_query: str,
             "title": r["title"],
             "type": r["type"],
             "similarity": round(r["sim"], 4),
+            "score_type": r.get("score_type", "cosine"),
             "tags": r["tags"],
             "relationships": r["relationships"]
         }
@@ -0,0 +1,245 @@
+"""
+Async end-to-end query pipeline.
+
+Runs entity extraction (AsyncOpenAI) concurrently with a speculative
+embedding of the raw user query and an unfiltered ANN search (neo4j
+AsyncGraphDatabase), then reconciles once the filters and summary arrive:
+
+- no filters: the speculative ANN results are used as-is
+  (config.ASYNC_REUSE_SPECULATIVE), saving the summary embedding and a query;
+- filters: the summary is embedded and a filtered search runs; if it finds
+  nothing, the speculative results serve as the unfiltered fallback.
+
+With config.RETRIEVAL_MODE = "hybrid" a fulltext search starts as soon as the
+filters are known and is fused with the vector results (RRF) at the end.
+
+Embeddings run in a thread pool so the event loop stays free. The sync
+wrapper `text_query_to_results_blocking` runs everything on one background
+event loop so the async driver/client are reused across calls.
+"""
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from neo4j import AsyncGraphDatabase
+from openai import AsyncOpenAI
+
+import config
+import local_extractor
+import resources
+import retriever
+from query_cache import make_key, normalize_query_text
+
+
+_embed_executor = ThreadPoolExecutor(max_workers=config.ASYNC_EMBED_WORKERS, thread_name_prefix="embed")
+
+
+def _get_async_driver():
+    return resources.singleton(
+        "neo4j_async",
+        lambda: AsyncGraphDatabase.driver(config.NEO4J_URI, auth=(config.NEO4J_USER, config.NEO4J_PASSWORD)),
+    )
+
+
+def _get_async_client():
+    return resources.singleton("openai_async", lambda: AsyncOpenAI(api_key=config.OPENAI_API_KEY))
+
+
+async def _timed(name: str, coro, timings: Dict[str, float]):
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        timings[name] = time.perf_counter() - start
+
+
+# ---------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------
+async def extract_entities_with_gpt4_async(user_query: str) -> Tuple[List[str], List[str], List[str], str]:
+    """Async twin of retriever.extract_entities_with_gpt4 (shares its prompt and cache)."""
+    cache = retriever._entity_cache
+    cache_key = make_key("gpt-4o-mini", normalize_query_text(user_query))
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+        return retriever._unpack_entities(cached, user_query)
+
+    try:
+        response = await _get_async_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": retriever.build_entity_prompt(user_query)}],
+            temperature=0,
+        )
+        data = json.loads(response.choices[0].message.content.strip())
+        if cache is not None:
+            cache.put(cache_key, data)
+    except Exception as e:
+        print("⚠️ GPT extraction failed:", e)
+        data = {"tags": [], "locations": [], "sources": [], "summary": user_query}
+    return retriever._unpack_entities(data, user_query)
+
+
+async def extract_entities_async(user_query: str) -> Tuple[List[str], List[str], List[str], str]:
+    if config.ENTITY_EXTRACTOR == "local":
+        version = await asyncio.to_thread(retriever.current_graph_version)
+        tags, locations, sources, summary = await asyncio.to_thread(
+            local_extractor.extract_entities_local, user_query, resources.get_neo4j_driver(), version)
+        if tags or locations or sources or not config.ENTITY_EXTRACTOR_LLM_FALLBACK:
+            return tags, locations, sources, summary
+    return await extract_entities_with_gpt4_async(user_query)
+
+
+async def embed_async(text: str) -> List[float]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_embed_executor, retriever.embed_e5_query_cached, text)
+
+
+async def _run(tx, query: str, **params) -> List[Dict[str, Any]]:
+    result = await tx.run(query, **params)
+    return await result.data()
+
+
+async def _filtered_search_tx(tx, query_vector: List[float], filters: Dict[str, List[str]], top_k: int):
+    """Async driver for retriever.filtered_search_plan."""
+    plan = retriever.filtered_search_plan(query_vector, filters, top_k)
+    try:
+        query, params = next(plan)
+        while True:
+            query, params = plan.send(await _run(tx, query, **params))
+    except StopIteration as done:
+        return done.value
+
+
+async def vector_search_async(query_vector: List[float], top_k: int) -> List[Dict[str, Any]]:
+    hits = await asyncio.to_thread(retriever.local_ann_hits, query_vector, top_k)
+    async with _get_async_driver().session() as s:
+        if hits is not None:
+            return await s.execute_read(_run, retriever.HYDRATE_CYPHER, hits=hits)
+        return await s.execute_read(_run, retriever.vector_index_cypher(), qv=query_vector, top_k=top_k)
+
+
+async def filtered_search_async(query_vector: List[float], filters: Dict[str, List[str]], top_k: int):
+    async with _get_async_driver().session() as s:
+        return await s.execute_read(_filtered_search_tx, query_vector, filters, top_k)
+
+
+async def lexical_search_async(text: str, filters: Dict[str, List[str]], top_k: int) -> List[Dict[str, Any]]:
+    """Async twin of retriever.lexical_search_in_neo4j."""
+    prepared = retriever.lexical_search_params(text, filters, top_k)
+    if prepared is None:
+        return []
+    query, params = prepared
+    try:
+        async with _get_async_driver().session() as s:
+            return await s.execute_read(_run, query, **params)
+    except Exception as e:
+        print("⚠️ Fulltext search failed (is ticket_text_fulltext created?):", e)
+        return []
+
+
+# ---------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------
+async def text_query_to_results_async(user_query: str,
+                                      semantic_top_k: int = 10,
+                                      top_n: int = 5) -> List[Dict[str, Any]]:
+    print(f"\n💬 USER QUERY (async): {user_query}")
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+
+    async def speculative():
+        vector = await _timed("embed_query", embed_async(user_query), timings)
+        return await _timed("ann_speculative", vector_search_async(vector, semantic_top_k), timings)
+
+    async def wait_speculative():
+        # a failed speculative ANN is reported once, in the finally below
+        try:
+            return await _timed("wait_speculative", speculative_task, timings)
+        except Exception:
+            return None
+
+    extract_task = asyncio.create_task(_timed("extract", extract_entities_async(user_query), timings))
+    speculative_task = asyncio.create_task(speculative())
+    lexical_task = None
+    try:
+        tags, locations, sources, summary = await extract_task
+        print("🎯 Summary:", summary)
+        print("🏷️ Tags:", tags, "📍 Locations:", locations, "📡 Sources:", sources)
+        filters = retriever.normalize_filters(tags, locations, sources)
+
+        if retriever.is_hybrid():
+            lexical_task = asyncio.create_task(
+                _timed("lexical_search", lexical_search_async(user_query, filters, semantic_top_k), timings))
+
+        reuse = not retriever._active_filters(filters) and config.ASYNC_REUSE_SPECULATIVE
+        results: Optional[List[Dict[str, Any]]] = await wait_speculative() if reuse else None
+        if results is None:
+            if reuse:
+                print("⚠️ Speculative ANN failed. Searching with the summary vector instead...")
+            summary_vector = await _timed("embed_summary", embed_async(summary), timings)
+            cache = retriever._results_cache
+            cache_key = None
+            if cache is not None:
+                cache_key = await asyncio.to_thread(
+                    retriever.results_cache_key, summary_vector, tags, locations, sources, semantic_top_k)
+                results = cache.get(cache_key)
+            if results is None:
+                if retriever._active_filters(filters):
+                    results = await _timed("filtered_search", filtered_search_async(summary_vector, filters, semantic_top_k), timings)
+                else:
+                    results = await _timed("ann_search", vector_search_async(summary_vector, semantic_top_k), timings)
+                if not results and not reuse:
+                    print("⚠️ No results found with filters. Using speculative unfiltered ANN results...")
+                    results = await wait_speculative() or []
+                elif results and cache is not None:
+                    cache.put(cache_key, results)
+
+        if lexical_task is not None:
+            results = retriever.fuse_hybrid(results, await lexical_task)
+    finally:
+        # cancel() is a no-op on finished tasks; gather retrieves their results or exceptions
+        tasks = [speculative_task] + ([lexical_task] if lexical_task is not None else [])
+        for task in tasks:
+            task.cancel()
+        outcome = (await asyncio.gather(*tasks, return_exceptions=True))[0]
+        if isinstance(outcome, Exception):
+            print("⚠️ Speculative ANN failed:", outcome)
+
+    timings["total"] = time.perf_counter() - start
+    print("⏱️ Latency breakdown: " + ", ".join(f"{k} {v:.3f}s" for k, v in timings.items()))
+    return retriever.parse_results(results, top_n)
+
+
+# ---------------------------------------------------------------------
+# Sync wrapper
+# ---------------------------------------------------------------------
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="retriever-async", daemon=True).start()
+        return _loop
+
+
+def text_query_to_results_blocking(user_query: str,
+                                   semantic_limit: int = 10,
+                                   semantic_top_k: int = 10,
+                                   top_n: int = 5) -> List[Dict[str, Any]]:
+    """Drop-in, blocking replacement for retriever.text_query_to_results."""
+    future = asyncio.run_coroutine_threadsafe(
+        text_query_to_results_async(user_query, semantic_top_k=semantic_top_k, top_n=top_n),
+        _background_loop(),
+    )
+    return future.result()
+
+
+if __name__ == "__main__":
+    print(text_query_to_results_blocking("Show me recent AI-related startup company")[:1])
@@ -0,0 +1,489 @@
+"""
+Long-running ingestion daemon.
+
+Each source (RSS, GitHub, StartupSavant via `dataOrganizer.data_organizer`)
+is fetched on its own interval (config.SCHEDULER_INTERVALS). New records
+stream through four stages connected by bounded queues:
+
+    dedupe (incremental hash check) -> normalize -> embed -> write (Neo4j)
+
+Batching stages collect up to their batch size or wait at most
+config.SCHEDULER_BATCH_LINGER seconds. A full queue blocks the stage in
+front of it, so a slow stage exerts backpressure instead of buffering
+everything in memory. Per-stage backlog, throughput and utilization are
+printed every config.SCHEDULER_STATS_INTERVAL seconds; the stage with the
+highest utilization and a growing backlog is the bottleneck.
+
+    python scheduler.py                    # run forever
+    python scheduler.py --once             # fetch every source once, drain, exit
+    python scheduler.py --offline --once   # stub sources and stages, no network
+"""
+import hashlib
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import config
+
+
+# ---------------------------------------------------------------------
+# Pipeline stages
+# ---------------------------------------------------------------------
+class SourceRun:
+    """Tracks the records of one source fetch through the pipeline.
+
+    Items carry their run under "run". Once every record has been written
+    (or deliberately dropped, e.g. as unchanged) and `close()` was called,
+    `on_done(run)` fires once; `failed` counts records that were lost.
+    """
+
+    def __init__(self, name: str, on_done: Callable[["SourceRun"], None]):
+        self.name = name
+        self.on_done = on_done
+        self.pending = 0
+        self.failed = 0
+        self._closed = False
+        self._fired = False
+        self._lock = threading.Lock()
+
+    def add(self, n: int = 1):
+        with self._lock:
+            self.pending += n
+
+    def finish(self, n: int, failed: int = 0):
+        with self._lock:
+            self.pending -= n
+            self.failed += failed
+        self._maybe_done()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._maybe_done()
+
+    def _maybe_done(self):
+        with self._lock:
+            if not self._closed or self.pending > 0 or self._fired:
+                return
+            self._fired = True
+        self.on_done(self)
+
+
+def _runs(items: List[Dict]) -> Dict[SourceRun, int]:
+    counts: Dict[SourceRun, int] = {}
+    for item in items:
+        run = item.get("run")
+        if run is not None:
+            counts[run] = counts.get(run, 0) + 1
+    return counts
+
+
+class Stage:
+    """Workers that take items from `inbox`, apply `fn` to a batch and put the results on `outbox`.
+
+    `fn` receives a list of items and returns the list of items to pass on
+    (possibly shorter: dropped or failed records). A batch that raises is
+    counted as errors and dropped. Records a stage drops count as lost for
+    their SourceRun unless `drops_ok` (a filter such as dedupe).
+    """
+
+    def __init__(self, name: str, fn: Callable[[List[Dict]], List[Dict]], inbox: queue.Queue,
+                 outbox: Optional[queue.Queue] = None, workers: int = 1, batch_size: int = 1,
+                 linger: float = 0.0, drops_ok: bool = False):
+        self.name = name
+        self.drops_ok = drops_ok
+        self.fn = fn
+        self.inbox = inbox
+        self.outbox = outbox
+        self.workers = workers
+        self.batch_size = batch_size
+        self.linger = linger
+        self.items_in = 0
+        self.items_out = 0
+        self.batches = 0
+        self.errors = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+    def _take_batch(self) -> List[Dict]:
+        try:
+            batch = [self.inbox.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.time() + self.linger
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.inbox.get(timeout=max(0.0, deadline - time.time())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._take_batch()
+            if not batch:
+                continue
+            start = time.time()
+            try:
+                out = self.fn(batch) or []
+            except Exception as e:
+                print(f"⚠️ Stage '{self.name}' failed on a batch of {len(batch)}: {e}")
+                out = None
+            with self._lock:
+                self.busy += time.time() - start
+                self.batches += 1
+                self.items_in += len(batch)
+                if out is None:
+                    self.errors += len(batch)
+                else:
+                    self.items_out += len(out)
+            if self.outbox is not None:
+                for item in out or []:
+                    self.outbox.put(item)
+            self._settle(batch, out)
+            # mark done only after handing results downstream, so drain() sees them
+            for _ in batch:
+                self.inbox.task_done()
+
+    def _settle(self, batch: List[Dict], out: Optional[List[Dict]]):
+        """Report records that leave the pipeline here (dropped, failed or written) to their runs."""
+        passed = _runs(out or []) if self.outbox is not None else {}
+        for run, n in _runs(batch).items():
+            left = n - passed.get(run, 0)
+            if out is None:
+                run.finish(left, failed=left)
+            elif self.outbox is None:
+                # last stage: what came out was written, the rest was lost
+                written = _runs(out).get(run, 0)
+                run.finish(left, failed=max(0, n - written))
+            else:
+                run.finish(left, failed=0 if self.drops_ok else left)
+
+    def stats(self, elapsed: float) -> Dict:
+        with self._lock:
+            return {
+                "stage": self.name,
+                "backlog": self.inbox.qsize(),
+                "in": self.items_in,
+                "out": self.items_out,
+                "errors": self.errors,
+                "throughput": self.items_in / elapsed if elapsed > 0 else 0.0,
+                "utilization": self.busy / (elapsed * self.workers) if elapsed > 0 else 0.0,
+                "avg_batch": self.items_in / self.batches if self.batches else 0.0,
+            }
+
+
+class StreamingPipeline:
+    """Stages chained by bounded queues; `submit()` feeds the first stage."""
+
+    def __init__(self, stage_specs: List[Dict], queue_size: Optional[int] = None):
+        queue_size = queue_size or config.SCHEDULER_QUEUE_SIZE
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stage_specs]
+        self.stages = []
+        for i, spec in enumerate(stage_specs):
+            outbox = self.queues[i + 1] if i + 1 < len(self.queues) else None
+            self.stages.append(Stage(inbox=self.queues[i], outbox=outbox, **spec))
+        self.started_at = None
+
+    def start(self):
+        self.started_at = time.time()
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+
+    def submit(self, items: Iterable[Dict]) -> int:
+        """Enqueue records; blocks while the first queue is full (backpressure). Returns the count."""
+        count = 0
+        for item in items:
+            self.queues[0].put(item)
+            count += 1
+        return count
+
+    def drain(self):
+        """Wait until everything submitted so far has passed through every stage."""
+        for q in self.queues:
+            q.join()
+
+    def stats(self) -> List[Dict]:
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return [stage.stats(elapsed) for stage in self.stages]
+
+    def print_stats(self):
+        rows = self.stats()
+        print(f"\n{'stage':<10} {'backlog':>8} {'in':>7} {'out':>7} {'errors':>7} {'rec/s':>8} {'util':>6} {'batch':>6}")
+        for r in rows:
+            print(f"{r['stage']:<10} {r['backlog']:>8} {r['in']:>7} {r['out']:>7} {r['errors']:>7} "
+                  f"{r['throughput']:>8.2f} {r['utilization']:>6.0%} {r['avg_batch']:>6.1f}")
+        busiest = max(rows, key=lambda r: (r["utilization"], r["backlog"]))
+        if busiest["in"]:
+            print(f"🐢 Bottleneck: {busiest['stage']} ({busiest['utilization']:.0%} busy, "
+                  f"{busiest['backlog']} waiting)")
+
+
+# ---------------------------------------------------------------------
+# Stage functions (real pipeline, see metadataToNeo4j.py)
+# ---------------------------------------------------------------------
+def neo4j_stages() -> List[Dict]:
+    import embeddings
+    import metadataToNeo4j as m
+
+    schema_ready = threading.Event()
+
+    def dedupe(items):
+        records = [item["raw"] for item in items]
+        if not config.INCREMENTAL_INGESTION:
+            return [{**item, "source_hash": None} for item in items]
+        to_process, hashes = m.filter_new_or_changed(records)
+        keep = {id(r) for r in to_process}
+        return [{**item, "source_hash": hashes.get(item["raw"].get("ticket_id"))}
+                for item in items if id(item["raw"]) in keep]
+
+    def normalize(items):
+        out = []
+        for item in items:
+            ticket = m.normalize_ticket(item["raw"])
+            if ticket is not None:
+                out.append({**item, "ticket": ticket})
+        return out
+
+    def embed(items):
+        tickets = [item["ticket"] for item in items]
+        for t, emb in zip(tickets, embeddings.embed_passages([t.title for t in tickets])):
+            t.title_embedding = emb
+        chunks = m.embed_chunks(tickets) if config.CHUNK_EMBEDDINGS_ENABLED else None
+        return [{**item, "chunks": chunks[item["ticket"].ticket_id] if chunks is not None else None}
+                for item in items]
+
+    def write(items):
+        if not schema_ready.is_set():
+            m.init_schema(len(items[0]["ticket"].title_embedding))
+            schema_ready.set()
+        tickets = [item["ticket"] for item in items]
+        hashes = {item["ticket"].ticket_id: item["source_hash"] for item in items if item["source_hash"]}
+        chunks = ({item["ticket"].ticket_id: item["chunks"] for item in items}
+                  if config.CHUNK_EMBEDDINGS_ENABLED else None)
+        m.ingest_to_neo4j(tickets, hashes, chunks)
+        return items
+
+    return [
+        {"name": "dedupe", "fn": dedupe, "batch_size": config.INCREMENTAL_CHECK_BATCH,
+         "linger": config.SCHEDULER_BATCH_LINGER, "drops_ok": True},
+        {"name": "normalize", "fn": normalize, "workers": config.NORMALIZE_CONCURRENCY},
+        {"name": "embed", "fn": embed, "batch_size": config.SCHEDULER_EMBED_BATCH,
+         "linger": config.SCHEDULER_BATCH_LINGER},
+        {"name": "write", "fn": write, "batch_size": config.SCHEDULER_WRITE_BATCH,
+         "linger": config.SCHEDULER_BATCH_LINGER},
+    ]
+
+
+def default_commit_hooks() -> Dict[str, Callable[[], None]]:
+    """Called after every record of a source run was ingested (e.g. to remember RSS ETags)."""
+    from Data_Scraping import data_RSS
+
+    return {"rss": data_RSS.commit_feed_state}
+
+
+def default_sources() -> Dict[str, Callable[[], List[Dict]]]:
+    from dataOrganizer import data_organizer
+
+    return {
+        "rss": data_organizer.data_orginize_RSS,
+        "github": data_organizer.data_orginize_github,
+        "startupsavant": data_organizer.data_stream_startupsavant,
+    }
+
+
+# ---------------------------------------------------------------------
+# Offline stubs (no network, no Neo4j, no models)
+# ---------------------------------------------------------------------
+def stub_source(name: str, per_run: int = 20, new_fraction: float = 0.5) -> Callable[[], List[Dict]]:
+    """Source returning RSS-like records; about `new_fraction` of each run is new."""
+    state = {"next": 0}
+
+    def fetch():
+        start = max(0, state["next"] - int(per_run * (1 - new_fraction)))
+        state["next"] = start + per_run
+        return [{"title": f"{name} item {i}", "link": f"https://example.com/{name}/{i}",
+                 "published": time.strftime("%Y-%m-%d"), "summary": f"Stub record {i} from {name}.",
+                 "source_url": f"stub://{name}"} for i in range(start, start + per_run)]
+    return fetch
+
+
+def offline_stages(write_sink: Optional[List[Dict]] = None, cost: float = 0.002) -> List[Dict]:
+    """Stand-ins with small simulated per-record costs; written items go to `write_sink`."""
+    seen = set()
+    sink = write_sink if write_sink is not None else []
+
+    def dedupe(items):
+        fresh = []
+        for i in items:
+            if i["raw"]["link"] not in seen:
+                seen.add(i["raw"]["link"])
+                fresh.append(i)
+        return fresh
+
+    def normalize(items):
+        time.sleep(cost * len(items) * 5)
+        return [{**i, "ticket": {"ticket_id": hashlib.sha1(i["raw"]["link"].encode()).hexdigest(),
+                                 "title": i["raw"]["title"]}} for i in items]
+
+    def embed(items):
+        time.sleep(cost * len(items))
+        for i in items:
+            rng = random.Random(i["ticket"]["ticket_id"])
+            i["ticket"]["title_embedding"] = [rng.random() for _ in range(8)]
+        return items
+
+    def write(items):
+        time.sleep(cost * len(items) / 2)
+        sink.extend(items)
+        return items
+
+    return [
+        {"name": "dedupe", "fn": dedupe, "batch_size": 100, "linger": 0.1, "drops_ok": True},
+        {"name": "normalize", "fn": normalize, "workers": 4},
+        {"name": "embed", "fn": embed, "batch_size": 32, "linger": 0.1},
+        {"name": "write", "fn": write, "batch_size": 100, "linger": 0.1},
+    ]
+
+
+# ---------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------
+class IngestionScheduler:
+    """Runs each source on its own interval and streams its records into `pipeline`."""
+
+    def __init__(self, sources: Dict[str, Callable[[], List[Dict]]], pipeline: StreamingPipeline,
+                 intervals: Optional[Dict[str, float]] = None,
+                 commit_hooks: Optional[Dict[str, Callable[[], None]]] = None):
+        self.sources = sources
+        self.pipeline = pipeline
+        self.commit_hooks = commit_hooks or {}
+        intervals = intervals or config.SCHEDULER_INTERVALS
+        self.intervals = {name: intervals.get(name, config.SCHEDULER_DEFAULT_INTERVAL) for name in sources}
+        self.next_run = {name: 0.0 for name in sources}
+        self.runs = {name: 0 for name in sources}
+        self._running = set()
+        self._lock = threading.Lock()
+        # one thread per source, so a slow source never delays the others
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(sources)), thread_name_prefix="source")
+
+    def _run_done(self, run: SourceRun):
+        """A source run is finished once all its records left the pipeline; only then is it committed."""
+        try:
+            if run.failed:
+                print(f"⚠️ {run.name}: {run.failed} records were not ingested; not committing this run.")
+            elif run.name in self.commit_hooks:
+                self.commit_hooks[run.name]()
+        except Exception as e:
+            print(f"⚠️ Commit hook of '{run.name}' failed: {e}")
+        finally:
+            with self._lock:
+                self.runs[run.name] += 1
+                self._running.discard(run.name)
+
+    def run_source(self, name: str):
+        """Fetch a source; a generator source is streamed record by record under backpressure.
+
+        The source stays "running" (and is not fetched again) until its
+        records have passed through every stage.
+        """
+        start = time.time()
+        run = SourceRun(name, self._run_done)
+
+        def items():
+            for r in records:
+                run.add()
+                yield {"source": name, "run": run, "raw": r}
+        try:
+            records = self.sources[name]() or []
+            count = self.pipeline.submit(items())
+            print(f"📥 {name}: {count} records fetched in {time.time() - start:.2f}s")
+        except Exception as e:
+            run.failed += 1
+            print(f"⚠️ Source '{name}' failed: {e} (retrying in {self.intervals[name]}s)")
+        finally:
+            run.close()
+
+    def tick(self):
+        """Start every source whose interval has elapsed and that is not still running."""
+        now = time.time()
+        with self._lock:
+            due = [n for n in self.sources if self.next_run[n] <= now and n not in self._running]
+            for name in due:
+                self._running.add(name)
+                self.next_run[name] = now + self.intervals[name]
+        for name in due:
+            self._pool.submit(self.run_source, name)
+
+    def run_once(self):
+        """Fetch every source once and wait for the pipeline to drain."""
+        self.pipeline.start()
+        futures = [self._pool.submit(self.run_source, name) for name in self.sources]
+        for f in futures:
+            f.result()
+        self.pipeline.drain()
+        self.pipeline.print_stats()
+        self.pipeline.stop()
+
+    def run_forever(self):
+        self.pipeline.start()
+        print("⏰ Scheduler started: " + ", ".join(f"{n} every {s}s" for n, s in self.intervals.items()))
+        last_stats = time.time()
+        try:
+            while True:
+                self.tick()
+                if time.time() - last_stats >= config.SCHEDULER_STATS_INTERVAL:
+                    self.pipeline.print_stats()
+                    last_stats = time.time()
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            print("🛑 Stopping: draining queued records...")
+            self.pipeline.drain()
+            self.pipeline.print_stats()
+            self.pipeline.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scheduled streaming ingestion.")
+    parser.add_argument("--once", action="store_true", help="fetch every source once, drain and exit")
+    parser.add_argument("--offline", action="store_true", help="use stub sources and stages")
+    parser.add_argument("--sources", nargs="*", help="only run these sources")
+    args = parser.parse_args()
+
+    if args.offline:
+        sink: List[Dict] = []
+        sources = {name: stub_source(name) for name in config.SCHEDULER_INTERVALS}
+        pipeline = StreamingPipeline(offline_stages(sink))
+    else:
+        sources = default_sources()
+        pipeline = StreamingPipeline(neo4j_stages())
+    if args.sources:
+        sources = {n: f for n, f in sources.items() if n in args.sources}
+
+    scheduler = IngestionScheduler(sources, pipeline, commit_hooks=None if args.offline else default_commit_hooks())
+    if args.once:
+        scheduler.run_once()
+        if args.offline:
+            print(f"✅ Offline run wrote {len(sink)} records.")
+    else:
+        scheduler.run_forever()
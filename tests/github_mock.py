@@ -0,0 +1,64 @@
+"""
+Local stand-in for the GitHub search API, shared by tests/test_github_harvest.py
+and `benchmarks.py github-harvest`.
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def mock_github_server(total: int, quota: int, window: float, throttle_every: int):
+    """Search API stand-in: paging, ETags, X-RateLimit-* quota and an occasional 429 + Retry-After."""
+    state = {"remaining": quota, "reset_at": time.time() + window, "charged": 0, "not_modified": 0,
+             "throttled": 0, "over_quota": 0, "requests": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=b"", headers=None):
+            self.send_response(status)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            page, per_page = int(params.get("page", 1)), int(params.get("per_page", 30))
+            etag = '"' + hashlib.md5(f"{params['q']}|{page}|{per_page}".encode()).hexdigest() + '"'
+            with lock:
+                state["requests"] += 1
+                now = time.time()
+                if now >= state["reset_at"]:
+                    state["remaining"], state["reset_at"] = quota, now + window
+                limit_headers = {"X-RateLimit-Remaining": str(state["remaining"]),
+                                 "X-RateLimit-Reset": str(int(state["reset_at"]) + 1)}
+                if self.headers.get("If-None-Match") == etag:
+                    # conditional hits are free, as on GitHub
+                    state["not_modified"] += 1
+                    return self._send(304, headers={"ETag": etag, **limit_headers})
+                if throttle_every and state["requests"] % throttle_every == 0:
+                    state["throttled"] += 1
+                    return self._send(429, b"{}", {"Retry-After": "1", **limit_headers})
+                if state["remaining"] <= 0:
+                    state["over_quota"] += 1
+                    return self._send(403, b"{}", limit_headers)
+                state["remaining"] -= 1
+                state["charged"] += 1
+                limit_headers["X-RateLimit-Remaining"] = str(state["remaining"])
+            first = (page - 1) * per_page
+            items = [{"full_name": f"{params['q'].split()[0]}/repo-{i}", "stargazers_count": total - i,
+                      "description": f"Mock repository {i}", "html_url": f"https://example.com/{i}"}
+                     for i in range(first, min(first + per_page, total))]
+            body = json.dumps({"total_count": total, "items": items}).encode()
+            self._send(200, body, {"ETag": etag, "Content-Type": "application/json", **limit_headers})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
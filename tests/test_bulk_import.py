@@ -0,0 +1,153 @@
+"""
+neo4j-admin bulk-import files written by BulkImportWriter: valid per
+validate_bulk_files, and carrying the same properties, ids and relationships
+as the MERGE ingestion Cypher for both graph models. No Neo4j needed.
+"""
+import csv
+import os
+import re
+
+import pytest
+
+import config
+import metadataToNeo4j as pipeline
+from metadataToNeo4j import TicketSchema
+
+
+DIM = 4
+
+
+def _tickets():
+    return [
+        TicketSchema(
+            ticket_id="t-1", title="Vector search in \"Neo4j\"", title_embedding=[0.1, -0.2, 0.3, 0.4],
+            type="rss_article",
+            metadata={"published": "2024-05-01", "author_name": "Ada", "feed_title": "techcrunch.com",
+                      "location": "Berlin"},
+            description={"description": "Line one,\nline two."},
+            source={"source": "techcrunch.com", "url": "https://techcrunch.com/a"},
+            tags=["AI", "Search", "AI"],
+        ),
+        TicketSchema(
+            ticket_id="t-2", title="acme/agents", title_embedding=[0.5, 0.6, -0.7, 0.8],
+            type="github_repo",
+            metadata={"published": "", "author_name": "acme", "feed_title": "GitHub", "location": ""},
+            description={"description": ""},
+            source={"source": "github", "url": "https://github.com/acme/agents"},
+            tags=["ai "],
+        ),
+    ]
+
+
+def _chunks(tickets):
+    return {t.ticket_id: [{"chunk_id": f"{t.ticket_id}:0", "seq": 0, "text": t.title,
+                           "embedding": t.title_embedding}] for t in tickets}
+
+
+def _read(out_dir, name):
+    with open(os.path.join(out_dir, f"{name}.csv"), encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    return rows[0], [dict(zip(rows[0], r)) for r in rows[1:]]
+
+
+def _property(column):
+    """'title_embedding:double[]' -> 'title_embedding'; ':LABEL' and bare ':ID(...)' -> None."""
+    name = column.split(":")[0]
+    return name or None
+
+
+def _set_properties(cypher, var):
+    return set(re.findall(rf"\b{var}\.(\w+)\s*=", cypher))
+
+
+@pytest.fixture(params=["per_ticket", "shared"])
+def bulk_dir(request, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "GRAPH_MODEL", request.param)
+    tickets = _tickets()
+    writer = pipeline.BulkImportWriter(str(tmp_path))
+    writer.add(tickets[:1], {"t-1": "hash-1"}, _chunks(tickets[:1]))
+    # second batch repeats t-1; the first copy wins
+    writer.add(tickets, {"t-1": "hash-1", "t-2": "hash-2"}, _chunks(tickets))
+    writer.close()
+    return request.param, str(tmp_path)
+
+
+def _ingest_cypher(model):
+    links = pipeline.SHARED_LINKS_CYPHER if model == "shared" else pipeline.PER_TICKET_LINKS_CYPHER
+    return pipeline.INGEST_TICKET_CYPHER + links + pipeline.CHUNKS_CYPHER
+
+
+def test_bulk_files_validate(bulk_dir):
+    _, out_dir = bulk_dir
+    assert pipeline.validate_bulk_files(out_dir) == []
+
+
+def test_headers_match_ingest_cypher(bulk_dir):
+    model, out_dir = bulk_dir
+    cypher = _ingest_cypher(model)
+
+    header, tickets = _read(out_dir, "tickets")
+    assert {_property(c) for c in header} - {None} == {"ticket_id"} | _set_properties(cypher, "root")
+    assert [t["ticket_id:ID(Ticket)"] for t in tickets] == ["t-1", "t-2"]
+    assert tickets[0]["source_hash"] == "hash-1"
+    assert len(tickets[0]["title_embedding:double[]"].split(pipeline.BULK_ARRAY_DELIMITER)) == DIM
+
+    header, _ = _read(out_dir, "entities")
+    per_ticket = {"parent_id", "type"} | set().union(
+        *(_set_properties(cypher, v) for v in ("meta", "typeNode", "content", "source")))
+    if model == "per_ticket":
+        per_ticket.add("name")  # tag name is part of the MERGE key
+    assert per_ticket <= {_property(c) for c in header}
+
+    header, _ = _read(out_dir, "chunks")
+    assert {_property(c) for c in header} - {None} == {"chunk_id"} | _set_properties(cypher, "chunk")
+
+
+def test_relationships_match_ingest_cypher(bulk_dir):
+    model, out_dir = bulk_dir
+    cypher = _ingest_cypher(model)
+
+    written = set()
+    for name in ("ticket_entity_rels", "entity_entity_rels", "ticket_chunk_rels"):
+        written |= {r[":TYPE"] for r in _read(out_dir, name)[1]}
+    merged = set(re.findall(r"MERGE \(\w+\)-\[:(\w+)\]->", cypher))
+    assert written == merged
+
+    _, entities = _read(out_dir, "entities")
+    parents = {e[":ID(Entity)"]: e["parent_id"] for e in entities}
+    for rel in _read(out_dir, "ticket_entity_rels")[1]:
+        end = rel[":END_ID(Entity)"]
+        if end in parents:
+            assert parents[end] == rel[":START_ID(Ticket)"]
+
+    _, shared = _read(out_dir, "shared_entities")
+    tag_rels = [r for r in _read(out_dir, "ticket_entity_rels")[1] if r[":TYPE"] == "HAS_TAG"]
+    if model == "shared":
+        # "AI", "AI" and "ai " collapse to one canonical Tag linked from both tickets
+        assert sorted(e["key"] for e in shared if e["type"] == "tag") == ["ai", "search"]
+        assert len(tag_rels) == 3
+        assert not any(e["type"] in ("source", "tag") for e in entities)
+    else:
+        assert shared == []
+        assert len(tag_rels) == 3
+        assert {e["name"] for e in entities if e["type"] == "tag"} == {"AI", "Search", "ai "}
+
+
+def test_export_pipeline_writes_one_batch_at_a_time(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "GRAPH_MODEL", "shared")
+    monkeypatch.setattr(config, "CHUNK_EMBEDDINGS_ENABLED", False)
+    tickets = {t.ticket_id: t for t in _tickets()}
+    batches = [[{"ticket_id": "t-1"}], [{"ticket_id": "t-2"}, {"ticket_id": "t-1"}]]
+    monkeypatch.setattr(pipeline, "iter_bulk_batches", lambda sources, batch_size: iter(batches))
+    monkeypatch.setattr(pipeline, "normalize_tickets",
+                        lambda raw: [tickets[r["ticket_id"]].model_copy() for r in raw])
+    monkeypatch.setattr(pipeline, "embed_texts", lambda texts: [[0.25] * DIM for _ in texts])
+    added = []
+    add = pipeline.BulkImportWriter.add
+    monkeypatch.setattr(pipeline.BulkImportWriter, "add",
+                        lambda self, ts, *a: added.append(len(ts)) or add(self, ts, *a))
+
+    manifest = pipeline.bulk_export_pipeline(str(tmp_path))
+    assert added == [1, 2]
+    assert manifest["files"]["tickets"]["rows"] == 2 and manifest["dim"] == DIM
+    assert pipeline.validate_bulk_files(str(tmp_path)) == []
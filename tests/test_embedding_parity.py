@@ -0,0 +1,47 @@
+"""
+Parity of the shared embedding service with the stored `title_embedding`
+values. Needs a reachable Neo4j with embedded tickets and the E5 model;
+skipped otherwise.
+"""
+import pytest
+
+import config
+import resources
+
+
+PARITY_LIMIT = 200
+
+
+@pytest.fixture(scope="module")
+def stored_titles():
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    try:
+        driver = resources.get_neo4j_driver()
+        driver.verify_connectivity()
+        with driver.session() as s:
+            rows = s.run("""
+            MATCH (t:Ticket) WHERE t.title IS NOT NULL AND t.title_embedding IS NOT NULL
+            RETURN t.ticket_id AS id, t.title AS title, t.title_embedding AS emb LIMIT $n
+            """, n=PARITY_LIMIT).data()
+    except Exception as e:
+        pytest.skip(f"Neo4j not reachable: {e}")
+    if not rows:
+        pytest.skip("no embedded tickets in Neo4j")
+    return rows
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    na = sum(x * x for x in a) ** 0.5
+    nb = sum(y * y for y in b) ** 0.5
+    return dot / (na * nb) if na and nb else 0.0
+
+
+def test_reembedded_titles_match_stored_embeddings(stored_titles):
+    import embeddings
+
+    vectors = embeddings.embed_passages([r["title"] for r in stored_titles])
+    below = [(round(_cosine(v, r["emb"]), 5), r["id"]) for v, r in zip(vectors, stored_titles)
+             if _cosine(v, r["emb"]) < config.EMBEDDING_PARITY_TOLERANCE]
+    assert not below, f"{len(below)} titles below cosine {config.EMBEDDING_PARITY_TOLERANCE}: {sorted(below)[:5]}"
@@ -0,0 +1,86 @@
+"""
+GitHub harvester against the mock search API in github_mock.py: paging
+stops at the result cap, 429 + Retry-After is retried after the advertised
+delay, and ETag revalidations (304) are not charged against the quota.
+"""
+import pytest
+
+import config
+from Data_Scraping import data_github
+from tests.github_mock import mock_github_server
+
+
+@pytest.fixture
+def github_mock():
+    """Factory: start a mock search API, return (url, state); servers are shut down on teardown."""
+    servers = []
+
+    def start(total, quota=5000, window=3600.0, throttle_every=0):
+        server, state = mock_github_server(total, quota, window, throttle_every)
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/search/repositories", state
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the harvester's sleeps instead of waiting them out."""
+    calls = []
+    monkeypatch.setattr(data_github.time, "sleep", calls.append)
+    return calls
+
+
+def test_pagination_stops_at_max_results(github_mock, monkeypatch):
+    monkeypatch.setattr(config, "GITHUB_PER_PAGE", 10)
+    url, state = github_mock(total=500)
+    items, stats = data_github.search_repos("capped topic:llm", max_results=25, url=url)
+    assert len(items) == 25
+    assert stats["pages"] == 3 and state["charged"] == 3
+
+
+def test_pagination_stops_at_search_result_limit(github_mock, monkeypatch):
+    monkeypatch.setattr(config, "GITHUB_PER_PAGE", 100)
+    url, state = github_mock(total=5000)
+    items, stats = data_github.search_repos("huge topic:llm", max_results=5000, url=url)
+    assert len(items) == data_github.SEARCH_RESULT_LIMIT
+    assert stats["pages"] == data_github.SEARCH_RESULT_LIMIT // 100 == state["charged"]
+
+
+def test_pagination_stops_at_last_page(github_mock, monkeypatch):
+    monkeypatch.setattr(config, "GITHUB_PER_PAGE", 10)
+    url, state = github_mock(total=35)
+    items, stats = data_github.search_repos("small topic:llm", max_results=100, url=url)
+    assert len(items) == 35
+    assert stats["pages"] == 4 and state["requests"] == 4
+
+
+def test_429_retry_after_is_honored(github_mock, monkeypatch, sleeps):
+    monkeypatch.setattr(config, "GITHUB_PER_PAGE", 10)
+    url, state = github_mock(total=50, throttle_every=3)
+    items, stats = data_github.search_repos("throttled topic:llm", max_results=50, url=url)
+    assert len({i["full_name"] for i in items}) == 50
+    assert state["throttled"] >= 1
+    assert stats["rate_limited"] == state["throttled"]
+    # the mock sends Retry-After: 1
+    assert sleeps.count(1.0) == state["throttled"]
+    assert state["over_quota"] == 0
+
+
+def test_etag_revalidation_costs_no_quota(github_mock, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "GITHUB_PER_PAGE", 20)
+    url, state = github_mock(total=100)
+    queries = ["alpha topic:llm", "beta topic:llm"]
+    cache_path = str(tmp_path / "etag_cache.json")
+
+    cold = data_github.harvest(queries, max_results=100, url=url, cache_path=cache_path)
+    charged = state["charged"]
+    assert charged == 10 and state["not_modified"] == 0
+
+    warm = data_github.harvest(queries, max_results=100, url=url, cache_path=cache_path)
+    assert warm == cold
+    assert state["charged"] == charged
+    assert state["not_modified"] == 10
@@ -0,0 +1,69 @@
+"""
+Commit gating of the streaming scheduler, run offline: a source run's commit
+hook (e.g. storing RSS validators) fires once, and only when every record
+was written or deliberately dropped by a `drops_ok` stage.
+"""
+import pytest
+
+import scheduler
+
+
+def _run(records, stages):
+    commits = []
+    sources = {"rss": lambda: list(records)}
+    pipeline = scheduler.StreamingPipeline(stages)
+    runner = scheduler.IngestionScheduler(sources, pipeline, commit_hooks={"rss": lambda: commits.append("rss")})
+    runner.run_once()
+    return commits, runner
+
+
+def _stages(sink, **overrides):
+    stages = scheduler.offline_stages(sink, cost=0)
+    for spec in stages:
+        if spec["name"] in overrides:
+            spec["fn"] = overrides[spec["name"]]
+    return stages
+
+
+@pytest.fixture
+def records():
+    return scheduler.stub_source("rss", per_run=30)()
+
+
+def test_fully_written_run_commits_once(records):
+    sink = []
+    commits, runner = _run(records, _stages(sink))
+    assert len(sink) == len(records)
+    assert commits == ["rss"]
+    assert runner.runs["rss"] == 1 and not runner._running
+
+
+def test_failing_stage_blocks_commit(records):
+    def embed(items):
+        raise RuntimeError("embedding service down")
+
+    sink = []
+    commits, runner = _run(records, _stages(sink, embed=embed))
+    assert sink == []
+    assert commits == []
+    # the run still finishes, so the source is fetched again next interval
+    assert runner.runs["rss"] == 1 and not runner._running
+
+
+def test_dedupe_drops_are_not_failures(records):
+    sink = []
+    # every record arrives twice; dedupe (drops_ok) filters the copies
+    commits, _ = _run(records + records, _stages(sink))
+    assert len(sink) == len(records)
+    assert commits == ["rss"]
+
+
+def test_drops_in_other_stages_are_failures(records):
+    def normalize(items):
+        return [{**i, "ticket": {"ticket_id": i["raw"]["link"], "title": i["raw"]["title"]}}
+                for i in items if not i["raw"]["link"].endswith("/3")]
+
+    sink = []
+    commits, _ = _run(records, _stages(sink, normalize=normalize))
+    assert len(sink) == len(records) - 1
+    assert commits == []